@@ -273,14 +273,15 @@ class ImageGenerator:
             
             # Convert to base64 first
             buffered = io.BytesIO()
-            image.save(buffered, format="PNG")
-            img_str = base64.b64encode(buffered.getvalue()).decode()
+            image.save(buffered, format="PNG", compress_level=1)
+            png_bytes = buffered.getvalue()
+            img_str = base64.b64encode(png_bytes).decode()
             
             print(f"[OK] Modern generation completed in {generation_time:.2f}s")
             
             # Save to gallery
             image_id = self.gallery.add_image(
-                image_data=img_str,
+                image_data=png_bytes,
                 prompt=request.prompt,
                 model=self.current_model,
                 generation_time=generation_time,
@@ -319,31 +320,39 @@ class ImageGenerator:
         """Generate image using modern API generator"""
         try:
             # Generate with modern API
+            async def generate():
+                try:
+                    return await self.modern_manager.generate_image(
+                        self.current_model,
+                        request.prompt,
+                        negative_prompt=request.negative_prompt,
+                        width=request.width,
+                        height=request.height,
+                        num_inference_steps=request.num_inference_steps,
+                        guidance_scale=request.guidance_scale,
+                        gpu=getattr(request, 'modal_gpu', None),
+                        model=getattr(request, 'modal_model', None)
+                    )
+                finally:
+                    # The loop ends with this call, so its HTTP sessions must too
+                    await self.modern_manager.close_loop_sessions()
+            
             # Use asyncio.run() to run the async generator in a new event loop
             # This is the correct way to call async code from sync context
-            image = asyncio.run(self.modern_manager.generate_image(
-                self.current_model,
-                request.prompt,
-                negative_prompt=request.negative_prompt,
-                width=request.width,
-                height=request.height,
-                num_inference_steps=request.num_inference_steps,
-                guidance_scale=request.guidance_scale,
-                gpu=getattr(request, 'modal_gpu', None),
-                model=getattr(request, 'modal_model', None)
-            ))
+            image = asyncio.run(generate())
             
             generation_time = time.time() - start_time
             vram_used = 0.0  # API generators don't use local VRAM
             
             # Convert to base64 FIRST (before gallery save)
             buffered = io.BytesIO()
-            image.save(buffered, format="PNG")
-            img_str = base64.b64encode(buffered.getvalue()).decode()
+            image.save(buffered, format="PNG", compress_level=1)
+            png_bytes = buffered.getvalue()
+            img_str = base64.b64encode(png_bytes).decode()
             
             # Save to gallery - use correct parameter names
             image_id = self.gallery.add_image(
-                image_data=img_str,
+                image_data=png_bytes,
                 prompt=request.prompt,
                 negative_prompt=request.negative_prompt,
                 model=self.current_model,
@@ -382,12 +391,13 @@ class ImageGenerator:
             
             # Convert to base64 first
             buffered = io.BytesIO()
-            image.save(buffered, format="PNG")
-            img_str = base64.b64encode(buffered.getvalue()).decode()
+            image.save(buffered, format="PNG", compress_level=1)
+            png_bytes = buffered.getvalue()
+            img_str = base64.b64encode(png_bytes).decode()
             
             # Save to gallery
             image_id = self.gallery.add_image(
-                image_data=img_str,
+                image_data=png_bytes,
                 prompt=request.prompt,
                 model=self.current_model,
                 generation_time=generation_time,
@@ -461,6 +471,11 @@ async def refresh_generators():
 # Initialize image generator
 generator = ImageGenerator()
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close the modern generators' HTTP sessions"""
+    await generator.modern_manager.close()
+
 @app.get("/status")
 async def get_status():
     """Get system status including VRAM usage"""
@@ -721,6 +736,16 @@ async def get_gallery_image(image_id: str):
     else:
         raise HTTPException(status_code=404, detail="Image not found")
 
+@app.get("/gallery/{image_id}/file")
+async def get_gallery_image_file(image_id: str):
+    """Serve a gallery image file directly, without a base64 JSON payload"""
+    image_path = generator.gallery.get_image_path(image_id)
+    if image_path:
+        # Media type follows the stored file's extension (PNG or JPEG)
+        return FileResponse(image_path)
+    else:
+        raise HTTPException(status_code=404, detail="Image not found")
+
 @app.delete("/gallery/{image_id}")
 async def delete_gallery_image(image_id: str):
     """Delete image from gallery"""
@@ -1,4 +1,6 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from azure.identity import DefaultAzureCredential, get_bearer_token_provider
 
 endpoint = "https://azure-2026.openai.azure.com/openai/v1/images/generations"
@@ -12,6 +14,17 @@ versions = [
 ]
 payload = {"model": "FLUX.2-pro", "prompt": "test image", "n": 1, "size": "1024x1024"}
 
+# One keep-alive session; transient 429/5xx are retried with backoff (POST included -
+# these are probes) and a short connect timeout fails fast on dead endpoints
+session = requests.Session()
+session.mount("https://", HTTPAdapter(max_retries=Retry(
+    total=3,
+    backoff_factor=0.5,
+    status_forcelist=[429, 502, 503, 504],
+    allowed_methods=frozenset(["GET", "POST"]),
+    raise_on_status=False,
+)))
+
 credential = DefaultAzureCredential()
 token_provider = get_bearer_token_provider(credential, "https://cognitiveservices.azure.com/.default")
 access_token = token_provider()
@@ -20,7 +33,7 @@ headers = {"Authorization": f"Bearer {access_token}", "Content-Type": "applicati
 for v in versions:
     url = f"{endpoint}?api-version={v}" if v else endpoint
     try:
-        resp = requests.post(url, headers=headers, json=payload, timeout=30)
+        resp = session.post(url, headers=headers, json=payload, timeout=(5, 30))
         print(f"{v}: {resp.status_code}")
         if resp.status_code != 200:
             print(resp.text[:400])
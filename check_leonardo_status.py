@@ -4,35 +4,123 @@ Check Leonardo.ai API status and provide troubleshooting info
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 import time
+from concurrent.futures import ThreadPoolExecutor
+
+# ijson is optional - with it the models list is parsed as it streams in
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+# One keep-alive session for every probe; transient 429/5xx on GETs are retried
+# with exponential backoff that honours Retry-After
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=4,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 502, 503, 504],
+                      raise_on_status=False),
+))
+# Compressed responses keep the platform/models payloads small; brotli only when it can be decoded
+try:
+    import brotli  # noqa: F401
+    SESSION.headers["Accept-Encoding"] = "gzip, deflate, br"
+except ImportError:
+    SESSION.headers["Accept-Encoding"] = "gzip, deflate"
+
+PLATFORM_URL = "https://cloud.leonardo.ai/api/rest/v1/platform"
+
+def probe_platform(api_key=None, timeout=10, stream=False):
+    """GET the platform endpoint, authenticated when an API key is given"""
+    headers = {"Authorization": f"Bearer {api_key}"} if api_key else None
+    return SESSION.get(PLATFORM_URL, headers=headers, timeout=timeout, stream=stream)
+
+def iter_platform_models(response, meta=None):
+    """Yield the models of a platform response without building the whole document first.
+    
+    Top-level scalar fields (e.g. "status") are copied into ``meta`` when a dict is given.
+    """
+    if IJSON_AVAILABLE:
+        response.raw.decode_content = True
+        builder = None
+        for prefix, event, value in ijson.parse(response.raw):
+            if builder is None:
+                if prefix == "models.item" and event == "start_map":
+                    builder = ijson.ObjectBuilder()
+                elif meta is not None and "." not in prefix and event in ("string", "number", "boolean", "null"):
+                    meta[prefix] = value
+                    continue
+                else:
+                    continue
+            builder.event(event, value)
+            if prefix == "models.item" and event == "end_map":
+                yield builder.value
+                builder = None
+    else:
+        data = response.json()
+        if meta is not None:
+            meta.update((key, value) for key, value in data.items() if not isinstance(value, (dict, list)))
+        yield from data.get("models", [])
+
+def _probe_generation():
+    test_payload = {
+        "prompt": "test image",
+        "modelId": "6bef79f1-4c30-4f2d-b29f-4f5a8b5ec48f",  # Leonardo Diffusion
+        "width": 512,
+        "height": 512,
+        "num_images": 1
+    }
+    
+    return SESSION.post(
+        "https://cloud.leonardo.ai/api/rest/v1/generations",
+        json=test_payload,
+        timeout=10
+    )
 
 def check_leonardo_status():
+    # Both probes are independent, so start them together and report in order
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        platform_probe = executor.submit(probe_platform, stream=True)
+        generation_probe = executor.submit(_probe_generation)
+        _report_leonardo_status(platform_probe, generation_probe)
+
+def _report_leonardo_status(platform_probe, generation_probe):
     print("🔍 Checking Leonardo.ai API status...")
     print()
     
     # Test basic API connectivity
     try:
-        response = requests.get("https://cloud.leonardo.ai/api/rest/v1/platform", timeout=10)
+        response = platform_probe.result()
         
         if response.status_code == 200:
             print("✅ Leonardo.ai API is reachable")
-            data = response.json()
+            
+            # Count the models and keep the first few popular ones in one streaming pass
+            meta = {}
+            model_count = 0
+            popular_models = []
+            for model in iter_platform_models(response, meta):
+                model_count += 1
+                if len(popular_models) < 5 and model.get("name", "").lower() in ["flux", "leonardo", "stable diffusion", "dall-e"]:
+                    popular_models.append(model)
             
             # Check platform status
-            if "status" in data:
-                print(f"📊 Platform Status: {data.get('status', 'Unknown')}")
+            if "status" in meta:
+                print(f"📊 Platform Status: {meta.get('status', 'Unknown')}")
             
             # Check available models
-            if "models" in data:
-                models = data.get("models", [])
-                print(f"🎨 Available Models: {len(models)}")
+            if model_count:
+                print(f"🎨 Available Models: {model_count}")
                 
                 # Show some popular models
-                popular_models = [m for m in models if m.get("name", "").lower() in ["flux", "leonardo", "stable diffusion", "dall-e"]]
                 if popular_models:
                     print("🔥 Popular Models:")
-                    for model in popular_models[:5]:
+                    for model in popular_models:
                         print(f"   - {model.get('name', 'Unknown')}")
             
         else:
@@ -57,19 +145,7 @@ def check_leonardo_status():
     # Test generation endpoint (this might fail with 500)
     print("🧪 Testing generation endpoint...")
     try:
-        test_payload = {
-            "prompt": "test image",
-            "modelId": "6bef79f1-4c30-4f2d-b29f-4f5a8b5ec48f",  # Leonardo Diffusion
-            "width": 512,
-            "height": 512,
-            "num_images": 1
-        }
-        
-        response = requests.post(
-            "https://cloud.leonardo.ai/api/rest/v1/generations",
-            json=test_payload,
-            timeout=10
-        )
+        response = generation_probe.result()
         
         if response.status_code == 200:
             print("✅ Generation endpoint working")
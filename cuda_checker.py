@@ -3,12 +3,17 @@ CUDA Checker for VisionCraft Pro
 Check CUDA availability and GPU PyTorch installation
 """
 
+import contextlib
+import io
+import logging
 import subprocess
 import sys
 import platform
 import os
 from typing import Dict, List, Optional
 
+logger = logging.getLogger(__name__)
+
 class CudaChecker:
     """Check CUDA availability and GPU PyTorch installation"""
     
@@ -265,7 +270,22 @@ class CudaChecker:
         return compatibility
     
     def print_system_info(self):
-        """Print comprehensive system information"""
+        """Print comprehensive system information
+
+        When stdout is not a terminal (e.g. the backend launched by the desktop
+        app with its output piped), the report is buffered and emitted as a
+        single log record so the probes never stall on a full pipe.
+        """
+        if sys.stdout is not None and sys.stdout.isatty():
+            self._print_system_info()
+            return
+
+        with contextlib.redirect_stdout(io.StringIO()) as buf:
+            self._print_system_info()
+        logger.info("%s", buf.getvalue().rstrip())
+
+    def _print_system_info(self):
+        """Write the system information report to stdout"""
         print("[CUDA] System Information:")
         print(f"  Platform: {self.system_info['platform']}")
         print(f"  Machine: {self.system_info['machine']}")
@@ -306,5 +326,6 @@ class CudaChecker:
 
 # Example usage
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     checker = CudaChecker()
     checker.print_system_info()
@@ -6,17 +6,267 @@ Author: Timo Pitkänen (tpitkane@gmail.com)
 """
 
 import os
+import threading
+import weakref
 import json
 import sqlite3
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple, Any
-from PIL import Image
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple, Any
+import csv
+import io
 import hashlib
 from pathlib import Path
 
+if TYPE_CHECKING:
+    import numpy as np
+    from PIL import Image
+
+# orjson is optional - it is much faster for generation_params and metadata exports
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def _json_dumps(obj, indent: bool = False) -> str:
+    """Serialize to a JSON string, stringifying anything JSON can't represent"""
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=str, option=option).decode("utf-8")
+    return json.dumps(obj, indent=2 if indent else None, default=str)
+
+def _json_loads(data):
+    """Parse a JSON string"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+# PIL and numpy are imported on first use, so stats-only callers don't pay for them
+@lru_cache(maxsize=None)
+def _pil_image():
+    """Return the PIL.Image module"""
+    from PIL import Image
+    return Image
+
+@lru_cache(maxsize=None)
+def _numpy():
+    """Return the numpy module"""
+    import numpy
+    return numpy
+
+def _dct_matrix(n: int) -> 'np.ndarray':
+    """Orthonormal DCT-II basis, so a 2D DCT is D @ X @ D.T"""
+    np = _numpy()
+    k = np.arange(n)[:, None]
+    x = np.arange(n)[None, :]
+    matrix = np.sqrt(2.0 / n) * np.cos(np.pi * (2 * x + 1) * k / (2 * n))
+    matrix[0] /= np.sqrt(2.0)
+    return matrix.astype(np.float32)
+
+@lru_cache(maxsize=None)
+def _dct_32() -> 'np.ndarray':
+    """32x32 DCT basis used by the perceptual hash"""
+    return _dct_matrix(32)
+
+def _popcount64(values: 'np.ndarray') -> 'np.ndarray':
+    """Count set bits in each uint64 (hardware popcount on NumPy 2.0+, byte unpacking before)"""
+    np = _numpy()
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(values)
+    values = np.ascontiguousarray(values)
+    return np.unpackbits(values.view(np.uint8).reshape(values.shape + (8,)), axis=-1).sum(axis=-1)
+
+# Thumbnail size, and the JPEG draft scale every decode for hashing/thumbnailing uses
+_THUMBNAIL_SIZE = (200, 200)
+_DRAFT_SIZE = (_THUMBNAIL_SIZE[0] * 2, _THUMBNAIL_SIZE[1] * 2)
+
+def _phash_from_image(img: 'Image.Image') -> str:
+    """Generate a 64-bit perceptual hash (pHash) of a decoded image as 16 hex digits"""
+    np = _numpy()
+    Image = _pil_image()
+    dct = _dct_32()
+    # 32x32 grayscale -> 2D DCT -> low-frequency 8x8 block -> median threshold
+    pixels = np.asarray(img.convert('L').resize((32, 32), Image.Resampling.LANCZOS),
+                        dtype=np.float32)
+    coeffs = (dct @ pixels @ dct.T)[:8, :8].flatten()
+    bits = coeffs > np.median(coeffs[1:])
+    return f"{int(''.join('1' if bit else '0' for bit in bits), 2):016x}"
+
+def _file_hash(image_path: Path) -> str:
+    """Streamed BLAKE2b digest of the raw file"""
+    with open(image_path, 'rb') as f:
+        if hasattr(hashlib, 'file_digest'):
+            return hashlib.file_digest(f, 'blake2b', _bufsize=1 << 20).hexdigest()
+        digest = hashlib.blake2b()
+        while chunk := f.read(1 << 20):
+            digest.update(chunk)
+        return digest.hexdigest()
+
+def _thumbnail_is_current(image_path: Path, thumbnail_path: Path) -> bool:
+    """True if the thumbnail exists and is no older than its source image"""
+    try:
+        return thumbnail_path.stat().st_mtime >= image_path.stat().st_mtime
+    except OSError:
+        return False
+
+def _save_thumbnail(img: 'Image.Image', thumbnail_path: Path, size: Tuple[int, int]) -> Optional[Path]:
+    """Write a JPEG thumbnail of a decoded image (resizes img in place if no conversion is needed)"""
+    Image = _pil_image()
+    try:
+        # Convert to RGB if necessary
+        if img.mode in ('RGBA', 'LA', 'P'):
+            img = img.convert('RGB')
+        
+        # Create thumbnail (BICUBIC is indistinguishable from LANCZOS at this size)
+        img.thumbnail(size, Image.Resampling.BICUBIC)
+        img.save(thumbnail_path, 'JPEG', quality=85)
+        return thumbnail_path
+        
+    except Exception as e:
+        print(f"[Gallery] Error creating thumbnail: {e}")
+        return None
+
+def _generate_image_hash(image_path: Path) -> str:
+    """Generate a 64-bit perceptual hash (pHash) as 16 hex digits"""
+    try:
+        with _pil_image().open(image_path) as img:
+            img.draft('RGB', _DRAFT_SIZE)
+            return _phash_from_image(img)
+    except:
+        # Fallback to a streamed file hash
+        return _file_hash(image_path)
+
+def _create_thumbnail(image_path: Path, thumbnails_dir: Path,
+                      size: Tuple[int, int] = _THUMBNAIL_SIZE) -> Optional[Path]:
+    """Create thumbnail for image"""
+    thumbnail_path = thumbnails_dir / f"thumb_{image_path.stem}.jpg"
+    if _thumbnail_is_current(image_path, thumbnail_path):
+        return thumbnail_path
+    
+    try:
+        with _pil_image().open(image_path) as img:
+            # Let JPEGs decode at a reduced scale before any conversion
+            img.draft('RGB', (size[0] * 2, size[1] * 2))
+            return _save_thumbnail(img, thumbnail_path, size)
+    except Exception as e:
+        print(f"[Gallery] Error creating thumbnail: {e}")
+        return None
+
+def _compute_image_meta(image_path: str, thumbnails_dir: Path,
+                        thumbnail_size: Tuple[int, int] = _THUMBNAIL_SIZE) -> Tuple:
+    """Hash, measure and thumbnail one image from a single decode.
+    
+    Returns ``(path, hash, width, height, format, file_size, thumbnail_path)``.
+    Module-level so it can run in a ProcessPoolExecutor worker.
+    """
+    image_path = Path(image_path)
+    thumbnail_path = thumbnails_dir / f"thumb_{image_path.stem}.jpg"
+    make_thumbnail = not _thumbnail_is_current(image_path, thumbnail_path)
+    
+    with _pil_image().open(image_path) as img:
+        # Get image dimensions before draft() shrinks the decode
+        width, height = img.size
+        image_format = img.format
+        
+        img.draft('RGB', (max(_DRAFT_SIZE[0], thumbnail_size[0] * 2),
+                          max(_DRAFT_SIZE[1], thumbnail_size[1] * 2)))
+        try:
+            img.load()
+            image_hash = _phash_from_image(img)
+        except Exception:
+            img = None
+            image_hash = _file_hash(image_path)
+        
+        # Create thumbnail from the same decode (last, since it resizes in place)
+        if make_thumbnail:
+            thumbnail_path = _save_thumbnail(img, thumbnail_path, thumbnail_size) if img else None
+    
+    # Get file size
+    file_size = image_path.stat().st_size
+    
+    return (str(image_path), image_hash, width, height, image_format, file_size,
+            str(thumbnail_path) if thumbnail_path else None)
+
+def _compute_image_meta_from_image(img: 'Image.Image', image_path: str, image_format: str,
+                                   thumbnails_dir: Path,
+                                   thumbnail_size: Tuple[int, int] = _THUMBNAIL_SIZE) -> Tuple:
+    """Same as _compute_image_meta, for an image that is already decoded in memory"""
+    image_path = Path(image_path)
+    thumbnail_path = thumbnails_dir / f"thumb_{image_path.stem}.jpg"
+    width, height = img.size
+    image_hash = _phash_from_image(img)
+    
+    # _save_thumbnail resizes in place unless it has to convert, so hand it a copy then
+    if not _thumbnail_is_current(image_path, thumbnail_path):
+        source = img if img.mode in ('RGBA', 'LA', 'P') else img.copy()
+        thumbnail_path = _save_thumbnail(source, thumbnail_path, thumbnail_size)
+    
+    file_size = image_path.stat().st_size
+    return (str(image_path), image_hash, width, height, image_format, file_size,
+            str(thumbnail_path) if thumbnail_path else None)
+
+def _try_compute_image_meta(args: Tuple) -> Tuple[Optional[Tuple], Optional[str]]:
+    """Worker wrapper returning (meta, error) so one bad file doesn't abort a pool map"""
+    try:
+        return _compute_image_meta(*args), None
+    except Exception as e:
+        return None, str(e)
+
+def _close_connections(connections: List[sqlite3.Connection], lock: threading.Lock):
+    """Close and forget every connection in the list.
+    
+    Module-level so the gallery's finalizer doesn't keep the gallery alive.
+    """
+    with lock:
+        closing = list(connections)
+        connections.clear()
+    for conn in closing:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
 class EnhancedImageGallery:
     """Enhanced gallery with tagging, categorization, and search capabilities"""
     
+    # Re-adding a filename updates the row in place (keeping its id, rating and
+    # favorite) instead of OR REPLACE's delete + reinsert
+    _UPSERT_IMAGE_SQL = '''
+        INSERT INTO images
+        (filename, filepath, thumbnail_path, file_size, width, height, format, hash,
+         prompt, negative_prompt, model_used, generation_params, category, favorite)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(filename) DO UPDATE SET
+            filepath = excluded.filepath,
+            thumbnail_path = excluded.thumbnail_path,
+            file_size = excluded.file_size,
+            width = excluded.width,
+            height = excluded.height,
+            format = excluded.format,
+            hash = excluded.hash,
+            prompt = excluded.prompt,
+            negative_prompt = excluded.negative_prompt,
+            model_used = excluded.model_used,
+            generation_params = excluded.generation_params,
+            category = excluded.category,
+            modified_at = CURRENT_TIMESTAMP
+    '''
+    
+    # synchronous=NORMAL is safe under WAL and avoids an fsync per commit
+    _CONNECTION_PRAGMAS = '''
+        PRAGMA busy_timeout=60000;
+        PRAGMA synchronous=NORMAL;
+        PRAGMA temp_store=MEMORY;
+        PRAGMA cache_size=-65536;
+        PRAGMA mmap_size=268435456;
+        PRAGMA recursive_triggers=ON;
+    '''
+    
     def __init__(self, gallery_dir: str = "generated_images"):
         self.gallery_dir = Path(gallery_dir)
         self.images_dir = self.gallery_dir / "images"
@@ -54,14 +304,49 @@ class EnhancedImageGallery:
             "technical": ["sdxl", "sd15", "leonardo-ai", "turbo", "high-resolution", "low-resolution"]
         }
         
+        # Per-thread cached connections
+        self._tls = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        # Closes them when the gallery is garbage collected, or at exit
+        weakref.finalize(self, _close_connections, self._connections, self._connections_lock)
+        
         # Initialize database
         self._init_database()
     
+    def _connect(self) -> sqlite3.Connection:
+        """Return this thread's gallery connection, opening it on first use"""
+        conn = getattr(self._tls, 'conn', None)
+        if conn is None:
+            # check_same_thread=False only so close() and the finalizer can run anywhere;
+            # each connection is still used by its own thread alone
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.executescript(self._CONNECTION_PRAGMAS)
+            self._tls.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+    
+    def connection(self) -> sqlite3.Connection:
+        """This thread's connection, for callers keeping their own tables in gallery.db"""
+        return self._connect()
+    
+    def close(self):
+        """Close the database connections opened by every thread"""
+        _close_connections(self._connections, self._connections_lock)
+        self._tls = threading.local()
+    
     def _init_database(self):
         """Initialize SQLite database for gallery metadata"""
-        conn = sqlite3.connect(str(self.db_path))
+        conn = self._connect()
         cursor = conn.cursor()
         
+        # page_size only applies before the first table is written; WAL is persistent
+        if cursor.execute('PRAGMA page_count').fetchone()[0] == 0:
+            cursor.execute('PRAGMA page_size=4096')
+        cursor.execute('PRAGMA journal_mode=WAL')
+        
         # Create images table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS images (
@@ -131,150 +416,318 @@ class EnhancedImageGallery:
                     INSERT OR IGNORE INTO tags (name, type) VALUES (?, ?)
                 ''', (tag, tag_type))
         
+        # Indexes for the get_images / get_statistics filters
+        # (tags.name is already indexed by its UNIQUE constraint)
+        cursor.executescript('''
+            CREATE INDEX IF NOT EXISTS idx_images_category ON images(category);
+            CREATE INDEX IF NOT EXISTS idx_images_favorite ON images(favorite) WHERE favorite = 1;
+            CREATE INDEX IF NOT EXISTS idx_images_created ON images(created_at DESC);
+            CREATE INDEX IF NOT EXISTS idx_images_rating ON images(rating);
+            CREATE INDEX IF NOT EXISTS idx_images_cat_created ON images(category, created_at DESC);
+            CREATE INDEX IF NOT EXISTS idx_image_tags_tag ON image_tags(tag_id, image_id);
+        ''')
+        
+        # Category image counts are derived rather than maintained on every write;
+        # categories.image_count is left in the schema but no longer updated
+        cursor.execute('''
+            CREATE VIEW IF NOT EXISTS categories_v AS
+            SELECT c.id, c.name, c.description, COUNT(i.id) AS image_count
+            FROM categories c
+            LEFT JOIN images i ON i.category = c.name
+            GROUP BY c.id
+        ''')
+        
+        self._fts_enabled = self._init_fts(cursor)
+        
+        # Gather planner statistics once, then keep them fresh cheaply
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'")
+        if cursor.fetchone() is None:
+            cursor.execute('ANALYZE')
+        else:
+            cursor.execute('PRAGMA optimize')
+        
         conn.commit()
-        conn.close()
+    
+    def _init_fts(self, cursor) -> bool:
+        """Create the FTS5 index over prompts and filenames; False if SQLite lacks FTS5"""
+        cursor.execute("SELECT sql FROM sqlite_master WHERE name = 'images_fts'")
+        row = cursor.fetchone()
+        exists = row is not None
+        if exists and 'trigram' not in row[0]:
+            # Word-tokenized tables from older versions can't answer substring searches
+            cursor.executescript('''
+                DROP TRIGGER IF EXISTS images_fts_insert;
+                DROP TRIGGER IF EXISTS images_fts_delete;
+                DROP TRIGGER IF EXISTS images_fts_update;
+                DROP TABLE images_fts;
+            ''')
+            exists = False
+        try:
+            # External-content table kept in sync by triggers
+            # (recursive_triggers makes INSERT OR REPLACE fire the delete trigger too)
+            cursor.executescript('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS images_fts USING fts5(
+                    prompt, negative_prompt, filename,
+                    content='images', content_rowid='id', tokenize='trigram'
+                );
+                CREATE TRIGGER IF NOT EXISTS images_fts_insert AFTER INSERT ON images BEGIN
+                    INSERT INTO images_fts(rowid, prompt, negative_prompt, filename)
+                    VALUES (new.id, new.prompt, new.negative_prompt, new.filename);
+                END;
+                CREATE TRIGGER IF NOT EXISTS images_fts_delete AFTER DELETE ON images BEGIN
+                    INSERT INTO images_fts(images_fts, rowid, prompt, negative_prompt, filename)
+                    VALUES ('delete', old.id, old.prompt, old.negative_prompt, old.filename);
+                END;
+                CREATE TRIGGER IF NOT EXISTS images_fts_update AFTER UPDATE ON images BEGIN
+                    INSERT INTO images_fts(images_fts, rowid, prompt, negative_prompt, filename)
+                    VALUES ('delete', old.id, old.prompt, old.negative_prompt, old.filename);
+                    INSERT INTO images_fts(rowid, prompt, negative_prompt, filename)
+                    VALUES (new.id, new.prompt, new.negative_prompt, new.filename);
+                END;
+            ''')
+        except sqlite3.OperationalError as e:
+            print(f"[Gallery] Full-text search unavailable, using LIKE: {e}")
+            return False
+        
+        # Index rows added before the FTS table existed
+        if not exists:
+            cursor.execute("INSERT INTO images_fts(images_fts) VALUES ('rebuild')")
+        return True
+    
+    @staticmethod
+    def _fts_phrase(text: str) -> Optional[str]:
+        """Quote text as an FTS5 trigram substring phrase, or None if it is too short to index"""
+        if len(text) < 3:
+            return None
+        return '"' + text.replace('"', '""') + '"'
     
     def add_image(self, image_path: str, prompt: str = "", negative_prompt: str = "", 
                   model_used: str = "", generation_params: Dict = None, 
-                  category: str = "other", tags: List[str] = None) -> int:
-        """Add an image to the gallery with metadata"""
+                  category: str = "other", tags: List[str] = None,
+                  image: 'Image.Image' = None, image_format: str = None) -> int:
+        """Add an image to the gallery with metadata.
+        
+        Pass the already-decoded ``image`` (and its ``image_format``, e.g. "PNG")
+        to hash and thumbnail it without reading the file back.
+        """
         try:
-            image_path = Path(image_path)
-            
-            # Generate image hash
-            image_hash = self._generate_image_hash(image_path)
-            
-            # Get image dimensions
-            with Image.open(image_path) as img:
-                width, height = img.size
-                image_format = img.format
-            
-            # Create thumbnail
-            thumbnail_path = self._create_thumbnail(image_path)
+            meta = None
+            if image is not None:
+                meta = _compute_image_meta_from_image(image, image_path, image_format, self.thumbnails_dir)
+            row = self._prepare_image_row(image_path, prompt, negative_prompt, model_used,
+                                          generation_params, category, meta=meta)
             
-            # Get file size
-            file_size = image_path.stat().st_size
-            
-            conn = sqlite3.connect(str(self.db_path))
+            conn = self._connect()
             cursor = conn.cursor()
             
-            # Insert image record
-            cursor.execute('''
-                INSERT OR REPLACE INTO images 
-                (filename, filepath, thumbnail_path, file_size, width, height, format, hash,
-                 prompt, negative_prompt, model_used, generation_params, category, favorite)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                image_path.name,
-                str(image_path),
-                str(thumbnail_path) if thumbnail_path else None,
-                file_size,
-                width,
-                height,
-                image_format,
-                image_hash,
-                prompt,
-                negative_prompt,
-                model_used,
-                json.dumps(generation_params) if generation_params else None,
-                category,
-                False
-            ))
+            cursor.execute('SELECT id FROM images WHERE filename = ?', (row[0],))
+            existing = cursor.fetchone()
             
-            image_id = cursor.lastrowid
+            # Insert or update image record (lastrowid is only meaningful for an insert)
+            cursor.execute(self._UPSERT_IMAGE_SQL, row)
+            image_id = existing['id'] if existing else cursor.lastrowid
             
             # Add tags
             if tags:
                 self._add_image_tags(cursor, image_id, tags)
             
-            # Update category count
-            cursor.execute('''
-                UPDATE categories SET image_count = image_count + 1 WHERE name = ?
-            ''', (category,))
-            
             conn.commit()
-            conn.close()
             
-            print(f"[Gallery] Added image: {image_path.name} (ID: {image_id})")
+            print(f"[Gallery] Added image: {row[0]} (ID: {image_id})")
             return image_id
             
         except Exception as e:
+            self._connect().rollback()
             print(f"[Gallery] Error adding image: {e}")
             return -1
     
-    def _generate_image_hash(self, image_path: Path) -> str:
-        """Generate unique hash for image"""
-        try:
-            with Image.open(image_path) as img:
-                # Use a small resized version for hashing
-                img_resized = img.resize((8, 8))
-                img_bytes = img_resized.tobytes()
-                return hashlib.md5(img_bytes).hexdigest()
-        except:
-            # Fallback to file hash
-            with open(image_path, 'rb') as f:
-                return hashlib.md5(f.read()).hexdigest()
-    
-    def _create_thumbnail(self, image_path: Path, size: Tuple[int, int] = (200, 200)) -> Optional[Path]:
-        """Create thumbnail for image"""
+    def add_images_bulk(self, records: List[Dict], metas: List[Optional[Tuple]] = None) -> List[int]:
+        """Add many images in a single transaction.
+        
+        Each record is a dict with the same keys as ``add_image`` arguments
+        (``image_path`` required). ``metas`` optionally supplies precomputed
+        ``_compute_image_meta`` results in record order (None marks a failed
+        image). Returns the image IDs in record order, with -1 for records
+        that could not be read.
+        """
+        rows = []
+        row_tags = []
+        for index, record in enumerate(records):
+            meta = metas[index] if metas is not None else None
+            if metas is not None and meta is None:
+                # Already reported by whoever computed the metadata
+                rows.append(None)
+                row_tags.append([])
+                continue
+            try:
+                rows.append(self._prepare_image_row(
+                    record['image_path'],
+                    record.get('prompt', ""),
+                    record.get('negative_prompt', ""),
+                    record.get('model_used', ""),
+                    record.get('generation_params'),
+                    record.get('category') or "other",
+                    meta,
+                ))
+                row_tags.append(record.get('tags') or [])
+            except Exception as e:
+                print(f"[Gallery] Error preparing image {record.get('image_path')}: {e}")
+                rows.append(None)
+                row_tags.append([])
+        
+        valid_rows = [row for row in rows if row is not None]
+        if not valid_rows:
+            return [-1] * len(rows)
+        
+        conn = self._connect()
+        cursor = conn.cursor()
         try:
-            thumbnail_path = self.thumbnails_dir / f"thumb_{image_path.stem}.jpg"
+            cursor.execute("BEGIN")
+            filenames = sorted({row[0] for row in valid_rows})
+            cursor.executemany(self._UPSERT_IMAGE_SQL, valid_rows)
+            
+            # lastrowid is undefined after executemany, so map filenames back to IDs
+            filename_ids = self._select_ids_by_name(cursor, 'images', 'filename', filenames)
+            image_ids = [filename_ids.get(row[0], -1) if row else -1 for row in rows]
             
-            if not thumbnail_path.exists():
-                with Image.open(image_path) as img:
-                    # Convert to RGB if necessary
-                    if img.mode in ('RGBA', 'LA', 'P'):
-                        img = img.convert('RGB')
-                    
-                    # Create thumbnail
-                    img.thumbnail(size, Image.Resampling.LANCZOS)
-                    img.save(thumbnail_path, 'JPEG', quality=85)
+            tagged = {}
+            for image_id, tags in zip(image_ids, row_tags):
+                names = [tag.lower().strip() for tag in tags]
+                names = list(dict.fromkeys(name for name in names if name))
+                if image_id != -1 and names:
+                    tagged.setdefault(image_id, []).extend(names)
             
-            return thumbnail_path
+            tag_names = sorted({name for names in tagged.values() for name in names})
+            if tag_names:
+                cursor.executemany('INSERT OR IGNORE INTO tags (name) VALUES (?)',
+                                   [(name,) for name in tag_names])
+                tag_ids = self._select_ids_by_name(cursor, 'tags', 'name', tag_names)
+                cursor.executemany('INSERT OR IGNORE INTO image_tags (image_id, tag_id) VALUES (?, ?)',
+                                   [(image_id, tag_ids[name])
+                                    for image_id, names in tagged.items() for name in names])
+                usage = Counter(tag_ids[name] for names in tagged.values() for name in names)
+                cursor.executemany('UPDATE tags SET usage_count = usage_count + ? WHERE id = ?',
+                                   [(count, tag_id) for tag_id, count in usage.items()])
             
+            conn.commit()
         except Exception as e:
-            print(f"[Gallery] Error creating thumbnail: {e}")
-            return None
+            conn.rollback()
+            print(f"[Gallery] Error adding images in bulk: {e}")
+            return [-1] * len(rows)
+        
+        print(f"[Gallery] Added {len(valid_rows)} images in bulk")
+        return image_ids
+    
+    def add_images_parallel(self, records: List, workers: int = None) -> List[int]:
+        """Add many images, hashing and thumbnailing them across worker processes.
+        
+        ``records`` are ``add_images_bulk`` dicts or plain image paths. The
+        results are inserted with a single ``add_images_bulk`` transaction.
+        """
+        records = [record if isinstance(record, dict) else {'image_path': record}
+                   for record in records]
+        jobs = [(record['image_path'], self.thumbnails_dir) for record in records]
+        
+        metas = []
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+            for job, (meta, error) in zip(jobs, executor.map(_try_compute_image_meta, jobs, chunksize=16)):
+                if error:
+                    print(f"[Gallery] Error preparing image {job[0]}: {error}")
+                metas.append(meta)
+        
+        return self.add_images_bulk(records, metas)
+    
+    def _prepare_image_row(self, image_path: str, prompt: str = "", negative_prompt: str = "",
+                           model_used: str = "", generation_params: Dict = None,
+                           category: str = "other", meta: Tuple = None) -> Tuple:
+        """Build the parameter tuple for _UPSERT_IMAGE_SQL, computing image metadata unless given"""
+        if meta is None:
+            meta = _compute_image_meta(image_path, self.thumbnails_dir)
+        path, image_hash, width, height, image_format, file_size, thumbnail_path = meta
+        
+        return (
+            Path(path).name,
+            path,
+            thumbnail_path,
+            file_size,
+            width,
+            height,
+            image_format,
+            image_hash,
+            prompt,
+            negative_prompt,
+            model_used,
+            _json_dumps(generation_params) if generation_params else None,
+            category,
+            False
+        )
+    
+    def get_id_by_filename(self, filenames: List[str]) -> Optional[int]:
+        """Row id of the first of ``filenames`` that is in the gallery (UNIQUE-index lookup)"""
+        ids = self._select_ids_by_name(self._connect().cursor(), 'images', 'filename', filenames)
+        for filename in filenames:
+            if filename in ids:
+                return ids[filename]
+        return None
+    
+    @staticmethod
+    def _select_ids_by_name(cursor, table: str, column: str, names: List[str]) -> Dict[str, int]:
+        """Look up row IDs by a unique column, chunked below SQLite's bound-variable limit"""
+        ids = {}
+        for start in range(0, len(names), 500):
+            chunk = names[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            cursor.execute(f'SELECT {column}, id FROM {table} WHERE {column} IN ({placeholders})', chunk)
+            ids.update((row[0], row[1]) for row in cursor.fetchall())
+        return ids
+    
+    def _generate_image_hash(self, image_path: Path) -> str:
+        """Generate a 64-bit perceptual hash (pHash) as 16 hex digits"""
+        return _generate_image_hash(image_path)
+    
+    def _create_thumbnail(self, image_path: Path, size: Tuple[int, int] = _THUMBNAIL_SIZE) -> Optional[Path]:
+        """Create thumbnail for image"""
+        return _create_thumbnail(image_path, self.thumbnails_dir, size)
     
     def _add_image_tags(self, cursor, image_id: int, tags: List[str]):
         """Add tags to an image"""
-        for tag in tags:
-            tag = tag.lower().strip()
-            if not tag:
-                continue
-                
-            # Insert tag if it doesn't exist
-            cursor.execute('''
-                INSERT OR IGNORE INTO tags (name) VALUES (?)
-            ''', (tag,))
-            
-            # Get tag ID
-            cursor.execute('SELECT id FROM tags WHERE name = ?', (tag,))
-            tag_id = cursor.fetchone()[0]
-            
-            # Link image and tag
-            cursor.execute('''
-                INSERT OR IGNORE INTO image_tags (image_id, tag_id) VALUES (?, ?)
-            ''', (image_id, tag_id))
-            
-            # Update tag usage count
-            cursor.execute('''
-                UPDATE tags SET usage_count = usage_count + 1 WHERE id = ?
-            ''', (tag_id,))
+        tags = sorted({tag.lower().strip() for tag in tags if tag.strip()})
+        if not tags:
+            return
+        
+        # Insert tags that don't exist yet, then resolve all IDs at once
+        cursor.executemany('INSERT OR IGNORE INTO tags (name) VALUES (?)', [(tag,) for tag in tags])
+        tag_ids = list(self._select_ids_by_name(cursor, 'tags', 'name', tags).values())
+        
+        # Link image and tags
+        cursor.executemany('INSERT OR IGNORE INTO image_tags (image_id, tag_id) VALUES (?, ?)',
+                           [(image_id, tag_id) for tag_id in tag_ids])
+        
+        # Update tag usage counts
+        placeholders = ','.join('?' * len(tag_ids))
+        cursor.execute(f'UPDATE tags SET usage_count = usage_count + 1 WHERE id IN ({placeholders})', tag_ids)
     
     def get_images(self, category: str = None, tags: List[str] = None, 
                    favorite_only: bool = False, search_term: str = None,
                    sort_by: str = "created_at", order: str = "DESC",
                    limit: int = None, offset: int = 0) -> List[Dict]:
         """Get images with filtering and sorting"""
-        conn = sqlite3.connect(str(self.db_path))
-        conn.row_factory = sqlite3.Row
+        return list(self.iter_images(category=category, tags=tags, favorite_only=favorite_only,
+                                     search_term=search_term, sort_by=sort_by, order=order,
+                                     limit=limit, offset=offset))
+    
+    def iter_images(self, category: str = None, tags: List[str] = None,
+                    favorite_only: bool = False, search_term: str = None,
+                    sort_by: str = "created_at", order: str = "DESC",
+                    limit: int = None, offset: int = 0) -> Iterator[Dict]:
+        """Yield images with filtering and sorting, fetching rows in small batches"""
+        conn = self._connect()
         cursor = conn.cursor()
         
         # Build query
         query = '''
             SELECT i.*, 
-                   GROUP_CONCAT(t.name, ',') as tags,
+                   GROUP_CONCAT(DISTINCT t.name) as tags,
                    c.description as category_description
             FROM images i
             LEFT JOIN image_tags it ON i.id = it.image_id
@@ -284,6 +737,18 @@ class EnhancedImageGallery:
         
         conditions = []
         params = []
+        having = ""
+        
+        # Match all requested tags with one join + HAVING instead of an EXISTS per tag
+        if tags:
+            tag_names = sorted({tag.lower() for tag in tags})
+            placeholders = ",".join("?" * len(tag_names))
+            query += f'''
+            JOIN image_tags itf ON itf.image_id = i.id
+            JOIN tags tf ON tf.id = itf.tag_id AND tf.name IN ({placeholders})
+            '''
+            params.extend(tag_names)
+            having = " HAVING COUNT(DISTINCT tf.name) = ?"
         
         if category:
             conditions.append("i.category = ?")
@@ -293,67 +758,133 @@ class EnhancedImageGallery:
             conditions.append("i.favorite = 1")
         
         if search_term:
+            # Narrow candidates through the trigram index; LIKE keeps the exact semantics
+            phrase = self._fts_phrase(search_term) if self._fts_enabled else None
+            if phrase:
+                conditions.append("i.id IN (SELECT rowid FROM images_fts WHERE images_fts MATCH ?)")
+                params.append("{prompt filename} : " + phrase)
             conditions.append("(i.prompt LIKE ? OR i.filename LIKE ?)")
             params.extend([f"%{search_term}%", f"%{search_term}%"])
         
-        if tags:
-            tag_conditions = []
-            for tag in tags:
-                tag_conditions.append("EXISTS (SELECT 1 FROM image_tags it2 JOIN tags t2 ON it2.tag_id = t2.id WHERE it2.image_id = i.id AND t2.name = ?)")
-                params.append(tag.lower())
-            conditions.append(f"({' AND '.join(tag_conditions)})")
-        
         if conditions:
             query += " WHERE " + " AND ".join(conditions)
         
-        query += f" GROUP BY i.id ORDER BY i.{sort_by} {order}"
+        query += " GROUP BY i.id" + having
+        if having:
+            params.append(len(tag_names))
+        query += f" ORDER BY i.{sort_by} {order}"
         
         if limit:
             query += " LIMIT ? OFFSET ?"
             params.extend([limit, offset])
         
         cursor.execute(query, params)
-        images = []
         
-        for row in cursor.fetchall():
-            image_dict = dict(row)
-            if image_dict['tags']:
-                image_dict['tags'] = image_dict['tags'].split(',')
-            else:
-                image_dict['tags'] = []
-            
-            if image_dict['generation_params']:
-                image_dict['generation_params'] = json.loads(image_dict['generation_params'])
-            else:
-                image_dict['generation_params'] = {}
-            
-            images.append(image_dict)
+        while True:
+            rows = cursor.fetchmany(256)
+            if not rows:
+                break
+            for row in rows:
+                yield self._row_to_image_dict(row)
+    
+    @staticmethod
+    def _row_to_image_dict(row: sqlite3.Row) -> Dict:
+        """Convert a get_images row, splitting tags and decoding generation_params"""
+        image_dict = dict(row)
+        if image_dict['tags']:
+            image_dict['tags'] = image_dict['tags'].split(',')
+        else:
+            image_dict['tags'] = []
+        
+        if image_dict['generation_params']:
+            image_dict['generation_params'] = _json_loads(image_dict['generation_params'])
+        else:
+            image_dict['generation_params'] = {}
         
-        conn.close()
-        return images
+        return image_dict
+    
+    def _load_phashes(self, cursor) -> Tuple['np.ndarray', 'np.ndarray']:
+        """Return (ids, hashes) for every image with a 64-bit pHash"""
+        np = _numpy()
+        # Older rows hold 32-digit MD5 hashes, which carry no similarity information
+        cursor.execute('SELECT id, hash FROM images WHERE length(hash) = 16')
+        rows = cursor.fetchall()
+        ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+        hashes = np.fromiter((int(row[1], 16) for row in rows), dtype=np.uint64, count=len(rows))
+        return ids, hashes
+    
+    def find_similar(self, image_id: int, max_distance: int = 5) -> List[Dict]:
+        """Find images whose perceptual hash is within max_distance bits of image_id"""
+        np = _numpy()
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT hash FROM images WHERE id = ?', (image_id,))
+        row = cursor.fetchone()
+        if not row or not row[0] or len(row[0]) != 16:
+            return []
+        target = np.uint64(int(row[0], 16))
+        
+        ids, hashes = self._load_phashes(cursor)
+        distances = _popcount64(hashes ^ target)
+        matches = np.flatnonzero((distances <= max_distance) & (ids != image_id))
+        matches = matches[np.argsort(distances[matches], kind='stable')]
+        if not matches.size:
+            return []
+        
+        details = {}
+        match_ids = ids[matches].tolist()
+        for start in range(0, len(match_ids), 500):
+            chunk = match_ids[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            cursor.execute(f'SELECT id, filename, filepath FROM images WHERE id IN ({placeholders})', chunk)
+            details.update((found[0], found) for found in cursor.fetchall())
+        
+        return [{'id': other_id, 'filename': details[other_id]['filename'],
+                 'filepath': details[other_id]['filepath'], 'distance': int(distance)}
+                for other_id, distance in zip(match_ids, distances[matches].tolist())]
+    
+    def find_near_duplicates(self, max_distance: int = 5, block_size: int = 1024) -> List[Tuple[int, int, int]]:
+        """Find every pair of images within max_distance bits of each other.
+        
+        Returns ``(id_a, id_b, distance)`` tuples. The pairwise distance matrix is
+        computed in block_size x block_size tiles (8 MiB each at the default) so
+        memory stays bounded on large galleries.
+        """
+        np = _numpy()
+        ids, hashes = self._load_phashes(self._connect().cursor())
+        pairs = []
+        for row_start in range(0, len(hashes), block_size):
+            row_block = hashes[row_start:row_start + block_size]
+            for col_start in range(row_start, len(hashes), block_size):
+                col_block = hashes[col_start:col_start + block_size]
+                distances = _popcount64(row_block[:, None] ^ col_block[None, :])
+                rows, cols = np.nonzero(distances <= max_distance)
+                if row_start == col_start:
+                    # Diagonal tile: keep each pair once and skip self-matches
+                    upper = cols > rows
+                    rows, cols = rows[upper], cols[upper]
+                pairs.extend(zip(ids[row_start + rows].tolist(), ids[col_start + cols].tolist(),
+                                 distances[rows, cols].tolist()))
+        return pairs
     
     def get_categories(self) -> List[Dict]:
         """Get all categories with image counts"""
-        conn = sqlite3.connect(str(self.db_path))
-        conn.row_factory = sqlite3.Row
+        conn = self._connect()
         cursor = conn.cursor()
         
         cursor.execute('''
-            SELECT c.*, COUNT(i.id) as actual_count
-            FROM categories c
-            LEFT JOIN images i ON c.name = i.category
-            GROUP BY c.id
-            ORDER BY actual_count DESC
+            SELECT *, image_count as actual_count
+            FROM categories_v
+            ORDER BY image_count DESC
         ''')
         
         categories = [dict(row) for row in cursor.fetchall()]
-        conn.close()
         return categories
     
     def get_tags(self, tag_type: str = None, limit: int = 50) -> List[Dict]:
         """Get popular tags"""
-        conn = sqlite3.connect(str(self.db_path))
-        conn.row_factory = sqlite3.Row
+        conn = self._connect()
         cursor = conn.cursor()
         
         query = '''
@@ -375,13 +906,12 @@ class EnhancedImageGallery:
         
         cursor.execute(query, params)
         tags = [dict(row) for row in cursor.fetchall()]
-        conn.close()
         return tags
     
     def update_image_tags(self, image_id: int, tags: List[str]) -> bool:
         """Update tags for an image"""
         try:
-            conn = sqlite3.connect(str(self.db_path))
+            conn = self._connect()
             cursor = conn.cursor()
             
             # Remove existing tags
@@ -391,53 +921,41 @@ class EnhancedImageGallery:
             self._add_image_tags(cursor, image_id, tags)
             
             conn.commit()
-            conn.close()
             return True
             
         except Exception as e:
+            self._connect().rollback()
             print(f"[Gallery] Error updating tags: {e}")
             return False
     
     def update_image_category(self, image_id: int, category: str) -> bool:
         """Update image category"""
         try:
-            conn = sqlite3.connect(str(self.db_path))
+            conn = self._connect()
             cursor = conn.cursor()
             
-            # Get old category
-            cursor.execute('SELECT category FROM images WHERE id = ?', (image_id,))
-            old_category = cursor.fetchone()
-            
-            if old_category:
-                old_category = old_category[0]
-                
-                # Update image category
-                cursor.execute('UPDATE images SET category = ? WHERE id = ?', (category, image_id))
-                
-                # Update category counts
-                cursor.execute('UPDATE categories SET image_count = image_count - 1 WHERE name = ?', (old_category,))
-                cursor.execute('UPDATE categories SET image_count = image_count + 1 WHERE name = ?', (category,))
-                
-                conn.commit()
-                conn.close()
-                return True
+            # Update image category (counts are derived by the categories_v view)
+            cursor.execute('UPDATE images SET category = ? WHERE id = ?', (category, image_id))
+            conn.commit()
+            return cursor.rowcount > 0
             
         except Exception as e:
+            self._connect().rollback()
             print(f"[Gallery] Error updating category: {e}")
             return False
     
     def toggle_favorite(self, image_id: int) -> bool:
         """Toggle favorite status of an image"""
         try:
-            conn = sqlite3.connect(str(self.db_path))
+            conn = self._connect()
             cursor = conn.cursor()
             
             cursor.execute('UPDATE images SET favorite = NOT favorite WHERE id = ?', (image_id,))
             conn.commit()
-            conn.close()
             return True
             
         except Exception as e:
+            self._connect().rollback()
             print(f"[Gallery] Error toggling favorite: {e}")
             return False
     
@@ -447,36 +965,36 @@ class EnhancedImageGallery:
             if not 1 <= rating <= 5:
                 return False
                 
-            conn = sqlite3.connect(str(self.db_path))
+            conn = self._connect()
             cursor = conn.cursor()
             
             cursor.execute('UPDATE images SET rating = ? WHERE id = ?', (rating, image_id))
             conn.commit()
-            conn.close()
             return True
             
         except Exception as e:
+            self._connect().rollback()
             print(f"[Gallery] Error rating image: {e}")
             return False
     
     def get_statistics(self) -> Dict:
         """Get gallery statistics"""
-        conn = sqlite3.connect(str(self.db_path))
+        conn = self._connect()
         cursor = conn.cursor()
         
         stats = {}
         
-        # Total images
-        cursor.execute('SELECT COUNT(*) FROM images')
-        stats['total_images'] = cursor.fetchone()[0]
-        
-        # Total favorites
-        cursor.execute('SELECT COUNT(*) FROM images WHERE favorite = 1')
-        stats['total_favorites'] = cursor.fetchone()[0]
-        
-        # Average rating
-        cursor.execute('SELECT AVG(rating) FROM images WHERE rating > 0')
-        avg_rating = cursor.fetchone()[0]
+        # Scalar totals in a single scan of images
+        cursor.execute('''
+            SELECT COUNT(*),
+                   COALESCE(SUM(favorite = 1), 0),
+                   AVG(NULLIF(rating, 0)),
+                   COALESCE(SUM(file_size), 0)
+            FROM images
+        ''')
+        total_images, total_favorites, avg_rating, total_size = cursor.fetchone()
+        stats['total_images'] = total_images
+        stats['total_favorites'] = total_favorites
         stats['average_rating'] = round(avg_rating, 2) if avg_rating else 0
         
         # Most used tags
@@ -492,11 +1010,9 @@ class EnhancedImageGallery:
         
         # Category distribution
         cursor.execute('''
-            SELECT c.name, c.description, COUNT(i.id) as count
-            FROM categories c
-            LEFT JOIN images i ON c.name = i.category
-            GROUP BY c.id
-            ORDER BY count DESC
+            SELECT name, description, image_count
+            FROM categories_v
+            ORDER BY image_count DESC
         ''')
         stats['category_distribution'] = [
             {'name': row[0], 'description': row[1], 'count': row[2]} 
@@ -504,25 +1020,29 @@ class EnhancedImageGallery:
         ]
         
         # Storage usage
-        cursor.execute('SELECT SUM(file_size) FROM images')
-        total_size = cursor.fetchone()[0] or 0
         stats['total_storage_mb'] = round(total_size / (1024 * 1024), 2)
         
-        conn.close()
         return stats
     
     def search_suggestions(self, query: str, limit: int = 10) -> List[str]:
         """Get search suggestions for autocomplete"""
-        conn = sqlite3.connect(str(self.db_path))
+        conn = self._connect()
         cursor = conn.cursor()
         
         suggestions = []
         
-        # Search in prompts
-        cursor.execute('''
-            SELECT DISTINCT prompt FROM images 
-            WHERE prompt LIKE ? LIMIT ?
-        ''', (f"%{query}%", limit))
+        # Search in prompts (substring match through the trigram index when available)
+        phrase = self._fts_phrase(query) if self._fts_enabled else None
+        if phrase:
+            cursor.execute('''
+                SELECT DISTINCT prompt FROM images_fts
+                WHERE images_fts MATCH ? LIMIT ?
+            ''', (f"prompt : {phrase}", limit))
+        else:
+            cursor.execute('''
+                SELECT DISTINCT prompt FROM images 
+                WHERE prompt LIKE ? LIMIT ?
+            ''', (f"%{query}%", limit))
         
         for row in cursor.fetchall():
             suggestions.append(row[0])
@@ -536,13 +1056,11 @@ class EnhancedImageGallery:
         for row in cursor.fetchall():
             suggestions.append(row[0])
         
-        conn.close()
         return suggestions[:limit]
     
     def export_metadata(self, format: str = "json") -> str:
         """Export all gallery metadata"""
-        conn = sqlite3.connect(str(self.db_path))
-        conn.row_factory = sqlite3.Row
+        conn = self._connect()
         cursor = conn.cursor()
         
         cursor.execute('SELECT * FROM images')
@@ -551,23 +1069,19 @@ class EnhancedImageGallery:
         for row in cursor.fetchall():
             image_dict = dict(row)
             if image_dict['generation_params']:
-                image_dict['generation_params'] = json.loads(image_dict['generation_params'])
+                image_dict['generation_params'] = _json_loads(image_dict['generation_params'])
             images.append(image_dict)
         
-        conn.close()
-        
         if format.lower() == "json":
-            return json.dumps(images, indent=2, default=str)
+            return _json_dumps(images, indent=True)
         else:
             # CSV format
-            import csv
-            import io
-            
             output = io.StringIO()
             if images:
-                writer = csv.DictWriter(output, fieldnames=images[0].keys())
-                writer.writeheader()
-                writer.writerows(images)
+                # Every row has the same columns, so write plain tuples instead of dicts
+                writer = csv.writer(output)
+                writer.writerow(images[0].keys())
+                writer.writerows(tuple(image.values()) for image in images)
             
             return output.getvalue()
 
@@ -579,4 +1093,7 @@ def create_enhanced_gallery(gallery_dir: str = "generated_images") -> EnhancedIm
 def get_gallery_stats(gallery_dir: str = "generated_images") -> Dict:
     """Get quick gallery statistics"""
     gallery = EnhancedImageGallery(gallery_dir)
-    return gallery.get_statistics()
+    try:
+        return gallery.get_statistics()
+    finally:
+        gallery.close()
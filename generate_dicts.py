@@ -3,6 +3,9 @@ import json
 data = json.load(open("clean_models.json"))
 models = data.get("custom_models", [])
 
+# Single-character key cleanup done in one str.translate pass
+KEY_TRANSLATION = str.maketrans({" ": "-", ".": "-", "(": None, ")": None, "'": None})
+
 mapping_str = ""
 setup_str = ""
 
@@ -11,7 +14,7 @@ for m in models:
     name = m["name"]
     desc = m.get("description", "").replace('"', '\\"')
     # Create a nice key: lowercase, replace spaces with hyphen, remove quotes/parentheses
-    key = name.lower().replace(" ", "-").replace(".", "-").replace("(", "").replace(")", "").replace("'", "")
+    key = name.lower().translate(KEY_TRANSLATION)
 
     # For mapping
     mapping_str += f'            "{key}": {{"name": "{name}", "id": "{model_id}", "api_version": "v1", "endpoint": "generations"}},\n'
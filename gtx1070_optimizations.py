@@ -3,19 +3,45 @@ GTX 1070 Specific Optimizations for 8GB VRAM
 This module contains additional optimizations specifically tuned for GTX 1070 GPUs
 """
 
-import torch
+from __future__ import annotations
+
 import gc
-from diffusers import StableDiffusionPipeline
+import logging
+import time
 import warnings
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+# torch and diffusers are imported on first use, so the settings/tips helpers stay cheap
+if TYPE_CHECKING:
+    from diffusers import StableDiffusionPipeline
+
+logger = logging.getLogger(__name__)
+
+@lru_cache(maxsize=1)
+def _total_vram_gb() -> float:
+    """Total VRAM of device 0 in GB, read once since get_device_properties builds a new struct per call"""
+    import torch
+    return torch.cuda.get_device_properties(0).total_memory / 1024**3
 
 class GTX1070Optimizer:
     """GTX 1070 specific optimizations for maximum VRAM efficiency"""
     
+    # monitor_vram_usage reuses its last reading for calls closer together than this
+    _VRAM_POLL_INTERVAL = 0.5
+    _last_vram_poll = 0.0
+    _last_vram_report = None
+    
+    # cleanup_memory only runs a full gc.collect() on every Nth call
+    _GC_EVERY = 4
+    _cleanup_calls = 0
+    
     @staticmethod
     def optimize_for_gtx1070(pipe) -> StableDiffusionPipeline:
         """
         Apply GTX 1070 specific optimizations to the pipeline
         """
+        import torch
         
         # Check if this is an SDXL pipeline
         is_sdxl = "StableDiffusionXLPipeline" in str(type(pipe))
@@ -94,35 +120,70 @@ class GTX1070Optimizer:
             "recommended_scheduler": "DPMSolverMultistepScheduler"
         }
     
-    @staticmethod
-    def monitor_vram_usage():
+    @classmethod
+    def monitor_vram_usage(cls, force: bool = False):
         """
         Monitor VRAM usage and provide warnings
+        
+        Returns (allocated, reserved, total) in GB, or None without CUDA.
+        Unless force=True (for pre/post generation checks), this is a no-op that
+        returns the last reading when INFO logging is off, so per-step calls don't
+        pay for the CUDA queries.
         """
+        if not force and not logger.isEnabledFor(logging.INFO):
+            return cls._last_vram_report
+        
+        import torch
+        
         if torch.cuda.is_available():
+            now = time.monotonic()
+            if not force and cls._last_vram_report is not None and now - cls._last_vram_poll < cls._VRAM_POLL_INTERVAL:
+                return cls._last_vram_report
+            
             allocated = torch.cuda.memory_allocated() / 1024**3
             reserved = torch.cuda.memory_reserved() / 1024**3
-            total = torch.cuda.get_device_properties(0).total_memory / 1024**3
+            total = _total_vram_gb()
             
             # Show both allocated and reserved for better understanding
-            print(f"VRAM Usage: {allocated:.2f}GB allocated, {reserved:.2f}GB reserved, {total:.2f}GB total")
+            logger.info("VRAM Usage: %.2fGB allocated, %.2fGB reserved, %.2fGB total", allocated, reserved, total)
             
             # Use reserved memory for warnings (closer to Task Manager)
             if reserved > 7.0:
                 warnings.warn("VRAM usage is very high! Consider reducing resolution or steps.")
             elif reserved > 6.0:
-                print("⚠️  VRAM usage is moderate, monitor closely")
+                logger.info("⚠️  VRAM usage is moderate, monitor closely")
             else:
-                print("✅ VRAM usage is within safe limits")
+                logger.info("✅ VRAM usage is within safe limits")
+            
+            cls._last_vram_poll = now
+            cls._last_vram_report = (allocated, reserved, total)
+            return cls._last_vram_report
+        return None
     
-    @staticmethod
-    def cleanup_memory():
+    @classmethod
+    def cleanup_memory(cls, force_gc: bool = False):
         """
         Aggressive memory cleanup for GTX 1070
+        
+        Releases cached CUDA blocks without a device barrier; the garbage
+        collector runs every few calls, or always with force_gc=True.
         """
-        gc.collect()
+        import torch
+        
+        cls._cleanup_calls += 1
+        if force_gc or cls._cleanup_calls % cls._GC_EVERY == 0:
+            gc.collect()
         if torch.cuda.is_available():
             torch.cuda.empty_cache()
+    
+    @staticmethod
+    def sync_for_measurement():
+        """
+        Wait for pending CUDA work, so a following VRAM reading is exact
+        """
+        import torch
+        
+        if torch.cuda.is_available():
             torch.cuda.synchronize()
     
     @staticmethod
@@ -161,11 +222,13 @@ class GTX1070Optimizer:
         """
         Check if the system is GTX 1070 compatible
         """
+        import torch
+        
         if not torch.cuda.is_available():
             return False, "CUDA not available"
         
         gpu_name = torch.cuda.get_device_name(0).lower()
-        vram_gb = torch.cuda.get_device_properties(0).total_memory / 1024**3
+        vram_gb = _total_vram_gb()
         
         is_gtx1070 = "gtx 1070" in gpu_name
         has_8gb = vram_gb >= 7.5
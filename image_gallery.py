@@ -4,20 +4,146 @@ Handles saving, loading, and managing generated images
 Enhanced with tagging and categorization support
 """
 
+from __future__ import annotations
+
 import os
 import json
 import base64
+import time
+import sqlite3
+import threading
 from datetime import datetime
-from typing import List, Dict, Any, Optional
-from PIL import Image
-import io
+from types import MappingProxyType
+from typing import TYPE_CHECKING, List, Dict, Any, Mapping, Optional, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from enhanced_gallery import EnhancedImageGallery
 
+# Pillow is only needed for PIL inputs and compaction, so it is imported on use
+if TYPE_CHECKING:
+    from PIL import Image
+
+# pybase64 is optional - SIMD codecs for the full-image base64 hops
+try:
+    import pybase64
+    PYBASE64_AVAILABLE = True
+except ImportError:
+    PYBASE64_AVAILABLE = False
+
+# orjson is optional - faster (de)serialization of the JSON metadata columns
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# pyahocorasick is optional - one automaton pass finds every keyword in a prompt
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# Stored formats and their file extensions
+IMAGE_EXTENSIONS = {"png": "png", "jpeg": "jpg"}
+JPEG_QUALITY = 92
+
+# base64 text is decoded to disk in slices of this many characters (a multiple of 4)
+BASE64_DECODE_CHUNK = 1 << 20
+
+def _safe_remove(path: str):
+    """Remove a file, ignoring one that is already gone"""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+def _json_dumps(obj) -> str:
+    """Serialize to a compact JSON string"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, separators=(",", ":"))
+
+def _json_loads(data):
+    """Parse JSON from a string or bytes"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _b64decode(data) -> bytes:
+    """Decode base64 text, with pybase64's SIMD codec when available"""
+    if PYBASE64_AVAILABLE:
+        return pybase64.b64decode(data, validate=False)
+    return base64.b64decode(data)
+
+# Keyword tables for auto_categorize_image and extract_tags_from_prompt (read-only)
+CATEGORY_KEYWORDS = MappingProxyType({
+    "portrait": ("portrait", "face", "person", "woman", "man", "people", "headshot"),
+    "landscape": ("landscape", "nature", "mountain", "forest", "ocean", "sky", "sunset", "sunrise"),
+    "abstract": ("abstract", "geometric", "pattern", "shapes", "colors", "artistic"),
+    "fantasy": ("fantasy", "dragon", "magic", "wizard", "fairy", "mythical", "sword"),
+    "anime": ("anime", "manga", "cartoon", "character", "studio ghibli"),
+    "architecture": ("building", "architecture", "house", "city", "street", "bridge"),
+    "animals": ("animal", "dog", "cat", "bird", "horse", "wildlife", "pet"),
+    "food": ("food", "pizza", "burger", "cake", "coffee", "meal", "cooking"),
+    "fashion": ("fashion", "clothing", "dress", "outfit", "style", "model"),
+    "technology": ("technology", "computer", "robot", "futuristic", "tech", "digital"),
+    "vehicles": ("car", "truck", "plane", "boat", "vehicle", "motorcycle")
+})
+
+STYLE_KEYWORDS = MappingProxyType({
+    "photorealistic": ("photorealistic", "realistic", "photo", "photography"),
+    "artistic": ("artistic", "art", "painting", "creative"),
+    "cinematic": ("cinematic", "movie", "film", "dramatic"),
+    "cartoon": ("cartoon", "animated", "toon"),
+    "anime": ("anime", "manga", "japanese"),
+    "3d-render": ("3d", "render", "cgi", "computer graphics"),
+    "oil-painting": ("oil painting", "oil", "canvas"),
+    "watercolor": ("watercolor", "water", "paint")
+})
+
+QUALITY_KEYWORDS = MappingProxyType({
+    "high-quality": ("high quality", "detailed", "sharp", "masterpiece"),
+    "detailed": ("detailed", "intricate", "fine details"),
+    "vibrant": ("vibrant", "colorful", "bright colors")
+})
+
+TAG_KEYWORDS = MappingProxyType({**STYLE_KEYWORDS, **QUALITY_KEYWORDS})
+
+
+def _build_keyword_automaton(keyword_table: Mapping[str, Tuple[str, ...]]):
+    """Aho-Corasick automaton mapping each keyword to the labels it belongs to"""
+    labels = {}
+    for label, keywords in keyword_table.items():
+        for keyword in keywords:
+            labels.setdefault(keyword, []).append(label)
+    automaton = ahocorasick.Automaton()
+    for keyword, keyword_labels in labels.items():
+        automaton.add_word(keyword, tuple(keyword_labels))
+    automaton.make_automaton()
+    return automaton
+
+# Built once per process and shared by every gallery (None without pyahocorasick)
+_CATEGORY_AUTOMATON = _build_keyword_automaton(CATEGORY_KEYWORDS) if AHOCORASICK_AVAILABLE else None
+_TAG_AUTOMATON = _build_keyword_automaton(TAG_KEYWORDS) if AHOCORASICK_AVAILABLE else None
+
 class ImageGallery:
     """Manages persistent storage of generated images"""
     
+    # Metadata lives in a gallery_meta table next to the enhanced gallery's tables;
+    # resolution and tags are stored as JSON text
+    _META_COLUMNS = ("id", "filename", "format", "prompt", "negative_prompt", "model",
+                     "generation_time", "vram_used", "steps", "guidance", "resolution",
+                     "timestamp", "size", "category", "tags")
+    _META_JSON_COLUMNS = ("resolution", "tags")
+    _UPSERT_META_SQL = (
+        f"INSERT OR REPLACE INTO gallery_meta ({', '.join(_META_COLUMNS)}) "
+        f"VALUES ({', '.join('?' * len(_META_COLUMNS))})"
+    )
+    
     def __init__(self, gallery_dir: str = "generated_images"):
         self.gallery_dir = gallery_dir
+        # Legacy metadata store, imported into gallery_meta on first start
         self.metadata_file = os.path.join(gallery_dir, "metadata.json")
         self.images_dir = os.path.join(gallery_dir, "images")
         
@@ -25,57 +151,238 @@ class ImageGallery:
         os.makedirs(self.gallery_dir, exist_ok=True)
         os.makedirs(self.images_dir, exist_ok=True)
         
-        # Load existing metadata
-        self.metadata = self._load_metadata()
+        # Snapshot the image files once; later existence checks are set lookups
+        with os.scandir(self.images_dir) as entries:
+            self._existing_files = {entry.name for entry in entries if entry.is_file()}
+        self._last_id_ns = 0
+        # Guards the running size totals, which a background compaction also updates
+        self._stats_lock = threading.Lock()
         
-        # Initialize enhanced gallery
+        # Initialize enhanced gallery; its database (WAL) also holds our metadata
         self.enhanced_gallery = EnhancedImageGallery(gallery_dir)
+        self._init_metadata_table()
+        self._migrate_metadata_file()
+        
+        # Load existing metadata and build the lookup indexes and running stats
+        self.metadata = self._load_metadata()
+        self._reset_indexes()
+        for entry in reversed(self.metadata):
+            self._index_entry(entry)
     
-    def _load_metadata(self) -> List[Dict[str, Any]]:
-        """Load metadata from file"""
-        if os.path.exists(self.metadata_file):
-            try:
-                with open(self.metadata_file, 'r') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"Error loading metadata: {e}")
-                return []
-        return []
+    def _init_metadata_table(self):
+        """Create the gallery_meta table if it doesn't exist yet"""
+        conn = self.enhanced_gallery.connection()
+        conn.executescript('''
+            CREATE TABLE IF NOT EXISTS gallery_meta (
+                id TEXT PRIMARY KEY,
+                filename TEXT NOT NULL,
+                format TEXT,
+                prompt TEXT,
+                negative_prompt TEXT,
+                model TEXT,
+                generation_time REAL,
+                vram_used REAL,
+                steps INTEGER,
+                guidance REAL,
+                resolution TEXT,
+                timestamp TEXT,
+                size INTEGER,
+                category TEXT,
+                tags TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_gallery_meta_timestamp ON gallery_meta(timestamp DESC);
+        ''')
+        conn.commit()
     
-    def get_images(self, limit: int = 50) -> List[Dict[str, Any]]:
-        """Get images from gallery"""
-        # Return most recent images first
-        return sorted(self.metadata, key=lambda x: x.get('timestamp', ''), reverse=True)[:limit]
+    def _migrate_metadata_file(self):
+        """Import a legacy metadata.json once, then set the file aside"""
+        if not os.path.exists(self.metadata_file):
+            return
+        try:
+            with open(self.metadata_file, 'rb') as f:
+                legacy = _json_loads(f.read())
+            with self.enhanced_gallery.connection() as conn:
+                conn.executemany(self._UPSERT_META_SQL.replace("OR REPLACE", "OR IGNORE"),
+                                 [self._meta_row(entry) for entry in legacy])
+            os.replace(self.metadata_file, self.metadata_file + ".migrated")
+            print(f"[Gallery] Migrated {len(legacy)} metadata entries to the gallery database")
+        except (OSError, ValueError, KeyError, sqlite3.Error) as e:
+            print(f"Error migrating metadata: {e}")
+    
+    def _meta_row(self, entry: Dict[str, Any]) -> tuple:
+        """Flatten a metadata entry into a gallery_meta row"""
+        values = dict(entry)
+        values.setdefault("format", "png")
+        values["resolution"] = _json_dumps(list(entry.get("resolution") or []))
+        values["tags"] = _json_dumps(list(entry.get("tags") or []))
+        return tuple(values.get(column) for column in self._META_COLUMNS)
     
-    def _save_metadata(self):
-        """Save metadata to file"""
+    def _load_metadata(self) -> List[Dict[str, Any]]:
+        """Load metadata from the gallery database, newest first"""
         try:
-            with open(self.metadata_file, 'w') as f:
-                json.dump(self.metadata, f, indent=2)
-        except Exception as e:
+            rows = self.enhanced_gallery.connection().execute(
+                f"SELECT {', '.join(self._META_COLUMNS)} FROM gallery_meta ORDER BY timestamp DESC"
+            ).fetchall()
+        except sqlite3.Error as e:
+            print(f"Error loading metadata: {e}")
+            return []
+        
+        metadata = []
+        for row in rows:
+            entry = dict(row)
+            for column in self._META_JSON_COLUMNS:
+                entry[column] = _json_loads(entry[column]) if entry[column] else []
+            metadata.append(entry)
+        return metadata
+    
+    def _write_metadata(self, upserts: List[Dict[str, Any]] = (), deletes: List[str] = (),
+                        clear: bool = False):
+        """Apply metadata changes to the gallery database in one transaction"""
+        try:
+            with self.enhanced_gallery.connection() as conn:
+                if clear:
+                    conn.execute('DELETE FROM gallery_meta')
+                if deletes:
+                    conn.executemany('DELETE FROM gallery_meta WHERE id = ?', [(image_id,) for image_id in deletes])
+                if upserts:
+                    conn.executemany(self._UPSERT_META_SQL, [self._meta_row(entry) for entry in upserts])
+        except sqlite3.Error as e:
             print(f"Error saving metadata: {e}")
     
-    def add_image(self, image_data: str, prompt: str, model: str, 
+    def _reset_indexes(self):
+        """Empty the in-memory indexes kept alongside self.metadata"""
+        with self._stats_lock:
+            self._by_id = {}
+            self._total_size = 0
+        self._prompt_lower = {}
+        # model -> {id: entry}, oldest first
+        self._model_index = {}
+        self._total_generation_time = 0.0
+        # gallery id -> enhanced gallery (SQLite) row id, filled on add or first lookup
+        self._enhanced_ids = {}
+    
+    def _index_entry(self, entry: Dict[str, Any]):
+        """Add an entry to the lookup indexes and running stats"""
+        with self._stats_lock:
+            self._by_id[entry["id"]] = entry
+            self._total_size += entry["size"]
+        self._prompt_lower[entry["id"]] = entry["prompt"].lower()
+        self._model_index.setdefault(entry["model"], {})[entry["id"]] = entry
+        self._total_generation_time += entry["generation_time"]
+    
+    def _unindex_entry(self, entry: Dict[str, Any]):
+        """Remove an entry from the lookup indexes and running stats"""
+        with self._stats_lock:
+            self._by_id.pop(entry["id"], None)
+            self._total_size -= entry["size"]
+        self._prompt_lower.pop(entry["id"], None)
+        model_entries = self._model_index.get(entry["model"], {})
+        model_entries.pop(entry["id"], None)
+        if not model_entries:
+            self._model_index.pop(entry["model"], None)
+        self._total_generation_time -= entry["generation_time"]
+        self._enhanced_ids.pop(entry["id"], None)
+    
+    def get_images(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Get images from gallery"""
+        # Return most recent images first; self.metadata is kept newest-first
+        # (loaded ORDER BY timestamp DESC, new entries inserted at the front)
+        return self.metadata[:limit]
+    
+    def add_image(self, image_data: Union[str, bytes, Image.Image], prompt: str, model: str, 
                   generation_time: float, vram_used: float, 
                   steps: int, guidance: float, resolution: tuple,
                   negative_prompt: str = "", category: str = "other", 
                   tags: List[str] = None) -> str:
-        """Add a new image to the gallery with enhanced metadata"""
+        """Add a new image to the gallery with enhanced metadata.
         
-        # Generate unique ID
-        image_id = f"img_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{len(self.metadata)}"
+        image_data may be a base64-encoded PNG/JPEG, raw PNG/JPEG bytes, or a PIL
+        image; the latter two are written without a base64 round-trip.
+        """
+        if not isinstance(image_data, (str, bytes, bytearray, memoryview)):
+            return self.add_image_pil(image_data, prompt, model, generation_time, vram_used,
+                                      steps, guidance, resolution, negative_prompt, category, tags)
         
-        # Save image file
-        image_bytes = base64.b64decode(image_data)
-        image_path = os.path.join(self.images_dir, f"{image_id}.png")
+        if isinstance(image_data, (bytes, bytearray, memoryview)):
+            image_format = "jpeg" if bytes(image_data[:3]) == b"\xff\xd8\xff" else "png"
+            
+            def write_image(image_path: str):
+                with open(image_path, 'wb') as f:
+                    f.write(image_data)
+        elif any(c in image_data for c in " \t\r\n"):
+            # Line-wrapped base64 can't be sliced on 4-character boundaries; decode it whole
+            image_bytes = _b64decode(image_data)
+            image_format = "jpeg" if image_bytes[:3] == b"\xff\xd8\xff" else "png"
+            
+            def write_image(image_path: str):
+                with open(image_path, 'wb') as f:
+                    f.write(image_bytes)
+        else:
+            image_format = "jpeg" if _b64decode(image_data[:4])[:3] == b"\xff\xd8\xff" else "png"
+            
+            def write_image(image_path: str):
+                # Decode slice by slice, so the full decoded image is never held in memory
+                with open(image_path, 'wb') as f:
+                    for start in range(0, len(image_data), BASE64_DECODE_CHUNK):
+                        f.write(_b64decode(image_data[start:start + BASE64_DECODE_CHUNK]))
         
-        with open(image_path, 'wb') as f:
-            f.write(image_bytes)
+        return self._add_image_file(write_image, prompt, model, generation_time, vram_used,
+                                    steps, guidance, resolution, negative_prompt, category, tags,
+                                    image_format=image_format)
+    
+    def add_image_pil(self, image: Image.Image, prompt: str, model: str, 
+                      generation_time: float, vram_used: float, 
+                      steps: int, guidance: float, resolution: tuple,
+                      negative_prompt: str = "", category: str = "other", 
+                      tags: List[str] = None, compress_level: int = 1,
+                      image_format: str = "png") -> str:
+        """Add a PIL image to the gallery, encoding it straight to disk without a base64 round-trip.
+        
+        The default compress_level favours encode speed; compact_gallery() shrinks files later.
+        image_format="jpeg" stores a much smaller, lossy JPEG instead of a PNG.
+        """
+        if image_format not in IMAGE_EXTENSIONS:
+            raise ValueError(f"Unsupported image format: {image_format}")
+        
+        def write_image(image_path: str):
+            if image_format == "jpeg":
+                image.convert("RGB").save(image_path, format="JPEG", quality=JPEG_QUALITY)
+            else:
+                image.save(image_path, format="PNG", compress_level=compress_level)
+        
+        return self._add_image_file(write_image, prompt, model, generation_time, vram_used,
+                                    steps, guidance, resolution, negative_prompt, category, tags,
+                                    image_format=image_format, image=image)
+    
+    def _add_image_file(self, write_image, prompt: str, model: str, 
+                        generation_time: float, vram_used: float, 
+                        steps: int, guidance: float, resolution: tuple,
+                        negative_prompt: str, category: str, 
+                        tags: Optional[List[str]], image_format: str = "png",
+                        image: Optional[Image.Image] = None) -> str:
+        """Write the image file via write_image(path) and record its metadata.
+        
+        ``image`` is the decoded source, when there is one, so the enhanced gallery
+        doesn't have to read the file back to hash and thumbnail it.
+        """
+        
+        # Generate unique, time-sortable ID; bumped past the last one in case the clock
+        # hasn't ticked (coarse on Windows) or stepped backwards
+        id_ns = max(time.time_ns(), self._last_id_ns + 1)
+        self._last_id_ns = id_ns
+        image_id = f"img_{id_ns:x}"
+        
+        # Save image file
+        filename = f"{image_id}.{IMAGE_EXTENSIONS[image_format]}"
+        image_path = os.path.join(self.images_dir, filename)
+        write_image(image_path)
+        self._existing_files.add(filename)
         
         # Create metadata entry
         metadata_entry = {
             "id": image_id,
-            "filename": f"{image_id}.png",
+            "filename": filename,
+            "format": image_format,
             "prompt": prompt,
             "negative_prompt": negative_prompt,
             "model": model,
@@ -85,7 +392,7 @@ class ImageGallery:
             "guidance": guidance,
             "resolution": resolution,
             "timestamp": datetime.now().isoformat(),
-            "size": len(image_bytes),
+            "size": os.path.getsize(image_path),
             "category": category,
             "tags": tags or []
         }
@@ -100,43 +407,65 @@ class ImageGallery:
         }
         
         try:
-            self.enhanced_gallery.add_image(
+            enhanced_id = self.enhanced_gallery.add_image(
                 image_path=image_path,
                 prompt=prompt,
                 negative_prompt=negative_prompt,
                 model_used=model,
                 generation_params=generation_params,
                 category=category,
-                tags=tags or []
+                tags=tags or [],
+                image=image,
+                image_format=image_format.upper()
             )
+            if enhanced_id != -1:
+                self._enhanced_ids[image_id] = enhanced_id
         except Exception as e:
             print(f"[Gallery] Enhanced gallery error: {e}")
         
         # Add to metadata (newest first)
         self.metadata.insert(0, metadata_entry)
+        self._index_entry(metadata_entry)
         
         # Keep only last 100 images to prevent storage bloat
+        trimmed = []
         if len(self.metadata) > 100:
             # Remove oldest image file
             oldest = self.metadata.pop()
-            oldest_path = os.path.join(self.images_dir, oldest["filename"])
-            if os.path.exists(oldest_path):
-                os.remove(oldest_path)
+            self._unindex_entry(oldest)
+            trimmed.append(oldest["id"])
+            if oldest["filename"] in self._existing_files:
+                self._existing_files.discard(oldest["filename"])
+                with self._stats_lock:
+                    _safe_remove(os.path.join(self.images_dir, oldest["filename"]))
         
         # Save metadata
-        self._save_metadata()
+        self._write_metadata(upserts=[metadata_entry], deletes=trimmed)
         
         return image_id
     
     def get_image_data(self, image_id: str) -> str:
         """Get image data as base64 string"""
-        for entry in self.metadata:
-            if entry["id"] == image_id:
-                image_path = os.path.join(self.images_dir, entry["filename"])
-                if os.path.exists(image_path):
-                    with open(image_path, 'rb') as f:
-                        image_bytes = f.read()
-                    return base64.b64encode(image_bytes).decode()
+        entry = self._by_id.get(image_id)
+        if entry is not None and entry["filename"] in self._existing_files:
+            image_path = os.path.join(self.images_dir, entry["filename"])
+            try:
+                with open(image_path, 'rb') as f:
+                    image_bytes = f.read()
+            except FileNotFoundError:
+                # Removed behind our back since the startup scan
+                self._existing_files.discard(entry["filename"])
+                return None
+            if PYBASE64_AVAILABLE:
+                return pybase64.b64encode_as_string(image_bytes)
+            return base64.b64encode(image_bytes).decode()
+        return None
+    
+    def get_image_path(self, image_id: str) -> Optional[str]:
+        """Get the path of an image file, so it can be served without base64 encoding"""
+        entry = self._by_id.get(image_id)
+        if entry is not None and entry["filename"] in self._existing_files:
+            return os.path.join(self.images_dir, entry["filename"])
         return None
     
     def get_recent_images(self, limit: int = 20) -> List[Dict[str, Any]]:
@@ -145,31 +474,28 @@ class ImageGallery:
     
     def get_image_by_id(self, image_id: str) -> Dict[str, Any]:
         """Get specific image metadata by ID"""
-        for entry in self.metadata:
-            if entry["id"] == image_id:
-                return entry
-        return None
+        return self._by_id.get(image_id)
     
     def search_images(self, query: str = "", model: str = "", limit: int = 20) -> List[Dict[str, Any]]:
         """Search images by prompt or model"""
-        results = []
         query_lower = query.lower()
         
-        for entry in self.metadata:
-            # Filter by query
-            if query and query_lower not in entry["prompt"].lower():
-                continue
-            
-            # Filter by model
-            if model and model != entry["model"]:
-                continue
-            
-            results.append(entry)
-            
-            if len(results) >= limit:
-                break
+        # A model filter narrows the scan to that model's entries, newest first
+        if model:
+            candidates = reversed(self._model_index.get(model, {}).values())
+            if query:
+                candidates = (entry for entry in candidates
+                              if query_lower in self._prompt_lower[entry["id"]])
+            return list(islice(candidates, limit))
+        
+        if not query:
+            return self.metadata[:limit]
         
-        return results
+        # Scan the pre-lowered prompts directly; like the model index they are kept
+        # oldest first, so walk them backwards for newest-first results
+        matches = (self._by_id[image_id] for image_id, prompt_lower in reversed(self._prompt_lower.items())
+                   if query_lower in prompt_lower)
+        return list(islice(matches, limit))
     
     def get_stats(self) -> Dict[str, Any]:
         """Get gallery statistics"""
@@ -184,15 +510,13 @@ class ImageGallery:
                 "newest_image": None
             }
         
-        # Calculate stats
-        total_size = sum(entry["size"] for entry in self.metadata)
-        models_used = list(set(entry["model"] for entry in self.metadata))
-        avg_time = sum(entry["generation_time"] for entry in self.metadata) / total_images
+        # Stats come from the running aggregates
+        avg_time = self._total_generation_time / total_images
         
         return {
             "total_images": total_images,
-            "total_size_mb": round(total_size / (1024 * 1024), 2),
-            "models_used": models_used,
+            "total_size_mb": round(self._total_size / (1024 * 1024), 2),
+            "models_used": list(self._model_index),
             "avg_generation_time": round(avg_time, 2),
             "oldest_image": self.metadata[-1]["timestamp"] if self.metadata else None,
             "newest_image": self.metadata[0]["timestamp"] if self.metadata else None
@@ -200,30 +524,95 @@ class ImageGallery:
     
     def delete_image(self, image_id: str) -> bool:
         """Delete an image from the gallery"""
-        for i, entry in enumerate(self.metadata):
-            if entry["id"] == image_id:
-                # Remove file
-                image_path = os.path.join(self.images_dir, entry["filename"])
-                if os.path.exists(image_path):
-                    os.remove(image_path)
-                
-                # Remove from metadata
-                self.metadata.pop(i)
-                self._save_metadata()
-                return True
-        return False
+        entry = self._by_id.get(image_id)
+        if entry is None:
+            return False
+        
+        # Remove from metadata first, so a running compaction won't write the file back
+        self.metadata.remove(entry)
+        self._unindex_entry(entry)
+        
+        # Remove file
+        if entry["filename"] in self._existing_files:
+            self._existing_files.discard(entry["filename"])
+            with self._stats_lock:
+                _safe_remove(os.path.join(self.images_dir, entry["filename"]))
+        
+        self._write_metadata(deletes=[image_id])
+        return True
     
     def clear_gallery(self):
         """Clear all images from gallery"""
-        # Remove all image files
-        for entry in self.metadata:
-            image_path = os.path.join(self.images_dir, entry["filename"])
-            if os.path.exists(image_path):
-                os.remove(image_path)
+        # One directory scan finds the gallery's files (no per-file exists() check),
+        # then the unlinks run in parallel; untracked files in images_dir are kept
+        filenames = {entry["filename"] for entry in self.metadata}
         
-        # Clear metadata
+        # Clear metadata first, so a running compaction won't write files back
         self.metadata = []
-        self._save_metadata()
+        self._reset_indexes()
+        
+        with self._stats_lock:
+            with os.scandir(self.images_dir) as entries:
+                paths = [entry.path for entry in entries if entry.name in filenames]
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                list(executor.map(_safe_remove, paths))
+        self._existing_files -= filenames
+        self._write_metadata(clear=True)
+    
+    def compact_gallery(self, background: bool = True) -> Optional[threading.Thread]:
+        """Re-encode stored PNGs at maximum compression for long-term storage"""
+        entries = list(self.metadata)
+        if background:
+            thread = threading.Thread(target=self._compact_entries, args=(entries,),
+                                      name="gallery-compact", daemon=True)
+            thread.start()
+            return thread
+        self._compact_entries(entries)
+        return None
+    
+    def _compact_entries(self, entries: List[Dict[str, Any]]):
+        """Re-encode each entry's file, keeping the result only when it is smaller"""
+        from PIL import Image
+        
+        saved_bytes = 0
+        compacted = []
+        for entry in entries:
+            # JPEGs would only lose quality by being re-encoded
+            if entry.get("format", "png") != "png" or entry["filename"] not in self._existing_files:
+                continue
+            image_path = os.path.join(self.images_dir, entry["filename"])
+            tmp_path = image_path + ".tmp"
+            try:
+                with Image.open(image_path) as image:
+                    image.save(tmp_path, format="PNG", compress_level=9, optimize=True)
+                new_size = os.path.getsize(tmp_path)
+                if new_size >= entry["size"]:
+                    os.remove(tmp_path)
+                    continue
+                # Deletes unindex and unlink under the same lock, so an entry removed
+                # while it was being re-encoded is never written back
+                with self._stats_lock:
+                    if entry["id"] not in self._by_id:
+                        os.remove(tmp_path)
+                        continue
+                    os.replace(tmp_path, image_path)
+                    self._total_size += new_size - entry["size"]
+                    saved_bytes += entry["size"] - new_size
+                    entry["size"] = new_size
+                    compacted.append((new_size, entry["id"]))
+            except OSError as e:
+                print(f"Error compacting {entry['filename']}: {e}")
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                continue
+        
+        # Update sizes only, so rows deleted since can't be re-inserted
+        try:
+            with self.enhanced_gallery.connection() as conn:
+                conn.executemany('UPDATE gallery_meta SET size = ? WHERE id = ?', compacted)
+        except sqlite3.Error as e:
+            print(f"Error saving metadata: {e}")
+        print(f"Compacted gallery, saved {saved_bytes / (1024 * 1024):.2f} MB")
     
     # Enhanced Gallery Methods
     
@@ -246,36 +635,47 @@ class ImageGallery:
         """Get popular tags"""
         return self.enhanced_gallery.get_tags(tag_type=tag_type, limit=limit)
     
+    def _enhanced_id(self, image_id: str) -> Optional[int]:
+        """Resolve a gallery id to its enhanced gallery row id, looking it up only on a cache miss"""
+        enhanced_id = self._enhanced_ids.get(image_id)
+        if enhanced_id is None:
+            # Enhanced gallery rows are keyed by the unique filename, which embeds the id
+            entry = self._by_id.get(image_id)
+            if entry is not None:
+                filenames = [entry["filename"]]
+            else:
+                filenames = [f"{image_id}.{extension}" for extension in IMAGE_EXTENSIONS.values()]
+            enhanced_id = self.enhanced_gallery.get_id_by_filename(filenames)
+            if enhanced_id is not None and entry is not None:
+                self._enhanced_ids[image_id] = enhanced_id
+        return enhanced_id
+    
     def update_image_tags(self, image_id: str, tags: List[str]) -> bool:
         """Update tags for an image"""
-        # Find the image in enhanced gallery
-        images = self.enhanced_gallery.get_images(search_term=image_id)
-        if images:
-            return self.enhanced_gallery.update_image_tags(images[0]['id'], tags)
+        enhanced_id = self._enhanced_id(image_id)
+        if enhanced_id is not None:
+            return self.enhanced_gallery.update_image_tags(enhanced_id, tags)
         return False
     
     def update_image_category(self, image_id: str, category: str) -> bool:
         """Update image category"""
-        # Find the image in enhanced gallery
-        images = self.enhanced_gallery.get_images(search_term=image_id)
-        if images:
-            return self.enhanced_gallery.update_image_category(images[0]['id'], category)
+        enhanced_id = self._enhanced_id(image_id)
+        if enhanced_id is not None:
+            return self.enhanced_gallery.update_image_category(enhanced_id, category)
         return False
     
     def toggle_favorite(self, image_id: str) -> bool:
         """Toggle favorite status of an image"""
-        # Find the image in enhanced gallery
-        images = self.enhanced_gallery.get_images(search_term=image_id)
-        if images:
-            return self.enhanced_gallery.toggle_favorite(images[0]['id'])
+        enhanced_id = self._enhanced_id(image_id)
+        if enhanced_id is not None:
+            return self.enhanced_gallery.toggle_favorite(enhanced_id)
         return False
     
     def rate_image(self, image_id: str, rating: int) -> bool:
         """Rate an image (1-5 stars)"""
-        # Find the image in enhanced gallery
-        images = self.enhanced_gallery.get_images(search_term=image_id)
-        if images:
-            return self.enhanced_gallery.rate_image(images[0]['id'], rating)
+        enhanced_id = self._enhanced_id(image_id)
+        if enhanced_id is not None:
+            return self.enhanced_gallery.rate_image(enhanced_id, rating)
         return False
     
     def get_enhanced_stats(self) -> Dict:
@@ -295,23 +695,20 @@ class ImageGallery:
         prompt_lower = prompt.lower()
         tags_lower = [tag.lower() for tag in tags] if tags else []
         
-        # Category keywords
-        category_keywords = {
-            "portrait": ["portrait", "face", "person", "woman", "man", "people", "headshot"],
-            "landscape": ["landscape", "nature", "mountain", "forest", "ocean", "sky", "sunset", "sunrise"],
-            "abstract": ["abstract", "geometric", "pattern", "shapes", "colors", "artistic"],
-            "fantasy": ["fantasy", "dragon", "magic", "wizard", "fairy", "mythical", "sword"],
-            "anime": ["anime", "manga", "cartoon", "character", "studio ghibli"],
-            "architecture": ["building", "architecture", "house", "city", "street", "bridge"],
-            "animals": ["animal", "dog", "cat", "bird", "horse", "wildlife", "pet"],
-            "food": ["food", "pizza", "burger", "cake", "coffee", "meal", "cooking"],
-            "fashion": ["fashion", "clothing", "dress", "outfit", "style", "model"],
-            "technology": ["technology", "computer", "robot", "futuristic", "tech", "digital"],
-            "vehicles": ["car", "truck", "plane", "boat", "vehicle", "motorcycle"]
-        }
+        if _CATEGORY_AUTOMATON is not None:
+            # One scan of the prompt plus exact lookups for the tags, then the first
+            # category in table order wins, as with the nested loops below
+            hits = {category for _, categories in _CATEGORY_AUTOMATON.iter(prompt_lower)
+                    for category in categories}
+            for tag in tags_lower:
+                hits.update(_CATEGORY_AUTOMATON.get(tag, ()))
+            for category in CATEGORY_KEYWORDS:
+                if category in hits:
+                    return category
+            return "other"
         
         # Check prompt and tags for category matches
-        for category, keywords in category_keywords.items():
+        for category, keywords in CATEGORY_KEYWORDS.items():
             for keyword in keywords:
                 if keyword in prompt_lower or keyword in tags_lower:
                     return category
@@ -321,31 +718,13 @@ class ImageGallery:
     def extract_tags_from_prompt(self, prompt: str) -> List[str]:
         """Extract relevant tags from prompt"""
         prompt_lower = prompt.lower()
-        extracted_tags = []
         
-        # Style tags
-        style_keywords = {
-            "photorealistic": ["photorealistic", "realistic", "photo", "photography"],
-            "artistic": ["artistic", "art", "painting", "creative"],
-            "cinematic": ["cinematic", "movie", "film", "dramatic"],
-            "cartoon": ["cartoon", "animated", "toon"],
-            "anime": ["anime", "manga", "japanese"],
-            "3d-render": ["3d", "render", "cgi", "computer graphics"],
-            "oil-painting": ["oil painting", "oil", "canvas"],
-            "watercolor": ["watercolor", "water", "paint"]
-        }
+        if _TAG_AUTOMATON is not None:
+            return list({tag for _, tags in _TAG_AUTOMATON.iter(prompt_lower) for tag in tags})
         
-        # Quality tags
-        quality_keywords = {
-            "high-quality": ["high quality", "detailed", "sharp", "masterpiece"],
-            "detailed": ["detailed", "intricate", "fine details"],
-            "vibrant": ["vibrant", "colorful", "bright colors"]
-        }
-        
-        # Combine all keywords
-        all_keywords = {**style_keywords, **quality_keywords}
+        extracted_tags = []
         
-        for tag, keywords in all_keywords.items():
+        for tag, keywords in TAG_KEYWORDS.items():
             for keyword in keywords:
                 if keyword in prompt_lower:
                     extracted_tags.append(tag)
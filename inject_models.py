@@ -1,4 +1,5 @@
 import os
+import textwrap
 
 with open("leonardo_dicts.txt", "r") as f:
     content = f.read()
@@ -7,67 +8,60 @@ parts = content.split("SETUP:\n")
 mapping_str = parts[0].replace("MAPPING:\n", "")
 setup_str = parts[1]
 
-with open("modern_generators.py", "r") as f:
-    py_lines = f.readlines()
-
-out_lines = []
+# Stream line by line into a temp file and swap it in, so the source is never held in memory twice
+out_path = "modern_generators_injected.py"
+tmp_path = out_path + ".tmp"
+# Both dicts are module-level constants in modern_generators.py. The injected entries
+# are re-indented to match and replace the V1 models; the aliases and V2 models that
+# follow them are kept.
+mapping_str = textwrap.indent(textwrap.dedent(mapping_str).strip("\n"), "    ")
+setup_str = textwrap.indent(textwrap.dedent(setup_str).strip("\n"), "        ")
 in_mapping = False
+in_generator_config = False
 in_setup = False
-skip_next = False
+injected = set()
+
+with open("modern_generators.py", "r") as fin, open(tmp_path, "w") as fout:
+    for line in fin:
+        # Injection point 1: LEONARDO_MODEL_CONFIGS entries
+        if line.startswith("LEONARDO_MODEL_CONFIGS = {"):
+            fout.write(line)
+            fout.write(mapping_str + "\n")
+            in_mapping = True
+            continue
+
+        if in_mapping:
+            if line.strip() == "# Special Aliases and V2 Models":
+                in_mapping = False
+                injected.add("LEONARDO_MODEL_CONFIGS")
+                fout.write("\n\n" + line)
+            continue
+
+        # Injection point 2: LEONARDO_GENERATOR_CONFIG["models"]
+        if line.startswith("LEONARDO_GENERATOR_CONFIG = {"):
+            in_generator_config = True
 
-for line in py_lines:
-    if skip_next:
-        skip_next = False
-        continue
+        if in_generator_config and line.rstrip() == '    "models": {':
+            fout.write(line)
+            fout.write(setup_str + "\n")
+            in_setup = True
+            in_generator_config = False
+            continue
 
-    # Injection point 1: mapping dict
-    if "mapping = {" in line and getattr(globals(), 'in_mapping_scope', False):
-        out_lines.append(line)
-        out_lines.append(mapping_str + "\n")
-        in_mapping = True
-        continue
-    
-    # We set a flag when we enter the mapping scope
-    if "# Explicit mappings from Leonardo docs" in line:
-        globals()['in_mapping_scope'] = True
-        out_lines.append(line)
-        continue
+        if in_setup:
+            if line.rstrip() == '        "universal": {':
+                in_setup = False
+                injected.add("LEONARDO_GENERATOR_CONFIG")
+                fout.write("\n" + line)
+            continue
 
-    if in_mapping and "# FLUX models (V1)" in line:
-        in_mapping = False
-        globals()['in_mapping_scope'] = False
-        out_lines.append(line)
-        continue
-        
-    if in_mapping:
-        continue
+        fout.write(line)
 
-    # Injection point 2: models dict
-    if '"models": {' in line and getattr(globals(), 'in_setup_scope', False):
-        out_lines.append(line)
-        out_lines.append(setup_str.lstrip() + "\n")
-        in_setup = True
-        continue
-        
-    # We set a flag when we enter the setup scope
-    if '"features": ["text-to-image", "fine-tuned-models", "texture-generation"],' in line:
-        globals()['in_setup_scope'] = True
-        out_lines.append(line)
-        continue
-        
-    if in_setup and '"preset_styles": [' in line:
-        in_setup = False
-        globals()['in_setup_scope'] = False
-        out_lines.append("            },\n")
-        out_lines.append(line)
-        continue
-        
-    if in_setup:
-        continue
-        
-    out_lines.append(line)
+missing = {"LEONARDO_MODEL_CONFIGS", "LEONARDO_GENERATOR_CONFIG"} - injected
+if missing:
+    os.remove(tmp_path)
+    raise SystemExit(f"Injection point(s) not found in modern_generators.py: {', '.join(sorted(missing))}")
 
-with open("modern_generators_injected.py", "w") as f:
-    f.writelines(out_lines)
+os.replace(tmp_path, out_path)
 
 print("Injected content into modern_generators_injected.py")
@@ -4,18 +4,26 @@ Alternative launcher using Gradio for a more interactive interface
 
 import torch
 import gc
-from diffusers import StableDiffusionPipeline, DPMSolverMultistepScheduler
-from PIL import Image
+import contextlib
 import gradio as gr
-import numpy as np
 import time
-import psutil
+
+# Total VRAM doesn't change, so query the driver for it once
+_VRAM_TOTAL_GB = torch.cuda.get_device_properties(0).total_memory / 1024**3 if torch.cuda.is_available() else 0
 
 class OptimizedImageGenerator:
+    # Releasing the CUDA cache makes the next generation re-allocate it, so only do it
+    # every few generations (and after errors)
+    EMPTY_CACHE_EVERY = 8
+    # Negative prompts rarely change between generations, so keep a few encoded ones
+    NEGATIVE_EMBEDS_CACHE_SIZE = 8
+    
     def __init__(self):
         self.pipe = None
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
         self.model_loaded = False
+        self._generations = 0
+        self._negative_embeds_cache = {}
         
     def load_model(self):
         """Load Stable Diffusion 1.5 with optimizations for 8GB VRAM"""
@@ -24,6 +32,9 @@ class OptimizedImageGenerator:
             
         print(f"Loading model on {self.device}...")
         
+        # diffusers is only needed once a model is actually loaded
+        from diffusers import StableDiffusionPipeline, DPMSolverMultistepScheduler
+        
         model_id = "runwayml/stable-diffusion-v1-5"
         
         self.pipe = StableDiffusionPipeline.from_pretrained(
@@ -52,6 +63,25 @@ class OptimizedImageGenerator:
         print("Model loaded successfully!")
         return "Model loaded successfully"
     
+    def _negative_prompt_embeds(self, negative_prompt):
+        """Text-encoder output for a negative prompt, encoded once and reused"""
+        embeds = self._negative_embeds_cache.get(negative_prompt)
+        if embeds is None:
+            # encode_prompt runs outside the pipeline's no_grad wrapper; without
+            # inference mode each cached tensor would pin its autograd graph in VRAM
+            with torch.inference_mode():
+                _, embeds = self.pipe.encode_prompt(
+                    prompt="",
+                    device=self.pipe._execution_device,
+                    num_images_per_prompt=1,
+                    do_classifier_free_guidance=True,
+                    negative_prompt=negative_prompt
+                )
+            if len(self._negative_embeds_cache) >= self.NEGATIVE_EMBEDS_CACHE_SIZE:
+                self._negative_embeds_cache.pop(next(iter(self._negative_embeds_cache)))
+            self._negative_embeds_cache[negative_prompt] = embeds
+        return embeds
+    
     def get_vram_usage(self):
         """Get current VRAM usage in GB"""
         if torch.cuda.is_available():
@@ -64,7 +94,7 @@ class OptimizedImageGenerator:
             progress(0.1, desc="Loading model...")
             self.load_model()
         
-        progress(0.2, desc="Preparing generation...")
+        progress(0.2, desc="Generating image...")
         
         # Set seed
         if seed != -1:
@@ -72,17 +102,14 @@ class OptimizedImageGenerator:
         else:
             generator = None
             
-        # Clear cache
-        if torch.cuda.is_available():
-            torch.cuda.empty_cache()
-        
-        progress(0.3, desc="Generating image...")
+        # Autocast only pays off on CUDA; on CPU it just adds conversion kernels
+        autocast_ctx = torch.autocast("cuda") if self.device == "cuda" else contextlib.nullcontext()
         
         try:
-            with torch.autocast(self.device):
+            with autocast_ctx:
                 result = self.pipe(
                     prompt=prompt,
-                    negative_prompt=negative_prompt,
+                    negative_prompt_embeds=self._negative_prompt_embeds(negative_prompt or ""),
                     num_inference_steps=steps,
                     guidance_scale=guidance,
                     width=width,
@@ -90,15 +117,15 @@ class OptimizedImageGenerator:
                     generator=generator
                 )
             
-            progress(0.9, desc="Finalizing...")
-            
             image = result.images[0]
             
             # Clean up
             del result
-            if torch.cuda.is_available():
-                torch.cuda.empty_cache()
-            gc.collect()
+            self._generations += 1
+            if self._generations % self.EMPTY_CACHE_EVERY == 0:
+                if torch.cuda.is_available():
+                    torch.cuda.empty_cache()
+                gc.collect()
             
             progress(1.0, desc="Complete!")
             
@@ -116,10 +143,16 @@ generator = OptimizedImageGenerator()
 def create_interface():
     """Create Gradio interface"""
     
+    import psutil
+    
+    # The first non-blocking cpu_percent() call only starts the measurement window
+    psutil.cpu_percent(interval=None)
+    
     def get_system_info():
-        vram_used = generator.get_vram_usage()
-        vram_total = torch.cuda.get_device_properties(0).total_memory / 1024**3 if torch.cuda.is_available() else 0
-        cpu_usage = psutil.cpu_percent()
+        # Nothing is allocated before the model loads, so skip the CUDA query until then
+        vram_used = generator.get_vram_usage() if generator.model_loaded else 0.0
+        vram_total = _VRAM_TOTAL_GB
+        cpu_usage = psutil.cpu_percent(interval=None)
         memory_usage = psutil.virtual_memory().percent
         
         return f"""
@@ -8,19 +8,22 @@ import sys
 import os
 
 def run_command(cmd, description):
-    """Run a command and show progress"""
+    """Run a command (argv list, no shell) and show progress"""
     print(f"\n{'='*50}")
     print(f"Running: {description}")
-    print(f"Command: {cmd}")
+    print(f"Command: {subprocess.list2cmdline(cmd)}")
     print(f"{'='*50}")
     
     try:
-        result = subprocess.run(cmd, shell=True, check=True, capture_output=False)
+        result = subprocess.run(cmd, check=True, capture_output=False)
         print(f"✅ {description} completed successfully")
         return True
     except subprocess.CalledProcessError as e:
         print(f"❌ {description} failed with error code {e.returncode}")
         return False
+    except OSError as e:
+        print(f"❌ {description} failed: {e}")
+        return False
 
 def main():
     print("🚀 Manual PyTorch CUDA Installation for GTX 1070")
@@ -41,7 +44,7 @@ def main():
     # Create virtual environment
     if not os.path.exists("venv_py311"):
         print("\n📦 Creating virtual environment...")
-        if not run_command(f"{sys.executable} -m venv venv_py311", "Virtual environment creation"):
+        if not run_command([sys.executable, "-m", "venv", "venv_py311"], "Virtual environment creation"):
             return
     
     # Activate and install packages
@@ -50,7 +53,7 @@ def main():
     print(f"\n🔧 Using virtual environment Python: {venv_python}")
     
     # Install PyTorch with CUDA
-    if not run_command(f'"{venv_python}" -m pip install torch torchvision --index-url https://download.pytorch.org/whl/cu121', "PyTorch with CUDA"):
+    if not run_command([venv_python, "-m", "pip", "install", "torch", "torchvision", "--index-url", "https://download.pytorch.org/whl/cu121"], "PyTorch with CUDA"):
         return
     
     # Install other dependencies
@@ -71,9 +74,12 @@ def main():
         "psutil"
     ]
     
-    for package in packages:
-        if not run_command(f'"{venv_python}" -m pip install {package}', f"Installing {package}"):
-            print(f"⚠️  Failed to install {package}, continuing...")
+    # One pip run resolves everything together and skips 13 interpreter/pip startups;
+    # fall back to per-package installs only if the combined install fails
+    if not run_command([venv_python, "-m", "pip", "install", *packages], "Installing dependencies"):
+        for package in packages:
+            if not run_command([venv_python, "-m", "pip", "install", package], f"Installing {package}"):
+                print(f"⚠️  Failed to install {package}, continuing...")
     
     # Test CUDA
     print("\n🧪 Testing CUDA support...")
@@ -4,16 +4,25 @@ Support for Nano Banana Pro, Seedream, Leonardo.ai API-based generators, and Mod
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 import base64
+import hashlib
 import io
+import logging
 from typing import Dict, Any, Optional, List
 from PIL import Image
 import json
 import os
 import time
 import asyncio
+import contextlib
+import threading
 from datetime import datetime
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
 
 # Leonardo.ai SDK
 try:
@@ -24,6 +33,656 @@ except ImportError:
     LEONARDO_SDK_AVAILABLE = False
     print("leonardo-ai-sdk not installed. Install with: pip install leonardo-ai-sdk")
 
+# aiohttp is optional - requests (in a worker thread) is used when it is missing
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+    HTTP_ERRORS = (requests.exceptions.RequestException, aiohttp.ClientError, asyncio.TimeoutError)
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+    HTTP_ERRORS = (requests.exceptions.RequestException,)
+
+# httpx with h2 is optional - when present, Leonardo.ai requests are multiplexed over HTTP/2
+try:
+    import httpx
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+    HTTP_ERRORS = HTTP_ERRORS + (httpx.HTTPError,)
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# orjson is optional - it is much faster for request payloads and API responses
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _json_dumps(obj) -> bytes:
+    """Serialize a request payload to JSON bytes"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode("utf-8")
+
+
+def _json_loads(data):
+    """Parse a JSON response body"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+@lru_cache(maxsize=4)
+def _read_api_keys_file(path, mtime_ns, size):
+    """Parse an API keys file; keyed on its mtime and size so edits are picked up"""
+    with open(path, 'rb') as f:
+        return _json_loads(f.read())
+
+# Leonardo.ai accepts up to 8 images per generation request
+LEONARDO_BATCH_SIZE_MAX = 8
+
+# V1 step/guidance defaults per quality level; explicit kwargs always win
+# (V2 models only take the numeric quality below)
+LEONARDO_QUALITY_PRESETS = {
+    "standard": {"num_inference_steps": 20, "guidance_scale": 6.0},
+    "high": {},
+    "ultra": {"num_inference_steps": 50, "guidance_scale": 8.0},
+}
+
+# Numeric quality values understood by the V2 API
+LEONARDO_V2_QUALITY = {"standard": 60, "high": 80, "ultra": 100}
+
+# Retries for generation requests rejected with HTTP 429
+LEONARDO_RATE_LIMIT_RETRIES = 3
+
+# How often a generation waiting for a free concurrency slot checks again
+LEONARDO_SLOT_POLL_INTERVAL = 0.05
+
+# Ask Leonardo.ai for compressed JSON; brotli is only advertised when a decoder is installed
+try:
+    import brotli  # noqa: F401
+    LEONARDO_ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    LEONARDO_ACCEPT_ENCODING = "gzip, deflate"
+
+# Generation polling backs off from 1s to 8s between status checks and gives up after 6 minutes
+LEONARDO_POLL_INITIAL_DELAY = 1.0
+LEONARDO_POLL_MAX_DELAY = 8.0
+LEONARDO_POLL_TIMEOUT = 6 * 60
+
+
+class TokenBucket:
+    """Async token bucket that spaces out requests to a sustained rate.
+
+    Shared by every event loop in the process, so the bookkeeping is locked.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    async def acquire(self):
+        """Wait until a token is available and take it"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                delay = (1 - self.tokens) / self.rate
+            await asyncio.sleep(delay)
+
+# Leonardo model configs: api_version, endpoint, modelId and payload shape.
+# Explicit mappings from Leonardo docs - these map both UUIDs and
+# human-readable internal keys to their config
+LEONARDO_MODEL_CONFIGS = {
+    "lucid-origin": {"name": "Lucid Origin", "id": "7b592283-e8a7-4c5a-9ba6-d18c31f258b9", "api_version": "v1", "endpoint": "generations"},
+    "7b592283-e8a7-4c5a-9ba6-d18c31f258b9": {"name": "Lucid Origin", "id": "7b592283-e8a7-4c5a-9ba6-d18c31f258b9", "api_version": "v1", "endpoint": "generations"},
+    "flux-1-kontext": {"name": "FLUX.1 Kontext", "id": "28aeddf8-bd19-4803-80fc-79602d1a9989", "api_version": "v1", "endpoint": "generations"},
+    "28aeddf8-bd19-4803-80fc-79602d1a9989": {"name": "FLUX.1 Kontext", "id": "28aeddf8-bd19-4803-80fc-79602d1a9989", "api_version": "v1", "endpoint": "generations"},
+    "lucid-realism": {"name": "Lucid Realism", "id": "05ce0082-2d80-4a2d-8653-4d1c85e2418e", "api_version": "v1", "endpoint": "generations"},
+    "05ce0082-2d80-4a2d-8653-4d1c85e2418e": {"name": "Lucid Realism", "id": "05ce0082-2d80-4a2d-8653-4d1c85e2418e", "api_version": "v1", "endpoint": "generations"},
+    "phoenix-1-0": {"name": "Phoenix 1.0", "id": "de7d3faf-762f-48e0-b3b7-9d0ac3a3fcf3", "api_version": "v1", "endpoint": "generations"},
+    "de7d3faf-762f-48e0-b3b7-9d0ac3a3fcf3": {"name": "Phoenix 1.0", "id": "de7d3faf-762f-48e0-b3b7-9d0ac3a3fcf3", "api_version": "v1", "endpoint": "generations"},
+    "flux-dev": {"name": "Flux Dev", "id": "b2614463-296c-462a-9586-aafdb8f00e36", "api_version": "v1", "endpoint": "generations"},
+    "b2614463-296c-462a-9586-aafdb8f00e36": {"name": "Flux Dev", "id": "b2614463-296c-462a-9586-aafdb8f00e36", "api_version": "v1", "endpoint": "generations"},
+    "flux-schnell": {"name": "Flux Schnell", "id": "1dd50843-d653-4516-a8e3-f0238ee453ff", "api_version": "v1", "endpoint": "generations"},
+    "1dd50843-d653-4516-a8e3-f0238ee453ff": {"name": "Flux Schnell", "id": "1dd50843-d653-4516-a8e3-f0238ee453ff", "api_version": "v1", "endpoint": "generations"},
+    "phoenix-0-9": {"name": "Phoenix 0.9", "id": "6b645e3a-d64f-4341-a6d8-7a3690fbf042", "api_version": "v1", "endpoint": "generations"},
+    "6b645e3a-d64f-4341-a6d8-7a3690fbf042": {"name": "Phoenix 0.9", "id": "6b645e3a-d64f-4341-a6d8-7a3690fbf042", "api_version": "v1", "endpoint": "generations"},
+    "leonardo-anime-xl": {"name": "Leonardo Anime XL", "id": "e71a1c2f-4f80-4800-934f-2c68979d8cc8", "api_version": "v1", "endpoint": "generations"},
+    "e71a1c2f-4f80-4800-934f-2c68979d8cc8": {"name": "Leonardo Anime XL", "id": "e71a1c2f-4f80-4800-934f-2c68979d8cc8", "api_version": "v1", "endpoint": "generations"},
+    "leonardo-lightning-xl": {"name": "Leonardo Lightning XL", "id": "b24e16ff-06e3-43eb-8d33-4416c2d75876", "api_version": "v1", "endpoint": "generations"},
+    "b24e16ff-06e3-43eb-8d33-4416c2d75876": {"name": "Leonardo Lightning XL", "id": "b24e16ff-06e3-43eb-8d33-4416c2d75876", "api_version": "v1", "endpoint": "generations"},
+    "sdxl-1-0": {"name": "SDXL 1.0", "id": "16e7060a-803e-4df3-97ee-edcfa5dc9cc8", "api_version": "v1", "endpoint": "generations"},
+    "16e7060a-803e-4df3-97ee-edcfa5dc9cc8": {"name": "SDXL 1.0", "id": "16e7060a-803e-4df3-97ee-edcfa5dc9cc8", "api_version": "v1", "endpoint": "generations"},
+    "leonardo-kino-xl": {"name": "Leonardo Kino XL", "id": "aa77f04e-3eec-4034-9c07-d0f619684628", "api_version": "v1", "endpoint": "generations"},
+    "aa77f04e-3eec-4034-9c07-d0f619684628": {"name": "Leonardo Kino XL", "id": "aa77f04e-3eec-4034-9c07-d0f619684628", "api_version": "v1", "endpoint": "generations"},
+    "leonardo-vision-xl": {"name": "Leonardo Vision XL", "id": "5c232a9e-9061-4777-980a-ddc8e65647c6", "api_version": "v1", "endpoint": "generations"},
+    "5c232a9e-9061-4777-980a-ddc8e65647c6": {"name": "Leonardo Vision XL", "id": "5c232a9e-9061-4777-980a-ddc8e65647c6", "api_version": "v1", "endpoint": "generations"},
+    "leonardo-diffusion-xl": {"name": "Leonardo Diffusion XL", "id": "1e60896f-3c26-4296-8ecc-53e2afecc132", "api_version": "v1", "endpoint": "generations"},
+    "1e60896f-3c26-4296-8ecc-53e2afecc132": {"name": "Leonardo Diffusion XL", "id": "1e60896f-3c26-4296-8ecc-53e2afecc132", "api_version": "v1", "endpoint": "generations"},
+    "albedobase-xl": {"name": "AlbedoBase XL", "id": "2067ae52-33fd-4a82-bb92-c2c55e7d2786", "api_version": "v1", "endpoint": "generations"},
+    "2067ae52-33fd-4a82-bb92-c2c55e7d2786": {"name": "AlbedoBase XL", "id": "2067ae52-33fd-4a82-bb92-c2c55e7d2786", "api_version": "v1", "endpoint": "generations"},
+    "rpg-v5": {"name": "RPG v5", "id": "f1929ea3-b169-4c18-a16c-5d58b4292c69", "api_version": "v1", "endpoint": "generations"},
+    "f1929ea3-b169-4c18-a16c-5d58b4292c69": {"name": "RPG v5", "id": "f1929ea3-b169-4c18-a16c-5d58b4292c69", "api_version": "v1", "endpoint": "generations"},
+    "sdxl-0-9": {"name": "SDXL 0.9", "id": "b63f7119-31dc-4540-969b-2a9df997e173", "api_version": "v1", "endpoint": "generations"},
+    "b63f7119-31dc-4540-969b-2a9df997e173": {"name": "SDXL 0.9", "id": "b63f7119-31dc-4540-969b-2a9df997e173", "api_version": "v1", "endpoint": "generations"},
+    "3d-animation-style": {"name": "3D Animation Style", "id": "d69c8273-6b17-4a30-a13e-d6637ae1c644", "api_version": "v1", "endpoint": "generations"},
+    "d69c8273-6b17-4a30-a13e-d6637ae1c644": {"name": "3D Animation Style", "id": "d69c8273-6b17-4a30-a13e-d6637ae1c644", "api_version": "v1", "endpoint": "generations"},
+    "dreamshaper-v7": {"name": "DreamShaper v7", "id": "ac614f96-1082-45bf-be9d-757f2d31c174", "api_version": "v1", "endpoint": "generations"},
+    "ac614f96-1082-45bf-be9d-757f2d31c174": {"name": "DreamShaper v7", "id": "ac614f96-1082-45bf-be9d-757f2d31c174", "api_version": "v1", "endpoint": "generations"},
+    "absolute-reality-v1-6": {"name": "Absolute Reality v1.6", "id": "e316348f-7773-490e-adcd-46757c738eb7", "api_version": "v1", "endpoint": "generations"},
+    "e316348f-7773-490e-adcd-46757c738eb7": {"name": "Absolute Reality v1.6", "id": "e316348f-7773-490e-adcd-46757c738eb7", "api_version": "v1", "endpoint": "generations"},
+    "anime-pastel-dream": {"name": "Anime Pastel Dream", "id": "1aa0f478-51be-4efd-94e8-76bfc8f533af", "api_version": "v1", "endpoint": "generations"},
+    "1aa0f478-51be-4efd-94e8-76bfc8f533af": {"name": "Anime Pastel Dream", "id": "1aa0f478-51be-4efd-94e8-76bfc8f533af", "api_version": "v1", "endpoint": "generations"},
+    "dreamshaper-v6": {"name": "DreamShaper v6", "id": "b7aa9939-abed-4d4e-96c4-140b8c65dd92", "api_version": "v1", "endpoint": "generations"},
+    "b7aa9939-abed-4d4e-96c4-140b8c65dd92": {"name": "DreamShaper v6", "id": "b7aa9939-abed-4d4e-96c4-140b8c65dd92", "api_version": "v1", "endpoint": "generations"},
+    "dreamshaper-v5": {"name": "DreamShaper v5", "id": "d2fb9cf9-7999-4ae5-8bfe-f0df2d32abf8", "api_version": "v1", "endpoint": "generations"},
+    "d2fb9cf9-7999-4ae5-8bfe-f0df2d32abf8": {"name": "DreamShaper v5", "id": "d2fb9cf9-7999-4ae5-8bfe-f0df2d32abf8", "api_version": "v1", "endpoint": "generations"},
+    "leonardo-diffusion": {"name": "Leonardo Diffusion", "id": "b820ea11-02bf-4652-97ae-9ac0cc00593d", "api_version": "v1", "endpoint": "generations"},
+    "b820ea11-02bf-4652-97ae-9ac0cc00593d": {"name": "Leonardo Diffusion", "id": "b820ea11-02bf-4652-97ae-9ac0cc00593d", "api_version": "v1", "endpoint": "generations"},
+    "rpg-4-0": {"name": "RPG 4.0", "id": "a097c2df-8f0c-4029-ae0f-8fd349055e61", "api_version": "v1", "endpoint": "generations"},
+    "a097c2df-8f0c-4029-ae0f-8fd349055e61": {"name": "RPG 4.0", "id": "a097c2df-8f0c-4029-ae0f-8fd349055e61", "api_version": "v1", "endpoint": "generations"},
+    "deliberate-1-1": {"name": "Deliberate 1.1", "id": "458ecfff-f76c-402c-8b85-f09f6fb198de", "api_version": "v1", "endpoint": "generations"},
+    "458ecfff-f76c-402c-8b85-f09f6fb198de": {"name": "Deliberate 1.1", "id": "458ecfff-f76c-402c-8b85-f09f6fb198de", "api_version": "v1", "endpoint": "generations"},
+    "vintage-style-photography": {"name": "Vintage Style Photography", "id": "17e4edbf-690b-425d-a466-53c816f0de8a", "api_version": "v1", "endpoint": "generations"},
+    "17e4edbf-690b-425d-a466-53c816f0de8a": {"name": "Vintage Style Photography", "id": "17e4edbf-690b-425d-a466-53c816f0de8a", "api_version": "v1", "endpoint": "generations"},
+    "dreamshaper-3-2": {"name": "DreamShaper 3.2", "id": "f3296a34-9aef-4370-ad18-88daf26862c3", "api_version": "v1", "endpoint": "generations"},
+    "f3296a34-9aef-4370-ad18-88daf26862c3": {"name": "DreamShaper 3.2", "id": "f3296a34-9aef-4370-ad18-88daf26862c3", "api_version": "v1", "endpoint": "generations"},
+    "leonardo-select": {"name": "Leonardo Select", "id": "cd2b2a15-9760-4174-a5ff-4d2925057376", "api_version": "v1", "endpoint": "generations"},
+    "cd2b2a15-9760-4174-a5ff-4d2925057376": {"name": "Leonardo Select", "id": "cd2b2a15-9760-4174-a5ff-4d2925057376", "api_version": "v1", "endpoint": "generations"},
+    "leonardo-creative": {"name": "Leonardo Creative", "id": "6bef9f1b-29cb-40c7-b9df-32b51c1f67d3", "api_version": "v1", "endpoint": "generations"},
+    "6bef9f1b-29cb-40c7-b9df-32b51c1f67d3": {"name": "Leonardo Creative", "id": "6bef9f1b-29cb-40c7-b9df-32b51c1f67d3", "api_version": "v1", "endpoint": "generations"},
+    "battle-axes": {"name": "Battle Axes", "id": "47a6232a-1d49-4c95-83c3-2cc5342f82c7", "api_version": "v1", "endpoint": "generations"},
+    "47a6232a-1d49-4c95-83c3-2cc5342f82c7": {"name": "Battle Axes", "id": "47a6232a-1d49-4c95-83c3-2cc5342f82c7", "api_version": "v1", "endpoint": "generations"},
+    "pixel-art": {"name": "Pixel Art", "id": "e5a291b6-3990-495a-b1fa-7bd1864510a6", "api_version": "v1", "endpoint": "generations"},
+    "e5a291b6-3990-495a-b1fa-7bd1864510a6": {"name": "Pixel Art", "id": "e5a291b6-3990-495a-b1fa-7bd1864510a6", "api_version": "v1", "endpoint": "generations"},
+    "magic-potions": {"name": "Magic Potions", "id": "45ab2421-87de-44c8-a07c-3b87e3bfdf84", "api_version": "v1", "endpoint": "generations"},
+    "45ab2421-87de-44c8-a07c-3b87e3bfdf84": {"name": "Magic Potions", "id": "45ab2421-87de-44c8-a07c-3b87e3bfdf84", "api_version": "v1", "endpoint": "generations"},
+    "chest-armor": {"name": "Chest Armor", "id": "302e258f-29b5-4dd8-9a7c-0cd898cb2143", "api_version": "v1", "endpoint": "generations"},
+    "302e258f-29b5-4dd8-9a7c-0cd898cb2143": {"name": "Chest Armor", "id": "302e258f-29b5-4dd8-9a7c-0cd898cb2143", "api_version": "v1", "endpoint": "generations"},
+    "crystal-deposits": {"name": "Crystal Deposits", "id": "102a8ee0-cf16-477c-8477-c76963a0d766", "api_version": "v1", "endpoint": "generations"},
+    "102a8ee0-cf16-477c-8477-c76963a0d766": {"name": "Crystal Deposits", "id": "102a8ee0-cf16-477c-8477-c76963a0d766", "api_version": "v1", "endpoint": "generations"},
+    "character-portraits": {"name": "Character Portraits", "id": "6c95de60-a0bc-4f90-b637-ee8971caf3b0", "api_version": "v1", "endpoint": "generations"},
+    "6c95de60-a0bc-4f90-b637-ee8971caf3b0": {"name": "Character Portraits", "id": "6c95de60-a0bc-4f90-b637-ee8971caf3b0", "api_version": "v1", "endpoint": "generations"},
+    "magic-items": {"name": "Magic Items", "id": "2d18c0af-374e-4391-9ca2-639f59837c85", "api_version": "v1", "endpoint": "generations"},
+    "2d18c0af-374e-4391-9ca2-639f59837c85": {"name": "Magic Items", "id": "2d18c0af-374e-4391-9ca2-639f59837c85", "api_version": "v1", "endpoint": "generations"},
+    "shields": {"name": "Shields", "id": "ee0fc1a3-aacb-48bf-9234-ada3cc02748f", "api_version": "v1", "endpoint": "generations"},
+    "ee0fc1a3-aacb-48bf-9234-ada3cc02748f": {"name": "Shields", "id": "ee0fc1a3-aacb-48bf-9234-ada3cc02748f", "api_version": "v1", "endpoint": "generations"},
+    "spirit-creatures": {"name": "Spirit Creatures", "id": "5fdadebb-17ae-472c-bf76-877e657f97de", "api_version": "v1", "endpoint": "generations"},
+    "5fdadebb-17ae-472c-bf76-877e657f97de": {"name": "Spirit Creatures", "id": "5fdadebb-17ae-472c-bf76-877e657f97de", "api_version": "v1", "endpoint": "generations"},
+    "cute-animal-characters": {"name": "Cute Animal Characters", "id": "6908bfaf-8cf2-4fda-8c46-03f892d82e06", "api_version": "v1", "endpoint": "generations"},
+    "6908bfaf-8cf2-4fda-8c46-03f892d82e06": {"name": "Cute Animal Characters", "id": "6908bfaf-8cf2-4fda-8c46-03f892d82e06", "api_version": "v1", "endpoint": "generations"},
+    "christmas-stickers": {"name": "Christmas Stickers", "id": "4b2e0f95-f15e-48d8-ada3-c071d6104db8", "api_version": "v1", "endpoint": "generations"},
+    "4b2e0f95-f15e-48d8-ada3-c071d6104db8": {"name": "Christmas Stickers", "id": "4b2e0f95-f15e-48d8-ada3-c071d6104db8", "api_version": "v1", "endpoint": "generations"},
+    "isometric-scifi-buildings": {"name": "Isometric Scifi Buildings", "id": "7a65f0ab-64a7-4be2-bcf3-64a1cc56f627", "api_version": "v1", "endpoint": "generations"},
+    "7a65f0ab-64a7-4be2-bcf3-64a1cc56f627": {"name": "Isometric Scifi Buildings", "id": "7a65f0ab-64a7-4be2-bcf3-64a1cc56f627", "api_version": "v1", "endpoint": "generations"},
+    "isometric-fantasy": {"name": "Isometric Fantasy", "id": "ab200606-5d09-4e1e-9050-0b05b839e944", "api_version": "v1", "endpoint": "generations"},
+    "ab200606-5d09-4e1e-9050-0b05b839e944": {"name": "Isometric Fantasy", "id": "ab200606-5d09-4e1e-9050-0b05b839e944", "api_version": "v1", "endpoint": "generations"},
+    "cute-characters": {"name": "Cute Characters", "id": "50c4f43b-f086-4838-bcac-820406244cec", "api_version": "v1", "endpoint": "generations"},
+    "50c4f43b-f086-4838-bcac-820406244cec": {"name": "Cute Characters", "id": "50c4f43b-f086-4838-bcac-820406244cec", "api_version": "v1", "endpoint": "generations"},
+    "amulets": {"name": "Amulets", "id": "ff883b60-9040-4c18-8d4e-ba7522c6b71d", "api_version": "v1", "endpoint": "generations"},
+    "ff883b60-9040-4c18-8d4e-ba7522c6b71d": {"name": "Amulets", "id": "ff883b60-9040-4c18-8d4e-ba7522c6b71d", "api_version": "v1", "endpoint": "generations"},
+    "crystal-deposits-alternate": {"name": "Crystal Deposits Alternate", "id": "5fce4543-8e23-4b77-9c3f-202b3f1c211e", "api_version": "v1", "endpoint": "generations"},
+    "5fce4543-8e23-4b77-9c3f-202b3f1c211e": {"name": "Crystal Deposits Alternate", "id": "5fce4543-8e23-4b77-9c3f-202b3f1c211e", "api_version": "v1", "endpoint": "generations"},
+    "isometric-asteroid-tiles": {"name": "Isometric Asteroid Tiles", "id": "756be0a8-38b1-4946-ad62-c0ac832422e3", "api_version": "v1", "endpoint": "generations"},
+    "756be0a8-38b1-4946-ad62-c0ac832422e3": {"name": "Isometric Asteroid Tiles", "id": "756be0a8-38b1-4946-ad62-c0ac832422e3", "api_version": "v1", "endpoint": "generations"},
+    "leonardo-signature": {"name": "Leonardo Signature", "id": "291be633-cb24-434f-898f-e662799936ad", "api_version": "v1", "endpoint": "generations"},
+    "291be633-cb24-434f-898f-e662799936ad": {"name": "Leonardo Signature", "id": "291be633-cb24-434f-898f-e662799936ad", "api_version": "v1", "endpoint": "generations"},
+
+
+    # Special Aliases and V2 Models
+    "universal": {"name": "Universal Enhanced", "id": "6bef9f1b-713b-4271-9231-ef9090632332", "api_version": "v1", "endpoint": "generations"},
+    "6bef9f1b-713b-4271-9231-ef9090632332": {"name": "Universal Enhanced", "id": "6bef9f1b-713b-4271-9231-ef9090632332", "api_version": "v1", "endpoint": "generations"},
+    "gemini-image-2": {"name": "Nano Banana Pro", "id": "gemini-image-2", "api_version": "v2", "endpoint": "generations"},
+    "flux-pro-2.0": {"name": "FLUX.2 Pro", "id": "flux-pro-2.0", "api_version": "v2", "endpoint": "generations"},
+}
+
+# Static Leonardo.ai generator configuration, built once at import
+LEONARDO_GENERATOR_CONFIG = {
+    "name": "Leonardo.ai API",
+    "type": "api",
+    "description": "Professional game asset generator with model selection",
+    "api_endpoint": "https://cloud.leonardo.ai/api/rest/v1/generations",
+    "max_resolution": (1024, 1024),
+    "quality": "Professional",
+    "speed": "Fast",
+    "cost": "Paid",
+    "features": ["text-to-image", "fine-tuned-models", "texture-generation"],
+    "models": {
+        "lucid-origin": {
+            "id": "7b592283-e8a7-4c5a-9ba6-d18c31f258b9",
+            "name": "Lucid Origin",
+            "description": "Your go-to model for vibrant, diverse imagery in HD output. Excellent prompt adherence and text rendering.",
+            "max_resolution": (1024, 1024),
+            "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
+            "note": "Official Leonardo model"
+        },
+        "flux-1-kontext": {
+            "id": "28aeddf8-bd19-4803-80fc-79602d1a9989",
+            "name": "FLUX.1 Kontext",
+            "description": "FLUX.1 Kontext is an Omni model by Black Forest Labs, built for precise, controllable image generation and editing",
+            "max_resolution": (1024, 1024),
+            "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
+            "note": "Official Leonardo model"
+        },
+        "lucid-realism": {
+            "id": "05ce0082-2d80-4a2d-8653-4d1c85e2418e",
+            "name": "Lucid Realism",
+            "description": "A high-speed model, designed for efficient, quick outputs. Perfect for fast-paced projects without sacrificing quality.",
+            "max_resolution": (1024, 1024),
+            "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
+            "note": "Official Leonardo model"
+        },
+        "phoenix-1-0": {
+            "id": "de7d3faf-762f-48e0-b3b7-9d0ac3a3fcf3",
+            "name": "Phoenix 1.0",
+            "description": "Leonardo's proprietary foundational model, delivering exceptional prompt adherence and text rendering.",
+            "max_resolution": (1024, 1024),
+            "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
+            "note": "Official Leonardo model"
+        },
+        "flux-dev": {
+            "id": "b2614463-296c-462a-9586-aafdb8f00e36",
+            "name": "Flux Dev",
+            "description": "A specialized model built for developers. Great for rapid prototyping and creative iteration.",
+            "max_resolution": (1024, 1024),
+            "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
+            "note": "Official Leonardo model"
+        },
+        "flux-schnell": {
+            "id": "1dd50843-d653-4516-a8e3-f0238ee453ff",
+            "name": "Flux Schnell",
+            "description": "A high-speed model, designed for efficient, quick outputs. Perfect for fast-paced projects without sacrificing quality.",
+            "max_resolution": (1024, 1024),
+            "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
+            "note": "Official Leonardo model"
+        },
+        "phoenix-0-9": {
+            "id": "6b645e3a-d64f-4341-a6d8-7a3690fbf042",
+            "name": "Phoenix 0.9",
+            "description": "Preview of our foundational model. Extreme prompt adherence and text rendering.",
+            "max_resolution": (1024, 1024),
+            "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
+            "note": "Official Leonardo model"
+        },
+        "leonardo-anime-xl": {
+            "id": "e71a1c2f-4f80-4800-934f-2c68979d8cc8",
+            "name": "Leonardo Anime XL",
+            "description": "A new high-speed Anime-focused model that excels at a range of anime, illustrative, and CG styles.",
+            "max_resolution": (1024, 1024),
+            "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
+            "note": "Official Leonardo model"
+        },
+        "leonardo-lightning-xl": {
+            "id": "b24e16ff-06e3-43eb-8d33-4416c2d75876",
+            "name": "Leonardo Lightning XL",
+            "description": "Our new high-speed generalist image gen model. Great at everything from photorealism to painterly styles.",
+            "max_resolution": (1024, 1024),
+            "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
+            "note": "Official Leonardo model"
+        },
+        "sdxl-1-0": {
+            "id": "16e7060a-803e-4df3-97ee-edcfa5dc9cc8",
+            "name": "SDXL 1.0",
+            "description": "Diffusion-based text-to-image generative model",
+            "max_resolution": (1024, 1024),
+            "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
+            "note": "Official Leonardo model"
+        },
+        "leonardo-kino-xl": {
+            "id": "aa77f04e-3eec-4034-9c07-d0f619684628",
+            "name": "Leonardo Kino XL",
+            "description": "A model with a strong focus on cinematic outputs. Excels at wider aspect ratios, and does not need a negative prompt.",
+            "max_resolution": (1024, 1024),
+            "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
+            "note": "Official Leonardo model"
+        },
+        "leonardo-vision-xl": {
+            "id": "5c232a9e-9061-4777-980a-ddc8e65647c6",
+            "name": "Leonardo Vision XL",
+            "description": "A versatile model that excels at realism and photography. Better results with longer prompts.",
+            "max_resolution": (1024, 1024),
+            "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
+            "note": "Official Leonardo model"
+        },
+        "leonardo-diffusion-xl": {
+            "id": "1e60896f-3c26-4296-8ecc-53e2afecc132",
+            "name": "Leonardo Diffusion XL",
+            "description": "The next phase of the core Leonardo model. Stunning outputs, even with short prompts.",
+            "max_resolution": (1024, 1024),
+            "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
+            "note": "Official Leonardo model"
+        },
+        "albedobase-xl": {
+            "id": "2067ae52-33fd-4a82-bb92-c2c55e7d2786",
+            "name": "AlbedoBase XL",
+            "description": "A great generalist model that tends towards more CG artistic outputs. By albedobond.",
+            "max_resolution": (1024, 1024),
+            "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
+            "note": "Official Leonardo model"
+        },
+        "rpg-v5": {
+            "id": "f1929ea3-b169-4c18-a16c-5d58b4292c69",
+            "name": "RPG v5",
+            "description": "Anashel returns with another great model, specialising in RPG characters of all kinds.",
+            "max_resolution": (1024, 1024),
+            "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
+            "note": "Official Leonardo model"
+        },
+        "sdxl-0-9": {
+            "id": "b63f7119-31dc-4540-969b-2a9df997e173",
+            "name": "SDXL 0.9",
+            "description": "The latest Stable Diffusion model, currently in Beta.",
+            "max_resolution": (1024, 1024),
+            "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
+            "note": "Official Leonardo model"
+        },
+        "3d-animation-style": {
+            "id": "d69c8273-6b17-4a30-a13e-d6637ae1c644",
+            "name": "3D Animation Style",
+            "description": "Great at 3D film vibes, capable of complex scenes with rich color. Storyboard time!",
+            "max_resolution": (1024, 1024),
+            "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
+            "note": "Official Leonardo model"
+        },
+        "dreamshaper-v7": {
+            "id": "ac614f96-1082-45bf-be9d-757f2d31c174",
+            "name": "DreamShaper v7",
+            "description": "Lykon is back with another update. This model is great at a range of different styles.",
+            "max_resolution": (1024, 1024),
+            "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
+            "note": "Official Leonardo model"
+        },
+        "absolute-reality-v1-6": {
+            "id": "e316348f-7773-490e-adcd-46757c738eb7",
+            "name": "Absolute Reality v1.6",
+            "description": "A photorealistic style model from Lykon. Great at all sorts of photorealism.",
+            "max_resolution": (1024, 1024),
+            "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
+            "note": "Official Leonardo model"
+        },
+        "anime-pastel-dream": {
+            "id": "1aa0f478-51be-4efd-94e8-76bfc8f533af",
+            "name": "Anime Pastel Dream",
+            "description": "Pastel anime styling. Use with PMv3 and the anime preset for incredible range. Model by Lykon.",
+            "max_resolution": (1024, 1024),
+            "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
+            "note": "Official Leonardo model"
+        },
+        "dreamshaper-v6": {
+            "id": "b7aa9939-abed-4d4e-96c4-140b8c65dd92",
+            "name": "DreamShaper v6",
+            "description": "A new update to an incredibly versatile model, excels at both people and environments, by Lykon.",
+            "max_resolution": (1024, 1024),
+            "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
+            "note": "Official Leonardo model"
+        },
+        "dreamshaper-v5": {
+            "id": "d2fb9cf9-7999-4ae5-8bfe-f0df2d32abf8",
+            "name": "DreamShaper v5",
+            "description": "A versatile model great at both photorealism and anime, includes noise offset training, by Lykon.",
+            "max_resolution": (1024, 1024),
+            "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
+            "note": "Official Leonardo model"
+        },
+        "leonardo-diffusion": {
+            "id": "b820ea11-02bf-4652-97ae-9ac0cc00593d",
+            "name": "Leonardo Diffusion",
+            "description": "A model with incredible shading and contrast, great at both photos and artistic styles, by cac0e.",
+            "max_resolution": (1024, 1024),
+            "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
+            "note": "Official Leonardo model"
+        },
+        "rpg-4-0": {
+            "id": "a097c2df-8f0c-4029-ae0f-8fd349055e61",
+            "name": "RPG 4.0",
+            "description": "This model is best at creating RPG character portraits with the ability for great photorealism. Created by Anashel.",
+            "max_resolution": (1024, 1024),
+            "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
+            "note": "Official Leonardo model"
+        },
+        "deliberate-1-1": {
+            "id": "458ecfff-f76c-402c-8b85-f09f6fb198de",
+            "name": "Deliberate 1.1",
+            "description": "A powerful model created by XpucT that  is great for both photorealism and artistic creations.",
+            "max_resolution": (1024, 1024),
+            "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
+            "note": "Official Leonardo model"
+        },
+        "vintage-style-photography": {
+            "id": "17e4edbf-690b-425d-a466-53c816f0de8a",
+            "name": "Vintage Style Photography",
+            "description": "This model can generate a broad range of imagery with a vintage style as if it was taken from a film camera",
+            "max_resolution": (1024, 1024),
+            "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
+            "note": "Official Leonardo model"
+        },
+        "dreamshaper-3-2": {
+            "id": "f3296a34-9aef-4370-ad18-88daf26862c3",
+            "name": "DreamShaper 3.2",
+            "description": "This model by Lykon is great at a range of portrait styles as well as artistic backgrounds.",
+            "max_resolution": (1024, 1024),
+            "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
+            "note": "Official Leonardo model"
+        },
+        "leonardo-select": {
+            "id": "cd2b2a15-9760-4174-a5ff-4d2925057376",
+            "name": "Leonardo Select",
+            "description": "A powerful finetune of SD2.1 that can achieve a high level of realism.",
+            "max_resolution": (1024, 1024),
+            "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
+            "note": "Official Leonardo model"
+        },
+        "leonardo-creative": {
+            "id": "6bef9f1b-29cb-40c7-b9df-32b51c1f67d3",
+            "name": "Leonardo Creative",
+            "description": "An alternative finetune of SD 2.1 that brings a little more creative interpretation to the mix.",
+            "max_resolution": (1024, 1024),
+            "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
+            "note": "Official Leonardo model"
+        },
+        "battle-axes": {
+            "id": "47a6232a-1d49-4c95-83c3-2cc5342f82c7",
+            "name": "Battle Axes",
+            "description": "Generate a variety of detailed axe designs with this model. From medieval battle axes to modern chopping axes, this model is great for creating a r...",
+            "max_resolution": (1024, 1024),
+            "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
+            "note": "Official Leonardo model"
+        },
+        "pixel-art": {
+            "id": "e5a291b6-3990-495a-b1fa-7bd1864510a6",
+            "name": "Pixel Art",
+            "description": "A pixel art model that's trained on headshots, but is surprisingly flexible with all sorts of subjects.",
+            "max_resolution": (1024, 1024),
+            "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
+            "note": "Official Leonardo model"
+        },
+        "magic-potions": {
+            "id": "45ab2421-87de-44c8-a07c-3b87e3bfdf84",
+            "name": "Magic Potions",
+            "description": "A great model for creating incredible semi-realistic magic potions. Try appending \"intricately detailed, 3d vray render\" to your prompt.",
+            "max_resolution": (1024, 1024),
+            "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
+            "note": "Official Leonardo model"
+        },
+        "chest-armor": {
+            "id": "302e258f-29b5-4dd8-9a7c-0cd898cb2143",
+            "name": "Chest Armor",
+            "description": "Create all sorts of chest armor with this model in a consistent style but with wide thematic range.",
+            "max_resolution": (1024, 1024),
+            "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
+            "note": "Official Leonardo model"
+        },
+        "crystal-deposits": {
+            "id": "102a8ee0-cf16-477c-8477-c76963a0d766",
+            "name": "Crystal Deposits",
+            "description": "A model for creating crystal deposits. Well-suited for use as items or in an isometric environment.",
+            "max_resolution": (1024, 1024),
+            "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
+            "note": "Official Leonardo model"
+        },
+        "character-portraits": {
+            "id": "6c95de60-a0bc-4f90-b637-ee8971caf3b0",
+            "name": "Character Portraits",
+            "description": "A model that's for creating awesome RPG characters of varying classes in a consistent style.",
+            "max_resolution": (1024, 1024),
+            "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
+            "note": "Official Leonardo model"
+        },
+        "magic-items": {
+            "id": "2d18c0af-374e-4391-9ca2-639f59837c85",
+            "name": "Magic Items",
+            "description": "Create a wide range of magical items like weapons, shields, boots, books. Very versatile.",
+            "max_resolution": (1024, 1024),
+            "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
+            "note": "Official Leonardo model"
+        },
+        "shields": {
+            "id": "ee0fc1a3-aacb-48bf-9234-ada3cc02748f",
+            "name": "Shields",
+            "description": "Create a variety of impressively varied and detailed shield designs. Allows for an incredible range of material types.",
+            "max_resolution": (1024, 1024),
+            "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
+            "note": "Official Leonardo model"
+        },
+        "spirit-creatures": {
+            "id": "5fdadebb-17ae-472c-bf76-877e657f97de",
+            "name": "Spirit Creatures",
+            "description": "From whimsical fairy-like beings to mythical creatures, create unique cute spirit characters.",
+            "max_resolution": (1024, 1024),
+            "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
+            "note": "Official Leonardo model"
+        },
+        "cute-animal-characters": {
+            "id": "6908bfaf-8cf2-4fda-8c46-03f892d82e06",
+            "name": "Cute Animal Characters",
+            "description": "Perfect for creating adorable and cute animal characters - loveable and playful designs.",
+            "max_resolution": (1024, 1024),
+            "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
+            "note": "Official Leonardo model"
+        },
+        "christmas-stickers": {
+            "id": "4b2e0f95-f15e-48d8-ada3-c071d6104db8",
+            "name": "Christmas Stickers",
+            "description": "Generate festive and fun Christmas stickers with this model. From cute and colorful to traditional and elegant.",
+            "max_resolution": (1024, 1024),
+            "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
+            "note": "Official Leonardo model"
+        },
+        "isometric-scifi-buildings": {
+            "id": "7a65f0ab-64a7-4be2-bcf3-64a1cc56f627",
+            "name": "Isometric Scifi Buildings",
+            "description": "Great at creating scifi buildings of varying themes. Append the word isometric to your prompt to ensure an isometric view. \"3d vray render\" also helps steer the generation well. ",
+            "max_resolution": (1024, 1024),
+            "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
+            "note": "Official Leonardo model"
+        },
+        "isometric-fantasy": {
+            "id": "ab200606-5d09-4e1e-9050-0b05b839e944",
+            "name": "Isometric Fantasy",
+            "description": "Create all sorts of isometric fantasy environments. Try appending \"3d vray render, isometric\" and using a guidance scale of 6. For the negative prompt, try \"unclear, harsh, oversaturated, soft, blurry\".",
+            "max_resolution": (1024, 1024),
+            "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
+            "note": "Official Leonardo model"
+        },
+        "cute-characters": {
+            "id": "50c4f43b-f086-4838-bcac-820406244cec",
+            "name": "Cute Characters",
+            "description": "Create cute and charming game characters, perfect for adding some whimsy to your game design. Be sure to include the word \"character\" in your prompts for best results.",
+            "max_resolution": (1024, 1024),
+            "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
+            "note": "Official Leonardo model"
+        },
+        "amulets": {
+            "id": "ff883b60-9040-4c18-8d4e-ba7522c6b71d",
+            "name": "Amulets",
+            "description": "Create unique and intricate amulets, jewellery and more. Try loading up the prompt terms to steer it in interesting directions.",
+            "max_resolution": (1024, 1024),
+            "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
+            "note": "Official Leonardo model"
+        },
+        "crystal-deposits-alternate": {
+            "id": "5fce4543-8e23-4b77-9c3f-202b3f1c211e",
+            "name": "Crystal Deposits Alternate",
+            "description": "An alternative crystal deposits model that gives a slightly more realistic feel with its creations. Try using \"object\" and \"3d vray render\" in your prompts.",
+            "max_resolution": (1024, 1024),
+            "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
+            "note": "Official Leonardo model"
+        },
+        "isometric-asteroid-tiles": {
+            "id": "756be0a8-38b1-4946-ad62-c0ac832422e3",
+            "name": "Isometric Asteroid Tiles",
+            "description": "A model for creating isometric asteroid environment tiles. Try appending \"3d vray render, unreal engine, beautiful, intricately detailed, trending on artstation, 8k\" to your prompt.",
+            "max_resolution": (1024, 1024),
+            "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
+            "note": "Official Leonardo model"
+        },
+        "leonardo-signature": {
+            "id": "291be633-cb24-434f-898f-e662799936ad",
+            "name": "Leonardo Signature",
+            "description": "The core model of the Leonardo platform. An extremely powerful and diverse finetune which is highly effective for a wide range of uses.",
+            "max_resolution": (1024, 1024),
+            "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
+            "note": "Official Leonardo model"
+        },
+
+        "universal": {
+            "id": "6bef9f1b-713b-4271-9231-ef9090632332",
+            "name": "Universal Enhanced",
+            "description": "Universal model with advanced prompt optimization",
+            "max_resolution": (1024, 1024),
+            "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
+            "note": "Optimized for all content types"
+        },
+        "gemini-image-2": {
+            "id": "gemini-image-2",
+            "name": "Nano Banana Pro",
+            "description": "State-of-the-art V2 generation model",
+            "max_resolution": (1024, 1024),
+            "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
+            "note": "V2 Engine Structure"
+        },
+        "flux-pro-2.0": {
+            "id": "flux-pro-2.0",
+            "name": "FLUX.2 Pro",
+            "description": "High fidelity V2 generation model",
+            "max_resolution": (1024, 1024),
+            "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
+            "note": "V2 Engine Structure"
+        },
+    },
+    "preset_styles": [
+        {"id": "CREATIVE", "name": "Creative", "description": "Balanced creative output"},
+        {"id": "DYNAMIC", "name": "Dynamic", "description": "More dynamic and dramatic"},
+        {"id": "CINEMATIC", "name": "Cinematic", "description": "Movie-like quality"},
+        {"id": "FANTASY_ART", "name": "Fantasy Art", "description": "Fantasy themed"},
+        {"id": "ANIME", "name": "Anime", "description": "Anime style"},
+        {"id": "COMIC_BOOK", "name": "Comic Book", "description": "Comic book style"}
+    ],
+    "quality_levels": [
+        {"id": "standard", "name": "Standard", "description": "Good quality, faster generation"},
+        {"id": "high", "name": "High", "description": "Better quality, moderate time"},
+        {"id": "ultra", "name": "Ultra", "description": "Best quality, longer time"}
+    ],
+    "aspect_ratios": [
+        {"id": "1:1", "name": "Square", "resolution": (1024, 1024)},
+        {"id": "16:9", "name": "Widescreen", "resolution": (1344, 768)},
+        {"id": "9:16", "name": "Portrait", "resolution": (768, 1344)},
+        {"id": "4:3", "name": "Standard", "resolution": (1024, 768)},
+        {"id": "3:4", "name": "Vertical", "resolution": (768, 1024)},
+        {"id": "2:3", "name": "Tall", "resolution": (832, 1216)},
+        {"id": "3:2", "name": "Wide", "resolution": (1216, 832)}
+    ]
+}
+
 # Modal imports - will be imported conditionally
 try:
     import modal
@@ -39,12 +698,28 @@ class ModernGeneratorManager:
         self.generators = {}
         self.current_generator = None
         self.api_keys = {}
+        self._valid_api_keys = {}
         self.api_keys_file = "api_keys.json"
+        self._save_pending = False
+        self.image_cache_dir = "leonardo_cache"
+        self.image_cache_max_bytes = 500 * 1024 * 1024
         self.pending_callbacks = {}
-        self._leonardo_platform_models_cache = {
-            "fetched_at": 0.0,
-            "models": []
-        }
+        # Event loop -> aiohttp session; app.py runs each generation in its own asyncio.run()
+        self._sessions = {}
+        self._httpx_clients = {}
+        self._leonardo_concurrency = int(os.environ.get("VISIONCRAFT_LEONARDO_CONCURRENCY", "4"))
+        # A thread semaphore, since app.py runs each generation in its own event loop
+        self._leonardo_semaphore = threading.BoundedSemaphore(self._leonardo_concurrency)
+        self._leonardo_rate_limiter = TokenBucket(rate=2.0, capacity=4)
+        self._inflight_generations = {}
+        self._http = requests.Session()
+        self._http.mount("https://", HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=16,
+            max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+        ))
+        self.platform_models_cache_file = "leonardo_platform_models.json"
+        self._leonardo_platform_models_cache = self._load_platform_models_cache()
         
         # Load API keys on initialization
         print("Initializing ModernGeneratorManager...")
@@ -206,52 +881,75 @@ class ModernGeneratorManager:
             print(f"[PROMPT] Gemini enhancement failed: {e}")
             return None
 
+    def _load_platform_models_cache(self) -> Dict[str, Any]:
+        """Load the platform models saved by a previous run, so restarts within the TTL skip the API call"""
+        try:
+            with open(self.platform_models_cache_file, 'rb') as f:
+                cache = _json_loads(f.read())
+            if isinstance(cache.get("models"), list):
+                return {"fetched_at": float(cache.get("fetched_at", 0.0)), "models": cache["models"]}
+        except (OSError, ValueError, AttributeError):
+            pass
+        return {"fetched_at": 0.0, "models": []}
+
+    def _save_platform_models_cache(self):
+        """Persist the platform models cache atomically"""
+        tmp_file = self.platform_models_cache_file + ".tmp"
+        try:
+            with open(tmp_file, 'wb') as f:
+                f.write(_json_dumps(self._leonardo_platform_models_cache))
+            os.replace(tmp_file, self.platform_models_cache_file)
+        except OSError as e:
+            logger.warning("[WARNING] Could not save platform models cache: %s", e)
+
     def _fetch_leonardo_platform_models(self, force: bool = False) -> List[Dict[str, Any]]:
         """Fetch Leonardo platform models (requires API key). Cached to avoid repeated calls."""
         cache_ttl_s = 10 * 60
         now = time.time()
 
         if not force and (now - float(self._leonardo_platform_models_cache.get("fetched_at", 0.0)) < cache_ttl_s):
-            print(f"[LEONARDO] Using cached platform models ({len(self._leonardo_platform_models_cache.get('models', []))} models)")
+            logger.debug("[LEONARDO] Using cached platform models (%d models)", len(self._leonardo_platform_models_cache.get("models", [])))
             return self._leonardo_platform_models_cache.get("models", [])
 
         api_key = self.api_keys.get("leonardo-api")
         if not api_key:
-            print("[LEONARDO] No API key configured, cannot fetch platform models")
+            logger.info("[LEONARDO] No API key configured, cannot fetch platform models")
             return []
 
         headers = {
             "accept": "application/json",
+            "accept-encoding": LEONARDO_ACCEPT_ENCODING,
             "authorization": f"Bearer {api_key}",
         }
 
         url = "https://cloud.leonardo.ai/api/rest/v1/platformModels"
-        print(f"[LEONARDO] Fetching platform models from: {url}")
+        logger.debug("[LEONARDO] Fetching platform models from: %s", url)
         try:
-            resp = requests.get(url, headers=headers, timeout=20)
-            print(f"[LEONARDO] Response status: {resp.status_code}")
+            resp = self._http.get(url, headers=headers, timeout=20)
+            logger.debug("[LEONARDO] Response status: %s", resp.status_code)
             resp.raise_for_status()
-            data = resp.json() or {}
-            print(f"[LEONARDO] Response keys: {list(data.keys())}")
+            data = _json_loads(resp.content) or {}
+            logger.debug("[LEONARDO] Response keys: %s", list(data.keys()))
 
             models = data.get("platformModels") or data.get("models") or []
             if not isinstance(models, list):
                 models = []
-            print(f"[LEONARDO] Fetched {len(models)} platform models")
+            logger.info("[LEONARDO] Fetched %d platform models", len(models))
 
             self._leonardo_platform_models_cache = {
                 "fetched_at": now,
                 "models": models,
             }
+            self._save_platform_models_cache()
             return models
         except Exception as e:
-            print(f"[WARNING] Failed to fetch Leonardo platform models: {e}")
+            logger.warning("[WARNING] Failed to fetch Leonardo platform models: %s", e)
             return self._leonardo_platform_models_cache.get("models", [])
 
     def _merge_leonardo_platform_models_into_generator(self):
         """Merge live Leonardo platform models into available_generators['leonardo-api']['models']."""
         if "leonardo-api" not in self.available_generators:
-            print("[LEONARDO] leonardo-api not in available_generators")
+            logger.debug("[LEONARDO] leonardo-api not in available_generators")
             return
 
         generator_info = self.available_generators["leonardo-api"]
@@ -262,7 +960,7 @@ class ModernGeneratorManager:
         platform_models = self._fetch_leonardo_platform_models(force=False)
         merged = dict(base_models)
 
-        print(f"[LEONARDO] Merging {len(platform_models)} platform models into {len(base_models)} base models")
+        logger.debug("[LEONARDO] Merging %d platform models into %d base models", len(platform_models), len(base_models))
         for m in platform_models:
             model_id = m.get("id")
             name = m.get("name")
@@ -279,126 +977,32 @@ class ModernGeneratorManager:
             }
 
         generator_info["models"] = merged
-        print(f"[LEONARDO] After merge: {len(merged)} total models")
+        self._leonardo_options = None
+        logger.debug("[LEONARDO] After merge: %d total models", len(merged))
 
     def _leonardo_model_config(self, model_key: str) -> dict:
         """Return Leonardo model config: api_version, endpoint, modelId, and payload shape."""
-        # Explicit mappings from Leonardo docs
-        # These map both UUIDs and human-readable internal keys to their config
-        mapping = {
-            "lucid-origin": {"name": "Lucid Origin", "id": "7b592283-e8a7-4c5a-9ba6-d18c31f258b9", "api_version": "v1", "endpoint": "generations"},
-            "7b592283-e8a7-4c5a-9ba6-d18c31f258b9": {"name": "Lucid Origin", "id": "7b592283-e8a7-4c5a-9ba6-d18c31f258b9", "api_version": "v1", "endpoint": "generations"},
-            "flux-1-kontext": {"name": "FLUX.1 Kontext", "id": "28aeddf8-bd19-4803-80fc-79602d1a9989", "api_version": "v1", "endpoint": "generations"},
-            "28aeddf8-bd19-4803-80fc-79602d1a9989": {"name": "FLUX.1 Kontext", "id": "28aeddf8-bd19-4803-80fc-79602d1a9989", "api_version": "v1", "endpoint": "generations"},
-            "lucid-realism": {"name": "Lucid Realism", "id": "05ce0082-2d80-4a2d-8653-4d1c85e2418e", "api_version": "v1", "endpoint": "generations"},
-            "05ce0082-2d80-4a2d-8653-4d1c85e2418e": {"name": "Lucid Realism", "id": "05ce0082-2d80-4a2d-8653-4d1c85e2418e", "api_version": "v1", "endpoint": "generations"},
-            "phoenix-1-0": {"name": "Phoenix 1.0", "id": "de7d3faf-762f-48e0-b3b7-9d0ac3a3fcf3", "api_version": "v1", "endpoint": "generations"},
-            "de7d3faf-762f-48e0-b3b7-9d0ac3a3fcf3": {"name": "Phoenix 1.0", "id": "de7d3faf-762f-48e0-b3b7-9d0ac3a3fcf3", "api_version": "v1", "endpoint": "generations"},
-            "flux-dev": {"name": "Flux Dev", "id": "b2614463-296c-462a-9586-aafdb8f00e36", "api_version": "v1", "endpoint": "generations"},
-            "b2614463-296c-462a-9586-aafdb8f00e36": {"name": "Flux Dev", "id": "b2614463-296c-462a-9586-aafdb8f00e36", "api_version": "v1", "endpoint": "generations"},
-            "flux-schnell": {"name": "Flux Schnell", "id": "1dd50843-d653-4516-a8e3-f0238ee453ff", "api_version": "v1", "endpoint": "generations"},
-            "1dd50843-d653-4516-a8e3-f0238ee453ff": {"name": "Flux Schnell", "id": "1dd50843-d653-4516-a8e3-f0238ee453ff", "api_version": "v1", "endpoint": "generations"},
-            "phoenix-0-9": {"name": "Phoenix 0.9", "id": "6b645e3a-d64f-4341-a6d8-7a3690fbf042", "api_version": "v1", "endpoint": "generations"},
-            "6b645e3a-d64f-4341-a6d8-7a3690fbf042": {"name": "Phoenix 0.9", "id": "6b645e3a-d64f-4341-a6d8-7a3690fbf042", "api_version": "v1", "endpoint": "generations"},
-            "leonardo-anime-xl": {"name": "Leonardo Anime XL", "id": "e71a1c2f-4f80-4800-934f-2c68979d8cc8", "api_version": "v1", "endpoint": "generations"},
-            "e71a1c2f-4f80-4800-934f-2c68979d8cc8": {"name": "Leonardo Anime XL", "id": "e71a1c2f-4f80-4800-934f-2c68979d8cc8", "api_version": "v1", "endpoint": "generations"},
-            "leonardo-lightning-xl": {"name": "Leonardo Lightning XL", "id": "b24e16ff-06e3-43eb-8d33-4416c2d75876", "api_version": "v1", "endpoint": "generations"},
-            "b24e16ff-06e3-43eb-8d33-4416c2d75876": {"name": "Leonardo Lightning XL", "id": "b24e16ff-06e3-43eb-8d33-4416c2d75876", "api_version": "v1", "endpoint": "generations"},
-            "sdxl-1-0": {"name": "SDXL 1.0", "id": "16e7060a-803e-4df3-97ee-edcfa5dc9cc8", "api_version": "v1", "endpoint": "generations"},
-            "16e7060a-803e-4df3-97ee-edcfa5dc9cc8": {"name": "SDXL 1.0", "id": "16e7060a-803e-4df3-97ee-edcfa5dc9cc8", "api_version": "v1", "endpoint": "generations"},
-            "leonardo-kino-xl": {"name": "Leonardo Kino XL", "id": "aa77f04e-3eec-4034-9c07-d0f619684628", "api_version": "v1", "endpoint": "generations"},
-            "aa77f04e-3eec-4034-9c07-d0f619684628": {"name": "Leonardo Kino XL", "id": "aa77f04e-3eec-4034-9c07-d0f619684628", "api_version": "v1", "endpoint": "generations"},
-            "leonardo-vision-xl": {"name": "Leonardo Vision XL", "id": "5c232a9e-9061-4777-980a-ddc8e65647c6", "api_version": "v1", "endpoint": "generations"},
-            "5c232a9e-9061-4777-980a-ddc8e65647c6": {"name": "Leonardo Vision XL", "id": "5c232a9e-9061-4777-980a-ddc8e65647c6", "api_version": "v1", "endpoint": "generations"},
-            "leonardo-diffusion-xl": {"name": "Leonardo Diffusion XL", "id": "1e60896f-3c26-4296-8ecc-53e2afecc132", "api_version": "v1", "endpoint": "generations"},
-            "1e60896f-3c26-4296-8ecc-53e2afecc132": {"name": "Leonardo Diffusion XL", "id": "1e60896f-3c26-4296-8ecc-53e2afecc132", "api_version": "v1", "endpoint": "generations"},
-            "albedobase-xl": {"name": "AlbedoBase XL", "id": "2067ae52-33fd-4a82-bb92-c2c55e7d2786", "api_version": "v1", "endpoint": "generations"},
-            "2067ae52-33fd-4a82-bb92-c2c55e7d2786": {"name": "AlbedoBase XL", "id": "2067ae52-33fd-4a82-bb92-c2c55e7d2786", "api_version": "v1", "endpoint": "generations"},
-            "rpg-v5": {"name": "RPG v5", "id": "f1929ea3-b169-4c18-a16c-5d58b4292c69", "api_version": "v1", "endpoint": "generations"},
-            "f1929ea3-b169-4c18-a16c-5d58b4292c69": {"name": "RPG v5", "id": "f1929ea3-b169-4c18-a16c-5d58b4292c69", "api_version": "v1", "endpoint": "generations"},
-            "sdxl-0-9": {"name": "SDXL 0.9", "id": "b63f7119-31dc-4540-969b-2a9df997e173", "api_version": "v1", "endpoint": "generations"},
-            "b63f7119-31dc-4540-969b-2a9df997e173": {"name": "SDXL 0.9", "id": "b63f7119-31dc-4540-969b-2a9df997e173", "api_version": "v1", "endpoint": "generations"},
-            "3d-animation-style": {"name": "3D Animation Style", "id": "d69c8273-6b17-4a30-a13e-d6637ae1c644", "api_version": "v1", "endpoint": "generations"},
-            "d69c8273-6b17-4a30-a13e-d6637ae1c644": {"name": "3D Animation Style", "id": "d69c8273-6b17-4a30-a13e-d6637ae1c644", "api_version": "v1", "endpoint": "generations"},
-            "dreamshaper-v7": {"name": "DreamShaper v7", "id": "ac614f96-1082-45bf-be9d-757f2d31c174", "api_version": "v1", "endpoint": "generations"},
-            "ac614f96-1082-45bf-be9d-757f2d31c174": {"name": "DreamShaper v7", "id": "ac614f96-1082-45bf-be9d-757f2d31c174", "api_version": "v1", "endpoint": "generations"},
-            "absolute-reality-v1-6": {"name": "Absolute Reality v1.6", "id": "e316348f-7773-490e-adcd-46757c738eb7", "api_version": "v1", "endpoint": "generations"},
-            "e316348f-7773-490e-adcd-46757c738eb7": {"name": "Absolute Reality v1.6", "id": "e316348f-7773-490e-adcd-46757c738eb7", "api_version": "v1", "endpoint": "generations"},
-            "anime-pastel-dream": {"name": "Anime Pastel Dream", "id": "1aa0f478-51be-4efd-94e8-76bfc8f533af", "api_version": "v1", "endpoint": "generations"},
-            "1aa0f478-51be-4efd-94e8-76bfc8f533af": {"name": "Anime Pastel Dream", "id": "1aa0f478-51be-4efd-94e8-76bfc8f533af", "api_version": "v1", "endpoint": "generations"},
-            "dreamshaper-v6": {"name": "DreamShaper v6", "id": "b7aa9939-abed-4d4e-96c4-140b8c65dd92", "api_version": "v1", "endpoint": "generations"},
-            "b7aa9939-abed-4d4e-96c4-140b8c65dd92": {"name": "DreamShaper v6", "id": "b7aa9939-abed-4d4e-96c4-140b8c65dd92", "api_version": "v1", "endpoint": "generations"},
-            "dreamshaper-v5": {"name": "DreamShaper v5", "id": "d2fb9cf9-7999-4ae5-8bfe-f0df2d32abf8", "api_version": "v1", "endpoint": "generations"},
-            "d2fb9cf9-7999-4ae5-8bfe-f0df2d32abf8": {"name": "DreamShaper v5", "id": "d2fb9cf9-7999-4ae5-8bfe-f0df2d32abf8", "api_version": "v1", "endpoint": "generations"},
-            "leonardo-diffusion": {"name": "Leonardo Diffusion", "id": "b820ea11-02bf-4652-97ae-9ac0cc00593d", "api_version": "v1", "endpoint": "generations"},
-            "b820ea11-02bf-4652-97ae-9ac0cc00593d": {"name": "Leonardo Diffusion", "id": "b820ea11-02bf-4652-97ae-9ac0cc00593d", "api_version": "v1", "endpoint": "generations"},
-            "rpg-4-0": {"name": "RPG 4.0", "id": "a097c2df-8f0c-4029-ae0f-8fd349055e61", "api_version": "v1", "endpoint": "generations"},
-            "a097c2df-8f0c-4029-ae0f-8fd349055e61": {"name": "RPG 4.0", "id": "a097c2df-8f0c-4029-ae0f-8fd349055e61", "api_version": "v1", "endpoint": "generations"},
-            "deliberate-1-1": {"name": "Deliberate 1.1", "id": "458ecfff-f76c-402c-8b85-f09f6fb198de", "api_version": "v1", "endpoint": "generations"},
-            "458ecfff-f76c-402c-8b85-f09f6fb198de": {"name": "Deliberate 1.1", "id": "458ecfff-f76c-402c-8b85-f09f6fb198de", "api_version": "v1", "endpoint": "generations"},
-            "vintage-style-photography": {"name": "Vintage Style Photography", "id": "17e4edbf-690b-425d-a466-53c816f0de8a", "api_version": "v1", "endpoint": "generations"},
-            "17e4edbf-690b-425d-a466-53c816f0de8a": {"name": "Vintage Style Photography", "id": "17e4edbf-690b-425d-a466-53c816f0de8a", "api_version": "v1", "endpoint": "generations"},
-            "dreamshaper-3-2": {"name": "DreamShaper 3.2", "id": "f3296a34-9aef-4370-ad18-88daf26862c3", "api_version": "v1", "endpoint": "generations"},
-            "f3296a34-9aef-4370-ad18-88daf26862c3": {"name": "DreamShaper 3.2", "id": "f3296a34-9aef-4370-ad18-88daf26862c3", "api_version": "v1", "endpoint": "generations"},
-            "leonardo-select": {"name": "Leonardo Select", "id": "cd2b2a15-9760-4174-a5ff-4d2925057376", "api_version": "v1", "endpoint": "generations"},
-            "cd2b2a15-9760-4174-a5ff-4d2925057376": {"name": "Leonardo Select", "id": "cd2b2a15-9760-4174-a5ff-4d2925057376", "api_version": "v1", "endpoint": "generations"},
-            "leonardo-creative": {"name": "Leonardo Creative", "id": "6bef9f1b-29cb-40c7-b9df-32b51c1f67d3", "api_version": "v1", "endpoint": "generations"},
-            "6bef9f1b-29cb-40c7-b9df-32b51c1f67d3": {"name": "Leonardo Creative", "id": "6bef9f1b-29cb-40c7-b9df-32b51c1f67d3", "api_version": "v1", "endpoint": "generations"},
-            "battle-axes": {"name": "Battle Axes", "id": "47a6232a-1d49-4c95-83c3-2cc5342f82c7", "api_version": "v1", "endpoint": "generations"},
-            "47a6232a-1d49-4c95-83c3-2cc5342f82c7": {"name": "Battle Axes", "id": "47a6232a-1d49-4c95-83c3-2cc5342f82c7", "api_version": "v1", "endpoint": "generations"},
-            "pixel-art": {"name": "Pixel Art", "id": "e5a291b6-3990-495a-b1fa-7bd1864510a6", "api_version": "v1", "endpoint": "generations"},
-            "e5a291b6-3990-495a-b1fa-7bd1864510a6": {"name": "Pixel Art", "id": "e5a291b6-3990-495a-b1fa-7bd1864510a6", "api_version": "v1", "endpoint": "generations"},
-            "magic-potions": {"name": "Magic Potions", "id": "45ab2421-87de-44c8-a07c-3b87e3bfdf84", "api_version": "v1", "endpoint": "generations"},
-            "45ab2421-87de-44c8-a07c-3b87e3bfdf84": {"name": "Magic Potions", "id": "45ab2421-87de-44c8-a07c-3b87e3bfdf84", "api_version": "v1", "endpoint": "generations"},
-            "chest-armor": {"name": "Chest Armor", "id": "302e258f-29b5-4dd8-9a7c-0cd898cb2143", "api_version": "v1", "endpoint": "generations"},
-            "302e258f-29b5-4dd8-9a7c-0cd898cb2143": {"name": "Chest Armor", "id": "302e258f-29b5-4dd8-9a7c-0cd898cb2143", "api_version": "v1", "endpoint": "generations"},
-            "crystal-deposits": {"name": "Crystal Deposits", "id": "102a8ee0-cf16-477c-8477-c76963a0d766", "api_version": "v1", "endpoint": "generations"},
-            "102a8ee0-cf16-477c-8477-c76963a0d766": {"name": "Crystal Deposits", "id": "102a8ee0-cf16-477c-8477-c76963a0d766", "api_version": "v1", "endpoint": "generations"},
-            "character-portraits": {"name": "Character Portraits", "id": "6c95de60-a0bc-4f90-b637-ee8971caf3b0", "api_version": "v1", "endpoint": "generations"},
-            "6c95de60-a0bc-4f90-b637-ee8971caf3b0": {"name": "Character Portraits", "id": "6c95de60-a0bc-4f90-b637-ee8971caf3b0", "api_version": "v1", "endpoint": "generations"},
-            "magic-items": {"name": "Magic Items", "id": "2d18c0af-374e-4391-9ca2-639f59837c85", "api_version": "v1", "endpoint": "generations"},
-            "2d18c0af-374e-4391-9ca2-639f59837c85": {"name": "Magic Items", "id": "2d18c0af-374e-4391-9ca2-639f59837c85", "api_version": "v1", "endpoint": "generations"},
-            "shields": {"name": "Shields", "id": "ee0fc1a3-aacb-48bf-9234-ada3cc02748f", "api_version": "v1", "endpoint": "generations"},
-            "ee0fc1a3-aacb-48bf-9234-ada3cc02748f": {"name": "Shields", "id": "ee0fc1a3-aacb-48bf-9234-ada3cc02748f", "api_version": "v1", "endpoint": "generations"},
-            "spirit-creatures": {"name": "Spirit Creatures", "id": "5fdadebb-17ae-472c-bf76-877e657f97de", "api_version": "v1", "endpoint": "generations"},
-            "5fdadebb-17ae-472c-bf76-877e657f97de": {"name": "Spirit Creatures", "id": "5fdadebb-17ae-472c-bf76-877e657f97de", "api_version": "v1", "endpoint": "generations"},
-            "cute-animal-characters": {"name": "Cute Animal Characters", "id": "6908bfaf-8cf2-4fda-8c46-03f892d82e06", "api_version": "v1", "endpoint": "generations"},
-            "6908bfaf-8cf2-4fda-8c46-03f892d82e06": {"name": "Cute Animal Characters", "id": "6908bfaf-8cf2-4fda-8c46-03f892d82e06", "api_version": "v1", "endpoint": "generations"},
-            "christmas-stickers": {"name": "Christmas Stickers", "id": "4b2e0f95-f15e-48d8-ada3-c071d6104db8", "api_version": "v1", "endpoint": "generations"},
-            "4b2e0f95-f15e-48d8-ada3-c071d6104db8": {"name": "Christmas Stickers", "id": "4b2e0f95-f15e-48d8-ada3-c071d6104db8", "api_version": "v1", "endpoint": "generations"},
-            "isometric-scifi-buildings": {"name": "Isometric Scifi Buildings", "id": "7a65f0ab-64a7-4be2-bcf3-64a1cc56f627", "api_version": "v1", "endpoint": "generations"},
-            "7a65f0ab-64a7-4be2-bcf3-64a1cc56f627": {"name": "Isometric Scifi Buildings", "id": "7a65f0ab-64a7-4be2-bcf3-64a1cc56f627", "api_version": "v1", "endpoint": "generations"},
-            "isometric-fantasy": {"name": "Isometric Fantasy", "id": "ab200606-5d09-4e1e-9050-0b05b839e944", "api_version": "v1", "endpoint": "generations"},
-            "ab200606-5d09-4e1e-9050-0b05b839e944": {"name": "Isometric Fantasy", "id": "ab200606-5d09-4e1e-9050-0b05b839e944", "api_version": "v1", "endpoint": "generations"},
-            "cute-characters": {"name": "Cute Characters", "id": "50c4f43b-f086-4838-bcac-820406244cec", "api_version": "v1", "endpoint": "generations"},
-            "50c4f43b-f086-4838-bcac-820406244cec": {"name": "Cute Characters", "id": "50c4f43b-f086-4838-bcac-820406244cec", "api_version": "v1", "endpoint": "generations"},
-            "amulets": {"name": "Amulets", "id": "ff883b60-9040-4c18-8d4e-ba7522c6b71d", "api_version": "v1", "endpoint": "generations"},
-            "ff883b60-9040-4c18-8d4e-ba7522c6b71d": {"name": "Amulets", "id": "ff883b60-9040-4c18-8d4e-ba7522c6b71d", "api_version": "v1", "endpoint": "generations"},
-            "crystal-deposits-alternate": {"name": "Crystal Deposits Alternate", "id": "5fce4543-8e23-4b77-9c3f-202b3f1c211e", "api_version": "v1", "endpoint": "generations"},
-            "5fce4543-8e23-4b77-9c3f-202b3f1c211e": {"name": "Crystal Deposits Alternate", "id": "5fce4543-8e23-4b77-9c3f-202b3f1c211e", "api_version": "v1", "endpoint": "generations"},
-            "isometric-asteroid-tiles": {"name": "Isometric Asteroid Tiles", "id": "756be0a8-38b1-4946-ad62-c0ac832422e3", "api_version": "v1", "endpoint": "generations"},
-            "756be0a8-38b1-4946-ad62-c0ac832422e3": {"name": "Isometric Asteroid Tiles", "id": "756be0a8-38b1-4946-ad62-c0ac832422e3", "api_version": "v1", "endpoint": "generations"},
-            "leonardo-signature": {"name": "Leonardo Signature", "id": "291be633-cb24-434f-898f-e662799936ad", "api_version": "v1", "endpoint": "generations"},
-            "291be633-cb24-434f-898f-e662799936ad": {"name": "Leonardo Signature", "id": "291be633-cb24-434f-898f-e662799936ad", "api_version": "v1", "endpoint": "generations"},
-
-
-            # Special Aliases and V2 Models
-            "universal": {"name": "Universal Enhanced", "id": "6bef9f1b-713b-4271-9231-ef9090632332", "api_version": "v1", "endpoint": "generations"},
-            "6bef9f1b-713b-4271-9231-ef9090632332": {"name": "Universal Enhanced", "id": "6bef9f1b-713b-4271-9231-ef9090632332", "api_version": "v1", "endpoint": "generations"},
-            "gemini-image-2": {"name": "Nano Banana Pro", "id": "gemini-image-2", "api_version": "v2", "endpoint": "generations"},
-            "flux-pro-2.0": {"name": "FLUX.2 Pro", "id": "flux-pro-2.0", "api_version": "v2", "endpoint": "generations"},
-        }
-
-        # Fallback: try to infer by modelId pattern
-        if model_key in mapping:
-            return mapping[model_key]
+        if model_key in LEONARDO_MODEL_CONFIGS:
+            return LEONARDO_MODEL_CONFIGS[model_key]
         
         # If we don't have an explicit mapping, assume V1 for legacy compatibility but log it
         print(f"[WARNING] No explicit mapping for Leonardo model: {model_key}, using fallback")
         return {"name": model_key, "id": model_key, "api_version": "v1", "endpoint": "generations"}
 
+    @staticmethod
+    def _apply_quality_preset(kwargs: dict) -> dict:
+        """Return kwargs layered over the preset for the requested quality level"""
+        quality = kwargs.get("quality")
+        preset = LEONARDO_QUALITY_PRESETS.get(quality.lower(), {}) if isinstance(quality, str) else {}
+        merged = dict(kwargs)
+        for key, value in preset.items():
+            if merged.get(key) is None:
+                merged[key] = value
+        return merged
+
     def _build_leonardo_payload_v1(self, model_key: str, model_config: dict, prompt: str, **kwargs) -> dict:
         """Build Leonardo V1 payload (modelId, styleUUID, enhancePrompt, etc.)."""
+        kwargs = self._apply_quality_preset(kwargs)
         width = kwargs.get("width", 1024)
         height = kwargs.get("height", 1024)
         
@@ -407,7 +1011,7 @@ class ModernGeneratorManager:
             "modelId": model_config.get("id", model_key),
             "width": width,
             "height": height,
-            "num_images": 1,
+            "num_images": kwargs.get("num_images", 1),
             "alchemy": kwargs.get("alchemy", False),
             "enhancePrompt": kwargs.get("enhancePrompt", False),
             "ultra": kwargs.get("ultra", False),
@@ -455,14 +1059,13 @@ class ModernGeneratorManager:
         # Map quality string to numeric value
         quality = kwargs.get("quality", 80)
         if isinstance(quality, str):
-            quality_map = {"standard": 60, "high": 80, "ultra": 100}
-            quality = quality_map.get(quality.lower(), 80)
+            quality = LEONARDO_V2_QUALITY.get(quality.lower(), 80)
         
         parameters = {
             "prompt": prompt,
             "width": width,
             "height": height,
-            "quantity": 1,
+            "quantity": kwargs.get("num_images", 1),
             "prompt_enhance": "OFF",  # Default to OFF for V2 models
             "quality": int(quality) if isinstance(quality, (int, float)) and quality > 0 else 80,
         }
@@ -512,442 +1115,9 @@ class ModernGeneratorManager:
     
     def _setup_leonardo_ai(self):
         """Setup Leonardo.ai generator configuration"""
-        self.available_generators["leonardo-api"] = {
-            "name": "Leonardo.ai API",
-            "type": "api",
-            "description": "Professional game asset generator with model selection",
-            "api_endpoint": "https://cloud.leonardo.ai/api/rest/v1/generations",
-            "max_resolution": (1024, 1024),
-            "quality": "Professional",
-            "speed": "Fast",
-            "cost": "Paid",
-            "features": ["text-to-image", "fine-tuned-models", "texture-generation"],
-            "models": {
-"lucid-origin": {
-                    "id": "7b592283-e8a7-4c5a-9ba6-d18c31f258b9",
-                    "name": "Lucid Origin",
-                    "description": "Your go-to model for vibrant, diverse imagery in HD output. Excellent prompt adherence and text rendering.",
-                    "max_resolution": (1024, 1024),
-                    "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
-                    "note": "Official Leonardo model"
-                },
-                "flux-1-kontext": {
-                    "id": "28aeddf8-bd19-4803-80fc-79602d1a9989",
-                    "name": "FLUX.1 Kontext",
-                    "description": "FLUX.1 Kontext is an Omni model by Black Forest Labs, built for precise, controllable image generation and editing",
-                    "max_resolution": (1024, 1024),
-                    "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
-                    "note": "Official Leonardo model"
-                },
-                "lucid-realism": {
-                    "id": "05ce0082-2d80-4a2d-8653-4d1c85e2418e",
-                    "name": "Lucid Realism",
-                    "description": "A high-speed model, designed for efficient, quick outputs. Perfect for fast-paced projects without sacrificing quality.",
-                    "max_resolution": (1024, 1024),
-                    "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
-                    "note": "Official Leonardo model"
-                },
-                "phoenix-1-0": {
-                    "id": "de7d3faf-762f-48e0-b3b7-9d0ac3a3fcf3",
-                    "name": "Phoenix 1.0",
-                    "description": "Leonardo's proprietary foundational model, delivering exceptional prompt adherence and text rendering.",
-                    "max_resolution": (1024, 1024),
-                    "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
-                    "note": "Official Leonardo model"
-                },
-                "flux-dev": {
-                    "id": "b2614463-296c-462a-9586-aafdb8f00e36",
-                    "name": "Flux Dev",
-                    "description": "A specialized model built for developers. Great for rapid prototyping and creative iteration.",
-                    "max_resolution": (1024, 1024),
-                    "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
-                    "note": "Official Leonardo model"
-                },
-                "flux-schnell": {
-                    "id": "1dd50843-d653-4516-a8e3-f0238ee453ff",
-                    "name": "Flux Schnell",
-                    "description": "A high-speed model, designed for efficient, quick outputs. Perfect for fast-paced projects without sacrificing quality.",
-                    "max_resolution": (1024, 1024),
-                    "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
-                    "note": "Official Leonardo model"
-                },
-                "phoenix-0-9": {
-                    "id": "6b645e3a-d64f-4341-a6d8-7a3690fbf042",
-                    "name": "Phoenix 0.9",
-                    "description": "Preview of our foundational model. Extreme prompt adherence and text rendering.",
-                    "max_resolution": (1024, 1024),
-                    "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
-                    "note": "Official Leonardo model"
-                },
-                "leonardo-anime-xl": {
-                    "id": "e71a1c2f-4f80-4800-934f-2c68979d8cc8",
-                    "name": "Leonardo Anime XL",
-                    "description": "A new high-speed Anime-focused model that excels at a range of anime, illustrative, and CG styles.",
-                    "max_resolution": (1024, 1024),
-                    "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
-                    "note": "Official Leonardo model"
-                },
-                "leonardo-lightning-xl": {
-                    "id": "b24e16ff-06e3-43eb-8d33-4416c2d75876",
-                    "name": "Leonardo Lightning XL",
-                    "description": "Our new high-speed generalist image gen model. Great at everything from photorealism to painterly styles.",
-                    "max_resolution": (1024, 1024),
-                    "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
-                    "note": "Official Leonardo model"
-                },
-                "sdxl-1-0": {
-                    "id": "16e7060a-803e-4df3-97ee-edcfa5dc9cc8",
-                    "name": "SDXL 1.0",
-                    "description": "Diffusion-based text-to-image generative model",
-                    "max_resolution": (1024, 1024),
-                    "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
-                    "note": "Official Leonardo model"
-                },
-                "leonardo-kino-xl": {
-                    "id": "aa77f04e-3eec-4034-9c07-d0f619684628",
-                    "name": "Leonardo Kino XL",
-                    "description": "A model with a strong focus on cinematic outputs. Excels at wider aspect ratios, and does not need a negative prompt.",
-                    "max_resolution": (1024, 1024),
-                    "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
-                    "note": "Official Leonardo model"
-                },
-                "leonardo-vision-xl": {
-                    "id": "5c232a9e-9061-4777-980a-ddc8e65647c6",
-                    "name": "Leonardo Vision XL",
-                    "description": "A versatile model that excels at realism and photography. Better results with longer prompts.",
-                    "max_resolution": (1024, 1024),
-                    "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
-                    "note": "Official Leonardo model"
-                },
-                "leonardo-diffusion-xl": {
-                    "id": "1e60896f-3c26-4296-8ecc-53e2afecc132",
-                    "name": "Leonardo Diffusion XL",
-                    "description": "The next phase of the core Leonardo model. Stunning outputs, even with short prompts.",
-                    "max_resolution": (1024, 1024),
-                    "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
-                    "note": "Official Leonardo model"
-                },
-                "albedobase-xl": {
-                    "id": "2067ae52-33fd-4a82-bb92-c2c55e7d2786",
-                    "name": "AlbedoBase XL",
-                    "description": "A great generalist model that tends towards more CG artistic outputs. By albedobond.",
-                    "max_resolution": (1024, 1024),
-                    "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
-                    "note": "Official Leonardo model"
-                },
-                "rpg-v5": {
-                    "id": "f1929ea3-b169-4c18-a16c-5d58b4292c69",
-                    "name": "RPG v5",
-                    "description": "Anashel returns with another great model, specialising in RPG characters of all kinds.",
-                    "max_resolution": (1024, 1024),
-                    "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
-                    "note": "Official Leonardo model"
-                },
-                "sdxl-0-9": {
-                    "id": "b63f7119-31dc-4540-969b-2a9df997e173",
-                    "name": "SDXL 0.9",
-                    "description": "The latest Stable Diffusion model, currently in Beta.",
-                    "max_resolution": (1024, 1024),
-                    "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
-                    "note": "Official Leonardo model"
-                },
-                "3d-animation-style": {
-                    "id": "d69c8273-6b17-4a30-a13e-d6637ae1c644",
-                    "name": "3D Animation Style",
-                    "description": "Great at 3D film vibes, capable of complex scenes with rich color. Storyboard time!",
-                    "max_resolution": (1024, 1024),
-                    "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
-                    "note": "Official Leonardo model"
-                },
-                "dreamshaper-v7": {
-                    "id": "ac614f96-1082-45bf-be9d-757f2d31c174",
-                    "name": "DreamShaper v7",
-                    "description": "Lykon is back with another update. This model is great at a range of different styles.",
-                    "max_resolution": (1024, 1024),
-                    "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
-                    "note": "Official Leonardo model"
-                },
-                "absolute-reality-v1-6": {
-                    "id": "e316348f-7773-490e-adcd-46757c738eb7",
-                    "name": "Absolute Reality v1.6",
-                    "description": "A photorealistic style model from Lykon. Great at all sorts of photorealism.",
-                    "max_resolution": (1024, 1024),
-                    "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
-                    "note": "Official Leonardo model"
-                },
-                "anime-pastel-dream": {
-                    "id": "1aa0f478-51be-4efd-94e8-76bfc8f533af",
-                    "name": "Anime Pastel Dream",
-                    "description": "Pastel anime styling. Use with PMv3 and the anime preset for incredible range. Model by Lykon.",
-                    "max_resolution": (1024, 1024),
-                    "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
-                    "note": "Official Leonardo model"
-                },
-                "dreamshaper-v6": {
-                    "id": "b7aa9939-abed-4d4e-96c4-140b8c65dd92",
-                    "name": "DreamShaper v6",
-                    "description": "A new update to an incredibly versatile model, excels at both people and environments, by Lykon.",
-                    "max_resolution": (1024, 1024),
-                    "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
-                    "note": "Official Leonardo model"
-                },
-                "dreamshaper-v5": {
-                    "id": "d2fb9cf9-7999-4ae5-8bfe-f0df2d32abf8",
-                    "name": "DreamShaper v5",
-                    "description": "A versatile model great at both photorealism and anime, includes noise offset training, by Lykon.",
-                    "max_resolution": (1024, 1024),
-                    "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
-                    "note": "Official Leonardo model"
-                },
-                "leonardo-diffusion": {
-                    "id": "b820ea11-02bf-4652-97ae-9ac0cc00593d",
-                    "name": "Leonardo Diffusion",
-                    "description": "A model with incredible shading and contrast, great at both photos and artistic styles, by cac0e.",
-                    "max_resolution": (1024, 1024),
-                    "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
-                    "note": "Official Leonardo model"
-                },
-                "rpg-4-0": {
-                    "id": "a097c2df-8f0c-4029-ae0f-8fd349055e61",
-                    "name": "RPG 4.0",
-                    "description": "This model is best at creating RPG character portraits with the ability for great photorealism. Created by Anashel.",
-                    "max_resolution": (1024, 1024),
-                    "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
-                    "note": "Official Leonardo model"
-                },
-                "deliberate-1-1": {
-                    "id": "458ecfff-f76c-402c-8b85-f09f6fb198de",
-                    "name": "Deliberate 1.1",
-                    "description": "A powerful model created by XpucT that  is great for both photorealism and artistic creations.",
-                    "max_resolution": (1024, 1024),
-                    "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
-                    "note": "Official Leonardo model"
-                },
-                "vintage-style-photography": {
-                    "id": "17e4edbf-690b-425d-a466-53c816f0de8a",
-                    "name": "Vintage Style Photography",
-                    "description": "This model can generate a broad range of imagery with a vintage style as if it was taken from a film camera",
-                    "max_resolution": (1024, 1024),
-                    "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
-                    "note": "Official Leonardo model"
-                },
-                "dreamshaper-3-2": {
-                    "id": "f3296a34-9aef-4370-ad18-88daf26862c3",
-                    "name": "DreamShaper 3.2",
-                    "description": "This model by Lykon is great at a range of portrait styles as well as artistic backgrounds.",
-                    "max_resolution": (1024, 1024),
-                    "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
-                    "note": "Official Leonardo model"
-                },
-                "leonardo-select": {
-                    "id": "cd2b2a15-9760-4174-a5ff-4d2925057376",
-                    "name": "Leonardo Select",
-                    "description": "A powerful finetune of SD2.1 that can achieve a high level of realism.",
-                    "max_resolution": (1024, 1024),
-                    "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
-                    "note": "Official Leonardo model"
-                },
-                "leonardo-creative": {
-                    "id": "6bef9f1b-29cb-40c7-b9df-32b51c1f67d3",
-                    "name": "Leonardo Creative",
-                    "description": "An alternative finetune of SD 2.1 that brings a little more creative interpretation to the mix.",
-                    "max_resolution": (1024, 1024),
-                    "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
-                    "note": "Official Leonardo model"
-                },
-                "battle-axes": {
-                    "id": "47a6232a-1d49-4c95-83c3-2cc5342f82c7",
-                    "name": "Battle Axes",
-                    "description": "Generate a variety of detailed axe designs with this model. From medieval battle axes to modern chopping axes, this model is great for creating a r...",
-                    "max_resolution": (1024, 1024),
-                    "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
-                    "note": "Official Leonardo model"
-                },
-                "pixel-art": {
-                    "id": "e5a291b6-3990-495a-b1fa-7bd1864510a6",
-                    "name": "Pixel Art",
-                    "description": "A pixel art model that's trained on headshots, but is surprisingly flexible with all sorts of subjects.",
-                    "max_resolution": (1024, 1024),
-                    "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
-                    "note": "Official Leonardo model"
-                },
-                "magic-potions": {
-                    "id": "45ab2421-87de-44c8-a07c-3b87e3bfdf84",
-                    "name": "Magic Potions",
-                    "description": "A great model for creating incredible semi-realistic magic potions. Try appending \"intricately detailed, 3d vray render\" to your prompt.",
-                    "max_resolution": (1024, 1024),
-                    "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
-                    "note": "Official Leonardo model"
-                },
-                "chest-armor": {
-                    "id": "302e258f-29b5-4dd8-9a7c-0cd898cb2143",
-                    "name": "Chest Armor",
-                    "description": "Create all sorts of chest armor with this model in a consistent style but with wide thematic range.",
-                    "max_resolution": (1024, 1024),
-                    "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
-                    "note": "Official Leonardo model"
-                },
-                "crystal-deposits": {
-                    "id": "102a8ee0-cf16-477c-8477-c76963a0d766",
-                    "name": "Crystal Deposits",
-                    "description": "A model for creating crystal deposits. Well-suited for use as items or in an isometric environment.",
-                    "max_resolution": (1024, 1024),
-                    "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
-                    "note": "Official Leonardo model"
-                },
-                "character-portraits": {
-                    "id": "6c95de60-a0bc-4f90-b637-ee8971caf3b0",
-                    "name": "Character Portraits",
-                    "description": "A model that's for creating awesome RPG characters of varying classes in a consistent style.",
-                    "max_resolution": (1024, 1024),
-                    "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
-                    "note": "Official Leonardo model"
-                },
-                "magic-items": {
-                    "id": "2d18c0af-374e-4391-9ca2-639f59837c85",
-                    "name": "Magic Items",
-                    "description": "Create a wide range of magical items like weapons, shields, boots, books. Very versatile.",
-                    "max_resolution": (1024, 1024),
-                    "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
-                    "note": "Official Leonardo model"
-                },
-                "shields": {
-                    "id": "ee0fc1a3-aacb-48bf-9234-ada3cc02748f",
-                    "name": "Shields",
-                    "description": "Create a variety of impressively varied and detailed shield designs. Allows for an incredible range of material types.",
-                    "max_resolution": (1024, 1024),
-                    "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
-                    "note": "Official Leonardo model"
-                },
-                "spirit-creatures": {
-                    "id": "5fdadebb-17ae-472c-bf76-877e657f97de",
-                    "name": "Spirit Creatures",
-                    "description": "From whimsical fairy-like beings to mythical creatures, create unique cute spirit characters.",
-                    "max_resolution": (1024, 1024),
-                    "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
-                    "note": "Official Leonardo model"
-                },
-                "cute-animal-characters": {
-                    "id": "6908bfaf-8cf2-4fda-8c46-03f892d82e06",
-                    "name": "Cute Animal Characters",
-                    "description": "Perfect for creating adorable and cute animal characters - loveable and playful designs.",
-                    "max_resolution": (1024, 1024),
-                    "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
-                    "note": "Official Leonardo model"
-                },
-                "christmas-stickers": {
-                    "id": "4b2e0f95-f15e-48d8-ada3-c071d6104db8",
-                    "name": "Christmas Stickers",
-                    "description": "Generate festive and fun Christmas stickers with this model. From cute and colorful to traditional and elegant.",
-                    "max_resolution": (1024, 1024),
-                    "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
-                    "note": "Official Leonardo model"
-                },
-                "isometric-scifi-buildings": {
-                    "id": "7a65f0ab-64a7-4be2-bcf3-64a1cc56f627",
-                    "name": "Isometric Scifi Buildings",
-                    "description": "Great at creating scifi buildings of varying themes. Append the word isometric to your prompt to ensure an isometric view. \"3d vray render\" also helps steer the generation well. ",
-                    "max_resolution": (1024, 1024),
-                    "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
-                    "note": "Official Leonardo model"
-                },
-                "isometric-fantasy": {
-                    "id": "ab200606-5d09-4e1e-9050-0b05b839e944",
-                    "name": "Isometric Fantasy",
-                    "description": "Create all sorts of isometric fantasy environments. Try appending \"3d vray render, isometric\" and using a guidance scale of 6. For the negative prompt, try \"unclear, harsh, oversaturated, soft, blurry\".",
-                    "max_resolution": (1024, 1024),
-                    "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
-                    "note": "Official Leonardo model"
-                },
-                "cute-characters": {
-                    "id": "50c4f43b-f086-4838-bcac-820406244cec",
-                    "name": "Cute Characters",
-                    "description": "Create cute and charming game characters, perfect for adding some whimsy to your game design. Be sure to include the word \"character\" in your prompts for best results.",
-                    "max_resolution": (1024, 1024),
-                    "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
-                    "note": "Official Leonardo model"
-                },
-                "amulets": {
-                    "id": "ff883b60-9040-4c18-8d4e-ba7522c6b71d",
-                    "name": "Amulets",
-                    "description": "Create unique and intricate amulets, jewellery and more. Try loading up the prompt terms to steer it in interesting directions.",
-                    "max_resolution": (1024, 1024),
-                    "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
-                    "note": "Official Leonardo model"
-                },
-                "crystal-deposits-alternate": {
-                    "id": "5fce4543-8e23-4b77-9c3f-202b3f1c211e",
-                    "name": "Crystal Deposits Alternate",
-                    "description": "An alternative crystal deposits model that gives a slightly more realistic feel with its creations. Try using \"object\" and \"3d vray render\" in your prompts.",
-                    "max_resolution": (1024, 1024),
-                    "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
-                    "note": "Official Leonardo model"
-                },
-                "isometric-asteroid-tiles": {
-                    "id": "756be0a8-38b1-4946-ad62-c0ac832422e3",
-                    "name": "Isometric Asteroid Tiles",
-                    "description": "A model for creating isometric asteroid environment tiles. Try appending \"3d vray render, unreal engine, beautiful, intricately detailed, trending on artstation, 8k\" to your prompt.",
-                    "max_resolution": (1024, 1024),
-                    "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
-                    "note": "Official Leonardo model"
-                },
-                "leonardo-signature": {
-                    "id": "291be633-cb24-434f-898f-e662799936ad",
-                    "name": "Leonardo Signature",
-                    "description": "The core model of the Leonardo platform. An extremely powerful and diverse finetune which is highly effective for a wide range of uses.",
-                    "max_resolution": (1024, 1024),
-                    "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
-                    "note": "Official Leonardo model"
-                },
-
-                "universal": {
-                    "id": "6bef9f1b-713b-4271-9231-ef9090632332",
-                    "name": "Universal Enhanced",
-                    "description": "Universal model with advanced prompt optimization",
-                    "max_resolution": (1024, 1024),
-                    "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
-                    "note": "Optimized for all content types"
-                },
-                "gemini-image-2": {
-                    "id": "gemini-image-2",
-                    "name": "Nano Banana Pro",
-                    "description": "State-of-the-art V2 generation model",
-                    "max_resolution": (1024, 1024),
-                    "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
-                    "note": "V2 Engine Structure"
-                },
-                "flux-pro-2.0": {
-                    "id": "flux-pro-2.0",
-                    "name": "FLUX.2 Pro",
-                    "description": "High fidelity V2 generation model",
-                    "max_resolution": (1024, 1024),
-                    "aspect_ratios": ["1:1", "16:9", "9:16", "4:3", "3:4", "2:3", "3:2"],
-                    "note": "V2 Engine Structure"
-                },
-            },
-            "preset_styles": [
-                {"id": "CREATIVE", "name": "Creative", "description": "Balanced creative output"},
-                {"id": "DYNAMIC", "name": "Dynamic", "description": "More dynamic and dramatic"},
-                {"id": "CINEMATIC", "name": "Cinematic", "description": "Movie-like quality"},
-                {"id": "FANTASY_ART", "name": "Fantasy Art", "description": "Fantasy themed"},
-                {"id": "ANIME", "name": "Anime", "description": "Anime style"},
-                {"id": "COMIC_BOOK", "name": "Comic Book", "description": "Comic book style"}
-            ],
-            "quality_levels": [
-                {"id": "standard", "name": "Standard", "description": "Good quality, faster generation"},
-                {"id": "high", "name": "High", "description": "Better quality, moderate time"},
-                {"id": "ultra", "name": "Ultra", "description": "Best quality, longer time"}
-            ],
-            "aspect_ratios": [
-                {"id": "1:1", "name": "Square", "resolution": (1024, 1024)},
-                {"id": "16:9", "name": "Widescreen", "resolution": (1344, 768)},
-                {"id": "9:16", "name": "Portrait", "resolution": (768, 1344)},
-                {"id": "4:3", "name": "Standard", "resolution": (1024, 768)},
-                {"id": "3:4", "name": "Vertical", "resolution": (768, 1024)},
-                {"id": "2:3", "name": "Tall", "resolution": (832, 1216)},
-                {"id": "3:2", "name": "Wide", "resolution": (1216, 832)}
-            ]
-        }
+        # Shallow copy: model merging replaces the "models" entry per manager
+        self.available_generators["leonardo-api"] = dict(LEONARDO_GENERATOR_CONFIG)
+        self._leonardo_options = None
     
     def _setup_modal(self):
         """Setup Modal generator configuration"""
@@ -1067,63 +1237,101 @@ class ModernGeneratorManager:
     def set_api_key(self, generator_name: str, api_key: str):
         """Set API key for a generator and persist to file"""
         self.api_keys[generator_name] = api_key
+        if self._validate_api_key(generator_name, api_key):
+            self._valid_api_keys[generator_name] = api_key
+        else:
+            self._valid_api_keys.pop(generator_name, None)
         if generator_name == "leonardo-api":
             self._leonardo_platform_models_cache = {
                 "fetched_at": 0.0,
                 "models": []
             }
-        self._save_api_keys()
+        self._schedule_save_api_keys()
         print(f"[OK] API key set for {generator_name}")
 
         if generator_name == "leonardo-api":
             self._merge_leonardo_platform_models_into_generator()
     
+    @staticmethod
+    def _validate_api_key(generator_name: str, value) -> bool:
+        """Check that a stored API key is not corrupted"""
+        # Keys that should skip length validation (account IDs, etc.)
+        skip_validation = {
+            'cloudflare-account-id',  # Cloudflare account identifier
+            'cloudflare-api'  # Third-party test key (intentionally short)
+        }
+        if generator_name in skip_validation:
+            return True
+        return isinstance(value, str) and 10 <= len(value) <= 1000
+
+    def _require_leonardo_api_key(self) -> str:
+        """Return the validated Leonardo.ai API key or raise a helpful error"""
+        api_key = self._valid_api_keys.get('leonardo-api')
+        if api_key is None:
+            if 'leonardo-api' in self.api_keys:
+                raise ValueError("Leonardo.ai API key appears to be corrupted or invalid. Please check your API key configuration.")
+            raise ValueError("Leonardo.ai API key not set. Please set your API key first.")
+        return api_key
+
     def _load_api_keys(self):
         """Load API keys from file"""
         try:
             if os.path.exists(self.api_keys_file):
-                with open(self.api_keys_file, 'r') as f:
-                    loaded_keys = json.load(f)
-                    
-                # Keys that should skip length validation (account IDs, etc.)
-                skip_validation = {
-                    'cloudflare-account-id',  # Cloudflare account identifier
-                    'cloudflare-api'  # Third-party test key (intentionally short)
-                }
-                    
+                stat = os.stat(self.api_keys_file)
+                loaded_keys = _read_api_keys_file(self.api_keys_file, stat.st_mtime_ns, stat.st_size)
+                
                 # Validate API keys to ensure they're not corrupted
                 for key, value in loaded_keys.items():
-                    # Skip validation for certain keys that aren't API keys
-                    if key in skip_validation:
-                        self.api_keys[key] = value
-                        continue
-                        
-                    if isinstance(value, str) and len(value) > 1000:
-                        print(f"[WARNING] API key for {key} appears corrupted (too long), skipping")
-                        continue
-                    if not isinstance(value, str) or len(value) < 10:
-                        print(f"[WARNING] API key for {key} appears invalid, skipping")
+                    if not self._validate_api_key(key, value):
+                        if isinstance(value, str) and len(value) > 1000:
+                            print(f"[WARNING] API key for {key} appears corrupted (too long), skipping")
+                        else:
+                            print(f"[WARNING] API key for {key} appears invalid, skipping")
                         continue
                     self.api_keys[key] = value
+                    self._valid_api_keys[key] = value
                 print(f"[OK] Loaded {len(self.api_keys)} valid API key(s)")
         except Exception as e:
             print(f"[WARNING] Could not load API keys: {e}")
             self.api_keys = {}
+            self._valid_api_keys = {}
     
     def _save_api_keys(self):
-        """Save API keys to file"""
+        """Save API keys to file atomically"""
+        tmp_file = self.api_keys_file + ".tmp"
         try:
-            with open(self.api_keys_file, 'w') as f:
+            with open(tmp_file, 'w') as f:
                 json.dump(self.api_keys, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.api_keys_file)
             print(f"[SAVE] Saved API keys to {self.api_keys_file}")
         except Exception as e:
             print(f"[ERROR] Could not save API keys: {e}")
+
+    def _schedule_save_api_keys(self):
+        """Save API keys, coalescing back-to-back updates while an event loop runs"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._save_api_keys()
+            return
+
+        if not self._save_pending:
+            self._save_pending = True
+            loop.call_later(0.5, self._flush_save_api_keys)
+
+    def _flush_save_api_keys(self):
+        """Write a pending debounced API key save"""
+        if self._save_pending:
+            self._save_pending = False
+            self._save_api_keys()
     
     def get_available_generators(self) -> Dict[str, Dict]:
         """Get all available modern generators"""
         # Keep Leonardo model list fresh if API key is configured.
         if "leonardo-api" in self.api_keys:
-            print("[LEONARDO] API key present, attempting to merge platform models")
+            logger.debug("[LEONARDO] API key present, attempting to merge platform models")
             self._merge_leonardo_platform_models_into_generator()
         return self.available_generators
     
@@ -1131,6 +1339,13 @@ class ModernGeneratorManager:
         """Get information about a specific generator"""
         return self.available_generators.get(generator_name)
     
+    async def _image_from_result(self, result: dict) -> Image.Image:
+        """Load the image from an API result, preferring URL delivery over base64"""
+        if result.get("url"):
+            return await self._download_image(result["url"])
+        logger.debug("[API] Response has no image URL, decoding base64 payload")
+        return await asyncio.to_thread(self._decode_image, result["image"], True)
+
     async def generate_with_nano_banana_pro(self, prompt: str, **kwargs) -> Image.Image:
         """Generate image using Nano Banana Pro API"""
         if "nano-banana-pro" not in self.api_keys:
@@ -1155,11 +1370,12 @@ class ModernGeneratorManager:
             "steps": kwargs.get("num_inference_steps", 20),
             "guidance_scale": kwargs.get("guidance_scale", 7.5),
             "style": kwargs.get("style", "realistic"),
-            "quality": kwargs.get("quality", "high")
+            "quality": kwargs.get("quality", "high"),
+            "response_format": kwargs.get("response_format", "url")
         }
         
         try:
-            response = requests.post(
+            response = self._http.post(
                 endpoint,
                 headers=headers,
                 json=payload,
@@ -1168,8 +1384,7 @@ class ModernGeneratorManager:
             response.raise_for_status()
             
             result = response.json()
-            image_data = base64.b64decode(result["image"])
-            image = Image.open(io.BytesIO(image_data))
+            image = await self._image_from_result(result)
             
             return image
             
@@ -1200,11 +1415,12 @@ class ModernGeneratorManager:
             "height": kwargs.get("height", 1024),
             "style_preset": kwargs.get("style_preset", "photorealistic"),
             "quality": kwargs.get("quality", "ultra"),
-            "negative_prompt": kwargs.get("negative_prompt", "")
+            "negative_prompt": kwargs.get("negative_prompt", ""),
+            "response_format": kwargs.get("response_format", "url")
         }
         
         try:
-            response = requests.post(
+            response = self._http.post(
                 endpoint,
                 headers=headers,
                 json=payload,
@@ -1213,8 +1429,7 @@ class ModernGeneratorManager:
             response.raise_for_status()
             
             result = response.json()
-            image_data = base64.b64decode(result["image"])
-            image = Image.open(io.BytesIO(image_data))
+            image = await self._image_from_result(result)
             
             return image
             
@@ -1242,10 +1457,6 @@ class ModernGeneratorManager:
         url = f"{base_url}/generate"
 
         try:
-            import httpx
-            import io
-            from PIL import Image
-
             print(f"[MODAL] Calling Modal web endpoint...")
             print(f"[MODAL] Endpoint: {url}")
             print(f"[MODAL] Model: {model_name}")
@@ -1261,8 +1472,8 @@ class ModernGeneratorManager:
                 "gpu": gpu,
             }
 
-            async with httpx.AsyncClient(timeout=300.0, follow_redirects=True) as client:
-                response = await client.post(url, params=request_params)
+            client = self._get_httpx_client()
+            response = await client.post(url, params=request_params)
 
             if getattr(response, "history", None):
                 for r in response.history:
@@ -1323,7 +1534,7 @@ class ModernGeneratorManager:
             print(f"[CLOUDFLARE] Generating image with prompt: {prompt[:100]}...")
 
             # Make API request
-            response = requests.post(endpoint, json=payload, headers=headers, timeout=60)
+            response = self._http.post(endpoint, json=payload, headers=headers, timeout=60)
 
             if response.status_code == 200:
                 # Check if response is binary PNG data or JSON
@@ -1405,7 +1616,7 @@ class ModernGeneratorManager:
             print(f"[CLOUDFLARE] Third-party API generating image with prompt: {prompt[:100]}...")
 
             # Make API request
-            response = requests.post(endpoint, json=payload, headers=headers, timeout=60)
+            response = self._http.post(endpoint, json=payload, headers=headers, timeout=60)
 
             if response.status_code == 200:
                 # Check if response is actually JSON error instead of image data
@@ -1476,7 +1687,7 @@ class ModernGeneratorManager:
         }
         
         try:
-            response = requests.post(
+            response = self._http.post(
                 self.available_generators["dall-e-3"]["api_endpoint"],
                 headers=headers,
                 json=payload,
@@ -1488,7 +1699,7 @@ class ModernGeneratorManager:
             image_url = result["data"][0]["url"]
             
             # Download the image
-            image_response = requests.get(image_url, timeout=30)
+            image_response = self._http.get(image_url, timeout=30)
             image_response.raise_for_status()
             
             image = Image.open(io.BytesIO(image_response.content))
@@ -1584,21 +1795,212 @@ class ModernGeneratorManager:
             return f"{original_negative}, {base_negative}"
         return base_negative
     
-    async def generate_with_leonardo(self, prompt: str, **kwargs) -> Image.Image:
-        """Generate image using Leonardo.ai API via REST endpoint"""
-        print(f"[ART] Leonardo.ai generation with {prompt[:100]}...")
+    def _get_session(self) -> "aiohttp.ClientSession":
+        """Return the aiohttp session for the running event loop.
+
+        Each loop gets its own session; short-lived loops must call
+        close_loop_sessions() before they finish.
+        """
+        if not AIOHTTP_AVAILABLE:
+            raise RuntimeError("aiohttp is not installed. Install with: pip install aiohttp")
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            self._forget_closed_loops(self._sessions)
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=16, keepalive_timeout=60)
+            )
+            self._sessions[loop] = session
+        return session
+
+    @staticmethod
+    def _forget_closed_loops(clients: dict):
+        """Drop clients left behind by event loops that have already been closed"""
+        for loop in [loop for loop in list(clients) if loop.is_closed()]:
+            clients.pop(loop, None)
+
+    def _get_httpx_client(self):
+        """Return the httpx client for the running event loop.
+
+        HTTP/2 is enabled when the h2 package is installed so concurrent
+        generations are multiplexed over one connection. Like the aiohttp
+        sessions, clients are per loop and closed by close_loop_sessions().
+        """
+        import httpx
+
+        loop = asyncio.get_running_loop()
+        client = self._httpx_clients.get(loop)
+        if client is None or client.is_closed:
+            self._forget_closed_loops(self._httpx_clients)
+            try:
+                import h2  # noqa: F401
+                http2 = True
+            except ImportError:
+                http2 = False
+            client = httpx.AsyncClient(
+                http2=http2,
+                limits=httpx.Limits(max_connections=16, max_keepalive_connections=8),
+                timeout=300.0,
+                follow_redirects=True
+            )
+            self._httpx_clients[loop] = client
+        return client
+
+    async def close_loop_sessions(self):
+        """Close the HTTP sessions of the running event loop.
+
+        Call this before a loop made for a single call (asyncio.run) finishes,
+        so its connections don't outlive it.
+        """
+        loop = asyncio.get_running_loop()
+        session = self._sessions.pop(loop, None)
+        if session is not None and not session.closed:
+            await session.close()
+        client = self._httpx_clients.pop(loop, None)
+        if client is not None and not client.is_closed:
+            await client.aclose()
+
+    async def close(self):
+        """Close the shared HTTP sessions and flush pending writes"""
+        self._flush_save_api_keys()
+        await self.close_loop_sessions()
+        # Sessions of loops still running in other threads are closed on their own loop
+        for loop, session in list(self._sessions.items()):
+            if not loop.is_closed() and not session.closed:
+                asyncio.run_coroutine_threadsafe(session.close(), loop)
+        self._sessions.clear()
+        for loop, client in list(self._httpx_clients.items()):
+            if not loop.is_closed() and not client.is_closed:
+                asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+        self._httpx_clients.clear()
+        self._http.close()
+
+    async def _http_request(self, method: str, url: str, timeout: float, **kwargs):
+        """Perform an HTTP request without blocking the event loop.
+
+        Returns a (status, headers, body) tuple.
+        """
+        if HTTP2_AVAILABLE:
+            # The generation POST and its status polls share one multiplexed connection
+            if "data" in kwargs:
+                kwargs["content"] = kwargs.pop("data")
+            response = await self._get_httpx_client().request(method, url, timeout=timeout, **kwargs)
+            return response.status_code, dict(response.headers), response.content
+
+        if AIOHTTP_AVAILABLE:
+            session = self._get_session()
+            async with session.request(
+                method, url, timeout=aiohttp.ClientTimeout(total=timeout), **kwargs
+            ) as response:
+                return response.status, dict(response.headers), await response.read()
+
+        response = await asyncio.to_thread(self._http.request, method, url, timeout=timeout, **kwargs)
+        return response.status_code, dict(response.headers), response.content
+
+    @contextlib.asynccontextmanager
+    async def _leonardo_slot(self):
+        """Hold one of the process-wide slots bounding concurrent Leonardo.ai generations.
+
+        The semaphore is polled rather than acquired in a worker thread, so a
+        cancelled wait can never take a slot that nobody releases.
+        """
+        while not self._leonardo_semaphore.acquire(blocking=False):
+            await asyncio.sleep(LEONARDO_SLOT_POLL_INTERVAL)
+        try:
+            yield
+        finally:
+            self._leonardo_semaphore.release()
+
+    @staticmethod
+    def _raise_for_status(status: int, url: str):
+        """Raise a requests-style HTTPError so the existing error handling keeps working"""
+        if 400 <= status < 500:
+            raise requests.exceptions.HTTPError(f"{status} Client Error for url: {url}")
+        if status >= 500:
+            raise requests.exceptions.HTTPError(f"{status} Server Error for url: {url}")
+
+    def _payload_cache_key(self, payload: dict) -> Optional[str]:
+        """Return a cache key for a generation payload, or None when the seed is random"""
+        seed = payload.get("seed", payload.get("parameters", {}).get("seed"))
+        if seed is None:
+            return None
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
 
-        # Check API key
-        if 'leonardo-api' not in self.api_keys:
-            raise ValueError("Leonardo.ai API key not set. Please set your API key first.")
+    def _load_cached_image(self, cache_key: str) -> Optional[Image.Image]:
+        """Return a previously generated image from the disk cache"""
+        path = os.path.join(self.image_cache_dir, f"{cache_key}.png")
+        if not os.path.exists(path):
+            return None
+        os.utime(path)  # Mark as recently used for the LRU sweep
+        with Image.open(path) as image:
+            return image.copy()
 
-        api_key = self.api_keys['leonardo-api']
+    def _save_cached_image(self, cache_key: str, image: Image.Image):
+        """Store a generated image in the disk cache and evict the oldest entries"""
+        try:
+            os.makedirs(self.image_cache_dir, exist_ok=True)
+            image.save(os.path.join(self.image_cache_dir, f"{cache_key}.png"), "PNG")
+
+            entries = [entry for entry in os.scandir(self.image_cache_dir) if entry.is_file()]
+            total_size = sum(entry.stat().st_size for entry in entries)
+            for entry in sorted(entries, key=lambda e: e.stat().st_mtime):
+                if total_size <= self.image_cache_max_bytes:
+                    break
+                total_size -= entry.stat().st_size
+                os.remove(entry.path)
+        except OSError as e:
+            logger.warning("[WARNING] Could not update image cache: %s", e)
 
-        # Validate API key format
-        if not isinstance(api_key, str) or len(api_key) > 1000 or len(api_key) < 10:
-            raise ValueError("Leonardo.ai API key appears to be corrupted or invalid. Please check your API key configuration.")
+    async def generate_with_leonardo(self, prompt: str, **kwargs) -> Image.Image:
+        """Generate image using Leonardo.ai API via REST endpoint"""
+        images = await self._generate_leonardo_images(prompt, **kwargs)
+        return images[0]
+
+    async def generate_leonardo_batch(self, batch: List[Dict[str, Any]]) -> List[Any]:
+        """Generate several Leonardo.ai images with as few API calls as possible.
+
+        Each entry is a dict holding "prompt" plus generate_with_leonardo kwargs.
+        Unseeded entries with identical parameters share a single request using
+        num_images; everything else is dispatched concurrently. Results keep the
+        input order, failed entries are returned as exceptions.
+        """
+        groups = {}
+        for index, entry in enumerate(batch):
+            kwargs = dict(entry)
+            seed = kwargs.get("seed")
+            if seed is not None and seed >= 0:
+                group_key = ("seeded", index)
+            else:
+                group_key = json.dumps(kwargs, sort_keys=True, default=str)
+            groups.setdefault(group_key, []).append(index)
+
+        jobs = []
+        for indices in groups.values():
+            for start in range(0, len(indices), LEONARDO_BATCH_SIZE_MAX):
+                chunk = indices[start:start + LEONARDO_BATCH_SIZE_MAX]
+                kwargs = dict(batch[chunk[0]])
+                prompt = kwargs.pop("prompt")
+                kwargs["num_images"] = len(chunk)
+                jobs.append((chunk, self._generate_leonardo_images(prompt, **kwargs)))
+
+        outcomes = await asyncio.gather(*(job for _, job in jobs), return_exceptions=True)
+
+        results: List[Any] = [None] * len(batch)
+        for (chunk, _), outcome in zip(jobs, outcomes):
+            for position, index in enumerate(chunk):
+                if isinstance(outcome, BaseException):
+                    results[index] = outcome
+                elif position < len(outcome):
+                    results[index] = outcome[position]
+                else:
+                    results[index] = Exception("Leonardo.ai returned fewer images than requested")
+        return results
+
+    async def _generate_leonardo_images(self, prompt: str, **kwargs) -> List[Image.Image]:
+        """Run a Leonardo.ai generation and return every image it produced"""
+        api_key = self._require_leonardo_api_key()
 
-        print(f"API key found: {'*' * 10}{api_key[-4:]}")
+        logger.debug("API key found: %s%s", "*" * 10, api_key[-4:])
 
         # Get parameters
         model_key = kwargs.get("model", "phoenix-1-0")
@@ -1623,18 +2025,12 @@ class ModernGeneratorManager:
             best_match = min(valid_dimensions, 
                            key=lambda d: abs((d[0]/d[1]) - requested_aspect) or abs(d[0] - width))
             width, height = best_match
-            
-            print(f"[ART] FLUX.1 Kontext using valid dimensions: {width}x{height}")
-
-        print(f"[API] Model: {model_key}, Resolution: {width}x{height}")
 
-        # Get model config
-        model_config = self._leonardo_model_config(model_key)
         api_version = model_config["api_version"]
         endpoint_path = model_config["endpoint"]
         full_endpoint = f"https://cloud.leonardo.ai/api/rest/{api_version}/{endpoint_path}"
 
-        print(f"[API] Endpoint: {full_endpoint}")
+        logger.debug("[API] Endpoint: %s", full_endpoint)
 
         # Build payload
         if api_version == "v2":
@@ -1642,48 +2038,40 @@ class ModernGeneratorManager:
         else:
             payload = self._build_leonardo_payload_v1(model_key, model_config, prompt, **kwargs)
 
-        print(f"[API] Payload: {json.dumps(payload, indent=2)}")
+        if logger.isEnabledFor(logging.INFO):
+            parameters = payload.get("parameters", payload)
+            logger.info("[API] Leonardo.ai request %s", {
+                "prompt": prompt[:100],
+                "model": model_key,
+                "res": f"{width}x{height}",
+                "quality": kwargs.get("quality"),
+                "steps": parameters.get("num_inference_steps", parameters.get("steps")),
+                "guidance": parameters.get("guidance_scale"),
+                "style": kwargs.get("preset_style"),
+                "images": kwargs.get("num_images", 1),
+            })
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[API] Payload: %s", json.dumps(payload))
+
+        # Identical seeded requests produce identical images - serve them from disk
+        cache_key = self._payload_cache_key(payload) if kwargs.get("num_images", 1) == 1 else None
+        if cache_key:
+            cached_image = await asyncio.to_thread(self._load_cached_image, cache_key)
+            if cached_image is not None:
+                logger.debug("[CACHE] Returning cached Leonardo.ai image for %s", cache_key[:12])
+                return [cached_image]
 
         headers = {
             "accept": "application/json",
+            "accept-encoding": LEONARDO_ACCEPT_ENCODING,
             "authorization": f"Bearer {api_key}",
             "content-type": "application/json"
         }
 
         try:
-            response = requests.post(
-                full_endpoint,
-                headers=headers,
-                json=payload,
-                timeout=30
-            )
-            
-            # Log detailed error information
-            if response.status_code != 200:
-                print(f"[ERROR] API Response Status: {response.status_code}")
-                print(f"[ERROR] API Response Headers: {dict(response.headers)}")
-                try:
-                    error_data = response.json()
-                    print(f"[ERROR] API Response Body: {json.dumps(error_data, indent=2)}")
-                except:
-                    print(f"[ERROR] API Response Text: {response.text}")
-            
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            # Extract generation ID
-            if "sdGenerationJob" in data and "generationId" in data["sdGenerationJob"]:
-                generation_id = data["sdGenerationJob"]["generationId"]
-            elif "generations_by_pk" in data and "id" in data["generations_by_pk"]:
-                generation_id = data["generations_by_pk"]["id"]
-            else:
-                raise ValueError("Could not extract generation ID from response")
-            
-            print(f"[API] Generation started: {generation_id}")
-            
-            # Poll for completion
-            return await self._poll_leonardo_generation(generation_id, headers)
+            if cache_key:
+                return await self._submit_shared_leonardo_generation(cache_key, full_endpoint, headers, payload)
+            return await self._submit_leonardo_generation(full_endpoint, headers, payload)
             
         except Exception as e:
             print(f"[ERROR] Leonardo.ai generation failed: {e}")
@@ -1696,6 +2084,85 @@ class ModernGeneratorManager:
             else:
                 raise
     
+    async def _submit_leonardo_generation(self, endpoint: str, headers: dict, payload: dict) -> List[Image.Image]:
+        """Start a Leonardo.ai generation and wait for its images.
+
+        Concurrent generations are bounded by a semaphore and a token bucket;
+        HTTP 429 responses are retried after the server's Retry-After delay.
+        Image downloads run outside the semaphore, overlapping the next job.
+        """
+        request_body = _json_dumps(payload)
+        async with self._leonardo_slot():
+            for attempt in range(LEONARDO_RATE_LIMIT_RETRIES + 1):
+                await self._leonardo_rate_limiter.acquire()
+                status, response_headers, body = await self._http_request(
+                    "POST",
+                    endpoint,
+                    timeout=30,
+                    headers=headers,
+                    data=request_body
+                )
+                if status != 429 or attempt == LEONARDO_RATE_LIMIT_RETRIES:
+                    break
+
+                retry_after = next(
+                    (value for name, value in response_headers.items() if name.lower() == "retry-after"), "1"
+                )
+                try:
+                    delay = max(float(retry_after), 2 ** attempt)
+                except ValueError:
+                    delay = 2 ** attempt
+                logger.warning("[API] Leonardo.ai rate limit hit, retrying in %ss", delay)
+                await asyncio.sleep(delay)
+
+            # Log detailed error information
+            if status != 200:
+                logger.error("[ERROR] API Response Status: %s", status)
+                logger.error("[ERROR] API Response Headers: %s", response_headers)
+                logger.error("[ERROR] API Response Body: %s", body.decode("utf-8", errors="replace"))
+
+            self._raise_for_status(status, endpoint)
+
+            data = _json_loads(body)
+
+            # Extract generation ID
+            if "sdGenerationJob" in data and "generationId" in data["sdGenerationJob"]:
+                generation_id = data["sdGenerationJob"]["generationId"]
+            elif "generations_by_pk" in data and "id" in data["generations_by_pk"]:
+                generation_id = data["generations_by_pk"]["id"]
+            else:
+                raise ValueError("Could not extract generation ID from response")
+
+            logger.debug("[API] Generation started: %s", generation_id)
+
+            # Poll for completion
+            generated_images = await self._wait_for_leonardo_generation(generation_id, headers)
+
+        return await self._download_generated_images(generated_images)
+
+    async def _submit_shared_leonardo_generation(self, cache_key: str, endpoint: str, headers: dict, payload: dict) -> List[Image.Image]:
+        """Run a cacheable generation once, sharing it with identical in-flight requests.
+
+        Only requests on the same event loop can await the shared task, so the
+        in-flight map is keyed by loop as well.
+        """
+        inflight_key = (asyncio.get_running_loop(), cache_key)
+        task = self._inflight_generations.get(inflight_key)
+        if task is not None:
+            logger.debug("[CACHE] Joining in-flight Leonardo.ai generation for %s", cache_key[:12])
+            images = await asyncio.shield(task)
+            return [image.copy() for image in images]
+
+        async def generate_and_cache():
+            images = await self._submit_leonardo_generation(endpoint, headers, payload)
+            await asyncio.to_thread(self._save_cached_image, cache_key, images[0])
+            return images
+
+        task = asyncio.ensure_future(generate_and_cache())
+        self._inflight_generations[inflight_key] = task
+        task.add_done_callback(lambda _: self._inflight_generations.pop(inflight_key, None))
+        return await asyncio.shield(task)
+
     async def _wait_for_leonardo_callback(self, generation_id: str, callback_id: str, headers: dict) -> Image.Image:
         """Wait for Leonardo.ai callback or fall back to polling"""
         print(f"[WAIT] Waiting for Leonardo.ai callback: {callback_id}")
@@ -1723,10 +2190,7 @@ class ModernGeneratorManager:
                 
                 if result["success"]:
                     # Download the image
-                    image_response = requests.get(result["image_url"], timeout=30)
-                    image_response.raise_for_status()
-                    
-                    image = Image.open(io.BytesIO(image_response.content))
+                    image = await self._download_image(result["image_url"])
                     print(f"[OK] Leonardo.ai generation completed via callback")
                     return image
                 else:
@@ -1739,42 +2203,97 @@ class ModernGeneratorManager:
             del self.pending_callbacks[callback_id]
             return await self._poll_leonardo_generation(generation_id, headers)
     
+    @staticmethod
+    def _load_image(buffer: io.BytesIO) -> Image.Image:
+        """Decode an image from a buffer into an RGB image that owns its pixels"""
+        with buffer:
+            image = Image.open(buffer)
+            image.load()
+            if image.mode != "RGB":
+                image = image.convert("RGB")
+        return image
+
+    @staticmethod
+    def _decode_image(data, is_b64: bool) -> Image.Image:
+        """Decode (optionally base64 encoded) image bytes into a fully loaded image"""
+        raw = base64.b64decode(data) if is_b64 else data
+        return ModernGeneratorManager._load_image(io.BytesIO(raw))
+
+    def _stream_to_buffer(self, url: str, buffer: io.BytesIO):
+        """Stream a response body into a buffer using requests"""
+        with self._http.get(url, stream=True, timeout=30) as response:
+            self._raise_for_status(response.status_code, url)
+            for chunk in response.iter_content(65536):
+                buffer.write(chunk)
+
+    async def _download_image(self, url: str) -> Image.Image:
+        """Download a generated image and decode it off the event loop"""
+        # The buffer is the only copy of the file; chunks are appended as they arrive
+        buffer = io.BytesIO()
+        if AIOHTTP_AVAILABLE:
+            session = self._get_session()
+            async with session.get(url, timeout=aiohttp.ClientTimeout(total=30)) as response:
+                self._raise_for_status(response.status, url)
+                async for chunk in response.content.iter_chunked(65536):
+                    buffer.write(chunk)
+        else:
+            await asyncio.to_thread(self._stream_to_buffer, url, buffer)
+
+        buffer.seek(0)
+        return await asyncio.to_thread(self._load_image, buffer)
+
     async def _poll_leonardo_generation(self, generation_id: str, headers: dict) -> Image.Image:
         """Official Leonardo.ai API polling method following their documentation"""
+        images = await self._poll_leonardo_generation_images(generation_id, headers)
+        return images[0]
+
+    async def _poll_leonardo_generation_images(self, generation_id: str, headers: dict) -> List[Image.Image]:
+        """Poll a Leonardo.ai generation and download all of its images"""
+        generated_images = await self._wait_for_leonardo_generation(generation_id, headers)
+        return await self._download_generated_images(generated_images)
+
+    async def _download_generated_images(self, generated_images: List[dict]) -> List[Image.Image]:
+        """Download the images of a completed Leonardo.ai generation"""
+        images = await asyncio.gather(
+            *(self._download_image(img["url"]) for img in generated_images)
+        )
+        print(f"[OK] Leonardo.ai generation completed via polling")
+        return list(images)
+
+    async def _wait_for_leonardo_generation(self, generation_id: str, headers: dict) -> List[dict]:
+        """Poll a Leonardo.ai generation until it completes and return its generated_images"""
         print(f"[RELOAD] Polling Leonardo.ai generation: {generation_id}")
         
         # Use the correct endpoint for getting generation status
         status_url = f"https://cloud.leonardo.ai/api/rest/v1/generations/{generation_id}"
         
-        for attempt in range(180):  # Poll for up to 6 minutes (180 * 2 seconds)
+        # Fast generations finish within a couple of seconds, so check early and
+        # back off exponentially for slower ones
+        deadline = time.monotonic() + LEONARDO_POLL_TIMEOUT
+        delay = LEONARDO_POLL_INITIAL_DELAY
+        attempt = 0
+        while time.monotonic() < deadline:
+            attempt += 1
             try:
-                status_response = requests.get(status_url, headers=headers, timeout=10)
-                status_response.raise_for_status()
+                status, _, body = await self._http_request("GET", status_url, timeout=10, headers=headers)
+                self._raise_for_status(status, status_url)
                 
-                status_data = status_response.json()
+                status_data = _json_loads(body)
                 
                 # Leonardo.ai nests the generation data under "generations_by_pk"
                 generation_data = status_data.get("generations_by_pk", {})
                 current_status = generation_data.get("status")
                 
-                print(f"[RELOAD] Poll attempt {attempt + 1}/180 - Status: {current_status}")
+                print(f"[RELOAD] Poll attempt {attempt} - Status: {current_status}")
                 
                 # Check if generation is complete
                 if current_status == "COMPLETE":
                     print(f"[OK] Generation complete! Retrieving image...")
                     
-                    # Get the image URL from the nested structure
+                    # Get the image URLs from the nested structure
                     generated_images = generation_data.get("generated_images", [])
                     if len(generated_images) > 0:
-                        image_url = generated_images[0]["url"]
-                        
-                        # Download the image
-                        image_response = requests.get(image_url, timeout=30)
-                        image_response.raise_for_status()
-                        
-                        image = Image.open(io.BytesIO(image_response.content))
-                        print(f"[OK] Leonardo.ai generation completed via polling")
-                        return image
+                        return generated_images
                     else:
                         raise Exception("Generation marked as COMPLETE but no images found")
                 
@@ -1783,14 +2302,13 @@ class ModernGeneratorManager:
                     error_message = generation_data.get("errorMessage", "Unknown error")
                     raise Exception(f"Leonardo.ai generation failed: {error_message}")
                 
-                # Continue polling for other statuses (PENDING, RUNNING, etc.)
-                else:
-                    # Implement delay as per best practices (2-3 seconds between requests)
-                    await asyncio.sleep(3)  # Using 3 seconds as recommended
-                    
-            except requests.exceptions.RequestException as e:
+                # Other statuses (PENDING, RUNNING, etc.) keep polling
+                
+            except HTTP_ERRORS as e:
                 print(f"[WARNING] Polling request failed: {e}")
-                await asyncio.sleep(3)  # Wait before retry
+            
+            await asyncio.sleep(min(delay, max(0.0, deadline - time.monotonic())))
+            delay = min(delay * 2, LEONARDO_POLL_MAX_DELAY)
         
         raise TimeoutError("Generation timed out after 6 minutes")
     
@@ -1826,15 +2344,7 @@ class ModernGeneratorManager:
         """Upscale image using Leonardo.ai Universal Upscaler"""
         print(f"[UPSCALE] Leonardo.ai upscaling with factor {upscale_factor}...")
         
-        # Check API key
-        if 'leonardo-api' not in self.api_keys:
-            raise ValueError("Leonardo.ai API key not set. Please set your API key first.")
-        
-        api_key = self.api_keys['leonardo-api']
-        
-        # Validate API key format
-        if not isinstance(api_key, str) or len(api_key) > 1000 or len(api_key) < 10:
-            raise ValueError("Leonardo.ai API key appears to be corrupted or invalid. Please check your API key configuration.")
+        api_key = self._require_leonardo_api_key()
         
         print(f"[UPSCALE] API key found: {'*' * 10}{api_key[-4:]}")
         
@@ -1866,6 +2376,7 @@ class ModernGeneratorManager:
         # Prepare upscaling request
         headers = {
             "accept": "application/json",
+            "accept-encoding": LEONARDO_ACCEPT_ENCODING,
             "authorization": f"Bearer {api_key}",
             "content-type": "application/json"
         }
@@ -1912,10 +2423,10 @@ class ModernGeneratorManager:
                             # Universal upscaler payload
                             payload_endpoint = payload.copy()
                         
-                        response = requests.post(
+                        response = self._http.post(
                             endpoint,
                             headers=headers,
-                            json=payload_endpoint,
+                            data=_json_dumps(payload_endpoint),
                             timeout=30
                         )
                         
@@ -1957,6 +2468,7 @@ class ModernGeneratorManager:
         """Generate an image using uploaded image as input"""
         headers = {
             "accept": "application/json",
+            "accept-encoding": LEONARDO_ACCEPT_ENCODING,
             "authorization": f"Bearer {api_key}",
             "content-type": "application/json"
         }
@@ -1979,10 +2491,10 @@ class ModernGeneratorManager:
         print(f"[UPSCALE] Generation payload: {json.dumps(payload, indent=2)}")
         
         try:
-            response = requests.post(
+            response = self._http.post(
                 "https://cloud.leonardo.ai/api/rest/v1/generations",
                 headers=headers,
-                json=payload,
+                data=_json_dumps(payload),
                 timeout=30
             )
             
@@ -2010,7 +2522,7 @@ class ModernGeneratorManager:
             # Extract the generated image ID from the generation response
             # The polling returns the image, but we need the ID for upscaling
             # Let's make another API call to get the generation details
-            status_response = requests.get(
+            status_response = self._http.get(
                 f"https://cloud.leonardo.ai/api/rest/v1/generations/{generation_id}",
                 headers=headers,
                 timeout=10
@@ -2043,6 +2555,7 @@ class ModernGeneratorManager:
         
         headers = {
             "accept": "application/json",
+            "accept-encoding": LEONARDO_ACCEPT_ENCODING,
             "authorization": f"Bearer {api_key}",
             "content-type": "application/json"
         }
@@ -2055,10 +2568,10 @@ class ModernGeneratorManager:
         print(f"[UPSCALE] Payload: {json.dumps(payload, indent=2)}")
         
         try:
-            response = requests.post(
+            response = self._http.post(
                 "https://cloud.leonardo.ai/api/rest/v1/variations/upscale",
                 headers=headers,
-                json=payload,
+                data=_json_dumps(payload),
                 timeout=30
             )
             
@@ -2111,6 +2624,7 @@ class ModernGeneratorManager:
         # Prepare upscaling request
         headers = {
             "accept": "application/json",
+            "accept-encoding": LEONARDO_ACCEPT_ENCODING,
             "authorization": f"Bearer {api_key}",
             "content-type": "application/json"
         }
@@ -2134,11 +2648,10 @@ class ModernGeneratorManager:
         
         try:
             # Initiate upscaling
-            import requests
-            response = requests.post(
+            response = self._http.post(
                 "https://cloud.leonardo.ai/api/rest/v1/variations/universal-upscaler",
                 headers=headers,
-                json=payload,
+                data=_json_dumps(payload),
                 timeout=30
             )
             
@@ -2179,6 +2692,7 @@ class ModernGeneratorManager:
         # Step 1: Get presigned URL for upload
         headers = {
             "accept": "application/json",
+            "accept-encoding": LEONARDO_ACCEPT_ENCODING,
             "authorization": f"Bearer {api_key}",
             "content-type": "application/json"
         }
@@ -2188,10 +2702,10 @@ class ModernGeneratorManager:
         }
         
         try:
-            response = requests.post(
+            response = self._http.post(
                 "https://cloud.leonardo.ai/api/rest/v1/init-image",
                 headers=headers,
-                json=upload_payload,
+                data=_json_dumps(upload_payload),
                 timeout=30
             )
             response.raise_for_status()
@@ -2210,7 +2724,7 @@ class ModernGeneratorManager:
             upload_url = upload_init_image.get("url")
             
             files = {'file': image_bytes}
-            upload_response = requests.post(upload_url, data=fields, files=files, timeout=30)
+            upload_response = self._http.post(upload_url, data=fields, files=files, timeout=30)
             upload_response.raise_for_status()
             
             print(f"[UPSCALE] Image uploaded successfully")
@@ -2239,6 +2753,7 @@ class ModernGeneratorManager:
         # Prepare upscaling request
         headers = {
             "accept": "application/json",
+            "accept-encoding": LEONARDO_ACCEPT_ENCODING,
             "authorization": f"Bearer {api_key}",
             "content-type": "application/json"
         }
@@ -2265,11 +2780,10 @@ class ModernGeneratorManager:
         for attempt in range(max_retries):
             try:
                 # Initiate upscaling
-                import requests
-                response = requests.post(
+                response = self._http.post(
                     "https://cloud.leonardo.ai/api/rest/v1/variations/universal-upscaler",
                     headers=headers,
-                    json=payload,
+                    data=_json_dumps(payload),
                     timeout=30
                 )
                 
@@ -2307,6 +2821,37 @@ class ModernGeneratorManager:
                     print(f"[UPSCALE] Attempt {attempt + 1} failed, retrying...")
                     continue
     
+    async def _first_existing_url(self, urls: List[str], headers: dict):
+        """GET several candidate URLs concurrently and return the first successful (url, response)"""
+        async def fetch(url):
+            return url, await asyncio.to_thread(self._http.get, url, headers=headers, timeout=10)
+
+        winner = None
+
+        def release(task):
+            # Worker threads can't be cancelled, so the losing responses are closed once they
+            # arrive; otherwise their pooled connections are never returned
+            if task.cancelled() or task.exception() is not None:
+                return
+            response = task.result()[1]
+            if response is not winner:
+                response.close()
+
+        tasks = [asyncio.create_task(fetch(url)) for url in urls]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    url, response = await next_done
+                except requests.exceptions.RequestException:
+                    continue
+                if response.ok:
+                    winner = response
+                    return url, response
+            return None, None
+        finally:
+            for task in tasks:
+                task.add_done_callback(release)
+
     async def _poll_leonardo_upscale(self, upscaling_id: str, headers: dict) -> Image.Image:
         """Poll Leonardo.ai upscaling completion"""
         print(f"[UPSCALE] Polling upscaling: {upscaling_id}")
@@ -2319,24 +2864,19 @@ class ModernGeneratorManager:
             f"https://cloud.leonardo.ai/api/rest/v1/upscale/{upscaling_id}",
         ]
         
-        current_endpoint_idx = 0
+        status_url = None
         
         for attempt in range(120):  # Poll for up to 4 minutes (120 * 2 seconds)
             try:
-                status_url = possible_endpoints[current_endpoint_idx]
-                status_response = requests.get(status_url, headers=headers, timeout=10)
-                
-                if status_response.status_code == 404:
-                    # Try next endpoint
-                    if current_endpoint_idx < len(possible_endpoints) - 1:
-                        current_endpoint_idx += 1
-                        print(f"[UPSCALE] Trying next endpoint: {possible_endpoints[current_endpoint_idx]}")
-                        continue
-                    else:
-                        # All endpoints failed, wait and retry from first
-                        current_endpoint_idx = 0
+                if status_url is None:
+                    # Probe every candidate at once and keep the first that knows this job
+                    status_url, status_response = await self._first_existing_url(possible_endpoints, headers)
+                    if status_url is None:
                         await asyncio.sleep(2)
                         continue
+                    print(f"[UPSCALE] Using status endpoint: {status_url}")
+                else:
+                    status_response = await asyncio.to_thread(self._http.get, status_url, headers=headers, timeout=10)
                 
                 status_response.raise_for_status()
                 
@@ -2385,10 +2925,7 @@ class ModernGeneratorManager:
                         raise Exception("Upscaling marked as COMPLETE but no image URL found")
                     
                     # Download upscaled image
-                    image_response = requests.get(image_url, timeout=30)
-                    image_response.raise_for_status()
-                    
-                    upscaled_image = Image.open(io.BytesIO(image_response.content))
+                    upscaled_image = await self._download_image(image_url)
                     print(f"[UPSCALE] Upscaling completed successfully!")
                     return upscaled_image
                 
@@ -2403,7 +2940,7 @@ class ModernGeneratorManager:
                 else:
                     await asyncio.sleep(2)  # Wait 2 seconds between polls
                     
-            except requests.exceptions.RequestException as e:
+            except HTTP_ERRORS as e:
                 print(f"[WARNING] Upscaling poll failed: {e}")
                 await asyncio.sleep(2)
         
@@ -2559,21 +3096,28 @@ class ModernGeneratorManager:
         if "leonardo-api" not in self.available_generators:
             return {}
         
-        generator_info = self.available_generators["leonardo-api"]
-        return {
-            "models": generator_info["models"],
-            "preset_styles": generator_info["preset_styles"],
-            "quality_levels": generator_info["quality_levels"],
-            "aspect_ratios": generator_info["aspect_ratios"],
-            "default_settings": {
-                "model": "leonardo-diffusion-xl",
-                "preset_style": "CREATIVE",
-                "quality": "standard",
-                "aspect_ratio": "1:1",
-                "guidance_scale": 7.5,
-                "num_inference_steps": 15
+        # Built once and reused until the Leonardo model list changes
+        if self._leonardo_options is None:
+            generator_info = self.available_generators["leonardo-api"]
+            self._leonardo_options = {
+                "models": generator_info["models"],
+                "preset_styles": generator_info["preset_styles"],
+                "quality_levels": generator_info["quality_levels"],
+                "aspect_ratios": generator_info["aspect_ratios"],
+                "default_settings": {
+                    "model": "leonardo-diffusion-xl",
+                    "preset_style": "CREATIVE",
+                    "quality": "standard",
+                    "aspect_ratio": "1:1",
+                    "guidance_scale": 7.5,
+                    "num_inference_steps": 15
+                }
             }
-        }
+        # Callers may fill in their own defaults; keep those edits out of the shared copy.
+        # The option lists belong to available_generators and are not copied.
+        options = dict(self._leonardo_options)
+        options["default_settings"] = dict(options["default_settings"])
+        return options
     
     def get_optimal_settings(self, generator_name: str) -> Dict[str, Any]:
         """Get optimal settings for a specific modern generator"""
@@ -10,6 +10,11 @@ import json
 import os
 import random
 
+# Terms stripped by clean_prompt, matched in a single pass
+NEGATIVE_TERMS = ["nsfw", "nude", "naked", "inappropriate"]
+_NEGATIVE_TERMS_RE = re.compile(r'\b(?:' + '|'.join(map(re.escape, NEGATIVE_TERMS)) + r')\b', re.IGNORECASE)
+_WHITESPACE_RE = re.compile(r'\s+')
+
 class PromptEnhancer:
     """Enhance prompts with different styles and detail levels"""
     
@@ -467,12 +472,10 @@ class PromptEnhancer:
     def clean_prompt(self, prompt: str) -> str:
         """Clean and normalize the prompt"""
         # Remove extra whitespace
-        prompt = re.sub(r'\s+', ' ', prompt.strip())
+        prompt = _WHITESPACE_RE.sub(' ', prompt.strip())
         
         # Remove common negative terms
-        negative_terms = ["nsfw", "nude", "naked", "inappropriate"]
-        for term in negative_terms:
-            prompt = re.sub(rf'\b{term}\b', '', prompt, flags=re.IGNORECASE)
+        prompt = _NEGATIVE_TERMS_RE.sub('', prompt)
         
         return prompt.strip()
     
@@ -5,7 +5,17 @@ Setup Leonardo.ai API key for VisionCraft Pro
 
 import os
 import json
+from concurrent.futures import ThreadPoolExecutor
 from modern_generators import ModernGeneratorManager
+# Shared platform probe; its keep-alive session lets the status check and key test share one TLS connection
+from check_leonardo_status import probe_platform, iter_platform_models
+
+POPULAR_MODEL_KEYWORDS = ("flux", "leonardo", "stable diffusion")
+
+def close_probe_response(future):
+    """Close a streamed probe response nobody is going to read"""
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
 
 def setup_leonardo_key():
     print("🔑 Setting up Leonardo.ai API key...")
@@ -20,6 +30,12 @@ def setup_leonardo_key():
     
     print(f"✅ API key received: {api_key[:10]}...")
     
+    # The key check doesn't depend on the manager, so start it now; it then overlaps with
+    # the platform models fetch that set_api_key triggers instead of queueing behind it
+    executor = ThreadPoolExecutor(max_workers=1)
+    key_probe = executor.submit(probe_platform, api_key, timeout=10, stream=True)
+    executor.shutdown(wait=False)
+    
     # Initialize modern manager
     try:
         manager = ModernGeneratorManager()
@@ -33,59 +49,55 @@ def setup_leonardo_key():
         print("🧪 Testing API key...")
         
         try:
-            # Test platform endpoint
-            import requests
-            response = requests.get(
-                "https://cloud.leonardo.ai/api/rest/v1/platform",
-                headers={"Authorization": f"Bearer {api_key}"},
-                timeout=10
-            )
-            
-            if response.status_code == 200:
-                print("✅ API key is valid!")
-                
-                # Show available models
-                data = response.json()
-                models = data.get("models", [])
-                print(f"🎨 Available models: {len(models)}")
-                
-                # Show some popular models
-                popular_models = [m for m in models if any(keyword in m.get("name", "").lower() for keyword in ["flux", "leonardo", "stable diffusion"])]
-                if popular_models:
-                    print("🔥 Popular models you can use:")
-                    for model in popular_models[:5]:
-                        model_id = model.get("id", "")
-                        model_name = model.get("name", "Unknown")
-                        print(f"   - {model_name} (ID: {model_id})")
-                
-                print()
-                print("🚀 Leonardo.ai is now configured and ready to use!")
-                print("📝 Try generating an image with a Leonardo.ai model")
-                
-                return True
-            else:
-                print(f"❌ API key validation failed: {response.status_code}")
-                if response.status_code == 401:
-                    print("   The API key appears to be invalid")
-                elif response.status_code == 403:
-                    print("   The API key may not have the right permissions")
+            # Test platform endpoint; the streamed response is closed on every path
+            with key_probe.result() as response:
+                if response.status_code == 200:
+                    print("✅ API key is valid!")
+                    
+                    # Count the models and keep the first few popular ones in one streaming pass
+                    model_count = 0
+                    popular_models = []
+                    for model in iter_platform_models(response):
+                        model_count += 1
+                        if len(popular_models) < 5 and any(keyword in model.get("name", "").lower() for keyword in POPULAR_MODEL_KEYWORDS):
+                            popular_models.append(model)
+                    print(f"🎨 Available models: {model_count}")
+                    
+                    # Show some popular models
+                    if popular_models:
+                        print("🔥 Popular models you can use:")
+                        for model in popular_models:
+                            model_id = model.get("id", "")
+                            model_name = model.get("name", "Unknown")
+                            print(f"   - {model_name} (ID: {model_id})")
+                    
+                    print()
+                    print("🚀 Leonardo.ai is now configured and ready to use!")
+                    print("📝 Try generating an image with a Leonardo.ai model")
+                    
+                    return True
+                else:
+                    print(f"❌ API key validation failed: {response.status_code}")
+                    if response.status_code == 401:
+                        print("   The API key appears to be invalid")
+                    elif response.status_code == 403:
+                        print("   The API key may not have the right permissions")
                 
         except Exception as e:
             print(f"❌ Error testing API key: {e}")
             
     except Exception as e:
         print(f"❌ Error setting up API key: {e}")
+        key_probe.add_done_callback(close_probe_response)
     
     return False
 
 def show_current_status():
     """Show current Leonardo.ai configuration status"""
     try:
+        # The constructor already loads the API keys
         manager = ModernGeneratorManager()
         
-        # Load API keys
-        manager.load_api_keys()
-        
         api_keys = manager.api_keys
         leonardo_key = api_keys.get("leonardo-api")
         
@@ -100,12 +112,7 @@ def show_current_status():
         if leonardo_key:
             print("🧪 Testing API connectivity...")
             try:
-                import requests
-                response = requests.get(
-                    "https://cloud.leonardo.ai/api/rest/v1/platform",
-                    headers={"Authorization": f"Bearer {leonardo_key}"},
-                    timeout=5
-                )
+                response = probe_platform(leonardo_key, timeout=5)
                 
                 if response.status_code == 200:
                     print("✅ API connection successful")
@@ -1,39 +1,115 @@
-import requests
+import argparse
+import asyncio
+import shelve
+import time
+import aiohttp
 from azure.identity import DefaultAzureCredential, get_bearer_token_provider
 
 endpoint = "https://timbor-azure-resource.openai.azure.com/openai/v1/images/generations"
-model_candidates = [
+# dict.fromkeys drops repeated names while keeping probe order
+model_candidates = list(dict.fromkeys([
     "flux.2-pro",
     "FLUX.2-pro",
     "flux-2-pro",
     "FLUX-2-pro",
-    "flux-2-pro",
     "flux.2-Pro",
     "FLUX.2-Pro",
-]
+]))
+
+# Generation probes cost credits, so conclusive answers are remembered for a week
+CACHE_FILE = "model_probe_cache.db"
+CACHE_TTL_S = 7 * 86400
+# Only answers about the model name itself are cached: it works (200, or 429 while
+# rate limited) or it doesn't exist (400/404). Auth failures and timeouts are not.
+CACHEABLE_STATUSES = (200, 400, 404, 429)
+
+def cached_result(cache, name):
+    entry = cache.get(f"{endpoint}|{name}")
+    if entry and time.time() - entry["ts"] < CACHE_TTL_S:
+        return entry["status"], entry["text"]
+    return None
+
+def store_result(cache, name, status, text):
+    if status in CACHEABLE_STATUSES:
+        cache[f"{endpoint}|{name}"] = {"status": status, "text": text[:400], "ts": time.time()}
+
+async def probe(session, sem, headers, name):
+    async with sem, session.post(endpoint, headers=headers, json={
+        "model": name,
+        "prompt": "test image",
+        "n": 1,
+        "size": "1024x1024"
+    }, timeout=aiohttp.ClientTimeout(total=30)) as resp:
+        return resp.status, await resp.text()
+
+async def probe_named(session, sem, headers, name):
+    try:
+        return name, await probe(session, sem, headers, name)
+    except Exception as e:
+        return name, e
 
-try:
+def model_works(result):
+    return not isinstance(result, BaseException) and result[0] in (200, 429)
+
+async def main(use_cache=True, max_found=1):
     token_provider = get_bearer_token_provider(DefaultAzureCredential(), "https://cognitiveservices.azure.com/.default")
     token = token_provider()
     headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
     print(f"Token prefix: {token[:20]}...")
 
-    for name in model_candidates:
+    # Probe every name at once; the semaphore bounds in-flight requests
+    names = model_candidates
+    with shelve.open(CACHE_FILE) as cache:
+        results = {name: cached_result(cache, name) for name in names} if use_cache else {}
+        pending = [name for name in names if results.get(name) is None]
+        if len(pending) < len(names):
+            print(f"Using cached results for {len(names) - len(pending)} candidate(s)")
+        found = sum(1 for result in results.values() if result is not None and model_works(result))
+
+        sem = asyncio.Semaphore(5)
+        connector = aiohttp.TCPConnector(limit=10, limit_per_host=5)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            tasks = [asyncio.create_task(probe_named(session, sem, headers, name))
+                     for name in pending] if found < max_found else []
+            for next_done in asyncio.as_completed(tasks):
+                name, result = await next_done
+                results[name] = result
+                if not isinstance(result, BaseException):
+                    store_result(cache, name, *result)
+                if model_works(result):
+                    found += 1
+                    if found >= max_found:
+                        break
+            # Enough working names are known - don't spend credits on the rest
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    for name in names:
+        result = results.get(name)
         print(f"\nTesting model: {name}")
-        resp = requests.post(endpoint, headers=headers, json={
-            "model": name,
-            "prompt": "test image",
-            "n": 1,
-            "size": "1024x1024"
-        })
-        print(f"Status: {resp.status_code}")
-        if resp.status_code == 200:
+        if result is None:
+            print("Skipped - enough working models already found")
+            continue
+        if isinstance(result, BaseException):
+            print(f"Error: {result}")
+            continue
+        status, text = result
+        print(f"Status: {status}")
+        if status == 200:
             print("SUCCESS! Model works")
-            break
-        elif resp.status_code == 429:
+        elif status == 429:
             print("Rate limited - but model works")
-            break
         else:
-            print(f"Error: {resp.text}")
-except Exception as e:
-    print(f"Error during testing: {e}")
+            print(f"Error: {text}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Probe Azure FLUX model name candidates")
+    parser.add_argument("--no-cache", action="store_true", help="ignore cached results and re-probe every candidate")
+    parser.add_argument("--max-found", type=int, default=1, help="stop probing once this many working names are found")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(main(use_cache=not args.no_cache, max_found=args.max_found))
+    except Exception as e:
+        print(f"Error during testing: {e}")
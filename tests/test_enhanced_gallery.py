@@ -0,0 +1,297 @@
+"""
+Unit tests for the enhanced image gallery
+Tests search, bulk inserts, similarity lookups and connection cleanup
+"""
+
+import unittest
+import gc
+import sqlite3
+import tempfile
+import weakref
+import os
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from PIL import Image
+
+from enhanced_gallery import EnhancedImageGallery, _popcount64
+
+
+class TestEnhancedGallerySearch(unittest.TestCase):
+    """Test substring search over prompts and filenames"""
+    
+    def setUp(self):
+        """Create a gallery with a few images"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.gallery = EnhancedImageGallery(self.temp_dir)
+        for name, prompt in [("dog.png", "a running dog on the beach"),
+                             ("cats.png", "concatenate cats"),
+                             ("tree.png", "a lone tree")]:
+            path = os.path.join(self.gallery.images_dir, name)
+            Image.new('RGB', (16, 16), 'white').save(path)
+            self.gallery.add_image(path, prompt=prompt)
+    
+    def tearDown(self):
+        """Clean up temporary files"""
+        import shutil
+        self.gallery.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def _search(self, term):
+        return [image['prompt'] for image in self.gallery.get_images(search_term=term)]
+    
+    def test_search_mid_word(self):
+        """Test that a partial word in the middle of a prompt matches"""
+        self.assertEqual(self._search("runn"), ["a running dog on the beach"])
+        self.assertEqual(self._search("atenate"), ["concatenate cats"])
+    
+    def test_search_suffix(self):
+        """Test that a word suffix matches"""
+        self.assertEqual(self._search("ning"), ["a running dog on the beach"])
+    
+    def test_search_case_insensitive(self):
+        """Test that search ignores case"""
+        self.assertEqual(self._search("RUNNING DOG"), ["a running dog on the beach"])
+    
+    def test_search_short_term(self):
+        """Test that terms too short for the trigram index still match"""
+        self.assertEqual(self._search("ts"), ["concatenate cats"])
+    
+    def test_search_filename(self):
+        """Test that filenames are searched too"""
+        self.assertEqual(self._search("tree.p"), ["a lone tree"])
+    
+    def test_search_no_match(self):
+        """Test that an unmatched term returns nothing"""
+        self.assertEqual(self._search("zebra"), [])
+    
+    def test_search_after_update(self):
+        """Test that the index follows deleted rows"""
+        conn = self.gallery.connection()
+        conn.execute("DELETE FROM images WHERE filename = 'dog.png'")
+        conn.commit()
+        self.assertEqual(self._search("runn"), [])
+    
+    def test_search_suggestions_partial_word(self):
+        """Test that suggestions match inside words"""
+        self.assertEqual(self.gallery.search_suggestions("runn"), ["a running dog on the beach"])
+
+
+class TestEnhancedGalleryBulk(unittest.TestCase):
+    """Test bulk and parallel image inserts"""
+    
+    def setUp(self):
+        """Create an empty gallery and a few image files"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.gallery = EnhancedImageGallery(self.temp_dir)
+        self.paths = []
+        for index in range(5):
+            path = os.path.join(self.gallery.images_dir, f"bulk_{index}.png")
+            Image.new('RGB', (32 + index, 16), (index * 40, 0, 0)).save(path)
+            self.paths.append(path)
+    
+    def tearDown(self):
+        """Clean up temporary files"""
+        import shutil
+        self.gallery.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def _count(self, query, params=()):
+        return self.gallery.connection().execute(query, params).fetchone()[0]
+    
+    def _tags(self, image_id):
+        rows = self.gallery.connection().execute('''
+            SELECT t.name FROM tags t JOIN image_tags it ON t.id = it.tag_id
+            WHERE it.image_id = ? ORDER BY t.name
+        ''', (image_id,)).fetchall()
+        return [row[0] for row in rows]
+    
+    def test_add_images_bulk(self):
+        """Test inserting many images in one call"""
+        records = [{'image_path': path, 'prompt': f"bulk prompt {index}",
+                    'category': "abstract", 'tags': ["Shared", f"tag{index}"]}
+                   for index, path in enumerate(self.paths)]
+        image_ids = self.gallery.add_images_bulk(records)
+        
+        self.assertEqual(len(image_ids), 5)
+        self.assertNotIn(-1, image_ids)
+        self.assertEqual(self._count("SELECT COUNT(*) FROM images"), 5)
+        self.assertEqual(self._count("SELECT COUNT(*) FROM images WHERE category = 'abstract'"), 5)
+        self.assertEqual(self._tags(image_ids[2]), ["shared", "tag2"])
+        self.assertEqual(self._count("SELECT usage_count FROM tags WHERE name = 'shared'"), 5)
+        self.assertEqual(self._count("SELECT width FROM images WHERE id = ?", (image_ids[3],)), 35)
+        
+        # Every row is in the full-text index
+        self.assertEqual(self._count("SELECT COUNT(*) FROM images_fts WHERE images_fts MATCH ?",
+                                     ('"bulk prompt"',)), 5)
+        self.assertEqual(len(self.gallery.get_images(search_term="prompt 4")), 1)
+    
+    def test_add_images_bulk_bad_record(self):
+        """Test that an unreadable image gets -1 without failing the batch"""
+        records = [{'image_path': self.paths[0]},
+                   {'image_path': os.path.join(self.temp_dir, "missing.png")},
+                   {'image_path': self.paths[1]}]
+        image_ids = self.gallery.add_images_bulk(records)
+        
+        self.assertEqual(image_ids[1], -1)
+        self.assertNotIn(-1, (image_ids[0], image_ids[2]))
+        self.assertEqual(self._count("SELECT COUNT(*) FROM images"), 2)
+    
+    def test_add_images_bulk_duplicate_tags(self):
+        """Test that tags differing only in case count once, as with add_image"""
+        bulk_id = self.gallery.add_images_bulk([{'image_path': self.paths[0], 'tags': ["cat", "Cat "]}])[0]
+        single_id = self.gallery.add_image(self.paths[1], tags=["dog", "Dog"])
+        
+        self.assertEqual(self._tags(bulk_id), ["cat"])
+        self.assertEqual(self._tags(single_id), ["dog"])
+        self.assertEqual(self._count("SELECT usage_count FROM tags WHERE name = 'cat'"), 1)
+        self.assertEqual(self._count("SELECT usage_count FROM tags WHERE name = 'dog'"), 1)
+    
+    def test_add_images_bulk_readd_keeps_id(self):
+        """Test that re-adding a file updates its row in place"""
+        first = self.gallery.add_images_bulk([{'image_path': self.paths[0], 'prompt': "old"}])
+        second = self.gallery.add_images_bulk([{'image_path': self.paths[0], 'prompt': "new"}])
+        
+        self.assertEqual(first, second)
+        self.assertEqual(self._count("SELECT COUNT(*) FROM images"), 1)
+        self.assertEqual([image['prompt'] for image in self.gallery.get_images(search_term="new")], ["new"])
+        self.assertEqual(self.gallery.get_images(search_term="old"), [])
+    
+    def test_add_images_parallel(self):
+        """Test inserting images with metadata computed in worker processes"""
+        records = [{'image_path': self.paths[0], 'tags': ["first"]}] + self.paths[1:]
+        records.append(os.path.join(self.temp_dir, "missing.png"))
+        image_ids = self.gallery.add_images_parallel(records, workers=2)
+        
+        self.assertEqual(len(image_ids), 6)
+        self.assertEqual(image_ids[-1], -1)
+        self.assertNotIn(-1, image_ids[:-1])
+        self.assertEqual(self._count("SELECT COUNT(*) FROM images"), 5)
+        self.assertEqual(self._count("SELECT COUNT(*) FROM images WHERE thumbnail_path IS NOT NULL"), 5)
+        self.assertEqual(self._tags(image_ids[0]), ["first"])
+        self.assertEqual(self._count("SELECT COUNT(*) FROM images_fts WHERE images_fts MATCH ?",
+                                     ('filename : "bulk_"',)), 5)
+
+
+class TestEnhancedGallerySimilarity(unittest.TestCase):
+    """Test perceptual-hash similarity lookups"""
+    
+    def setUp(self):
+        """Create a gallery with an image, a resized JPEG copy and an unrelated image"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.gallery = EnhancedImageGallery(self.temp_dir)
+        
+        original = self._pattern(1)
+        self.original_id = self._add(original, "original.png")
+        self.copy_id = self._add(original.resize((128, 128)), "copy.jpg", quality=75)
+        self.other_id = self._add(self._pattern(2), "other.png")
+    
+    def tearDown(self):
+        """Clean up temporary files"""
+        import shutil
+        self.gallery.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    @staticmethod
+    def _pattern(seed):
+        """A smooth random color field, so the hash has low-frequency structure"""
+        rng = np.random.default_rng(seed)
+        pixels = rng.integers(0, 256, (8, 8, 3), dtype=np.uint8)
+        return Image.fromarray(pixels).resize((256, 256), Image.Resampling.BICUBIC)
+    
+    def _add(self, image, filename, **save_args):
+        path = os.path.join(self.gallery.images_dir, filename)
+        image.save(path, **save_args)
+        return self.gallery.add_image(path)
+    
+    def test_phash_is_64_bit(self):
+        """Test that images are stored with a 16 hex digit perceptual hash"""
+        row = self.gallery.connection().execute(
+            "SELECT hash FROM images WHERE id = ?", (self.original_id,)).fetchone()
+        self.assertEqual(len(row[0]), 16)
+    
+    def test_find_similar(self):
+        """Test that a resized, re-encoded copy is found and a different image is not"""
+        similar = self.gallery.find_similar(self.original_id)
+        
+        self.assertEqual([image['id'] for image in similar], [self.copy_id])
+        self.assertEqual(similar[0]['filename'], "copy.jpg")
+        self.assertLessEqual(similar[0]['distance'], 5)
+    
+    def test_find_similar_distance_order(self):
+        """Test that a wide threshold returns everything else, nearest first"""
+        similar = self.gallery.find_similar(self.original_id, max_distance=64)
+        
+        self.assertEqual([image['id'] for image in similar], [self.copy_id, self.other_id])
+        self.assertGreater(similar[1]['distance'], 5)
+    
+    def test_find_similar_unknown_image(self):
+        """Test that an unknown image id has no matches"""
+        self.assertEqual(self.gallery.find_similar(9999), [])
+    
+    def test_find_near_duplicates(self):
+        """Test that only the copy pair is reported, across tile boundaries too"""
+        for block_size in (1, 2, 1024):
+            pairs = self.gallery.find_near_duplicates(block_size=block_size)
+            self.assertEqual([sorted(pair[:2]) for pair in pairs],
+                             [sorted((self.original_id, self.copy_id))])
+    
+    def test_find_near_duplicates_all_pairs(self):
+        """Test that each pair is reported once with no self-matches"""
+        for block_size in (1, 2, 1024):
+            pairs = self.gallery.find_near_duplicates(max_distance=64, block_size=block_size)
+            self.assertEqual(sorted(tuple(sorted(pair[:2])) for pair in pairs),
+                             sorted(tuple(sorted(pair)) for pair in [
+                                 (self.original_id, self.copy_id),
+                                 (self.original_id, self.other_id),
+                                 (self.copy_id, self.other_id)]))
+    
+    def test_popcount64(self):
+        """Test the vectorized bit count against Python's"""
+        values = np.array([0, 1, 0xFF, 0x8000000000000001, 0xFFFFFFFFFFFFFFFF, 0x123456789ABCDEF0],
+                          dtype=np.uint64)
+        self.assertEqual(_popcount64(values).tolist(), [bin(int(v)).count('1') for v in values])
+
+
+class TestEnhancedGalleryConnections(unittest.TestCase):
+    """Test connection cleanup"""
+    
+    def setUp(self):
+        """Create a temporary gallery directory"""
+        self.temp_dir = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        """Clean up temporary files"""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_close(self):
+        """Test that close() closes the connection and a new one opens on next use"""
+        gallery = EnhancedImageGallery(self.temp_dir)
+        conn = gallery.connection()
+        gallery.close()
+        
+        with self.assertRaises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+        self.assertEqual(gallery.get_statistics()["total_images"], 0)
+        gallery.close()
+    
+    def test_gallery_is_garbage_collected(self):
+        """Test that a dropped gallery is freed and its connections closed"""
+        gallery = EnhancedImageGallery(self.temp_dir)
+        conn = gallery.connection()
+        gallery_ref = weakref.ref(gallery)
+        
+        del gallery
+        gc.collect()
+        
+        self.assertIsNone(gallery_ref())
+        with self.assertRaises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+"""
+Unit tests for the modern generators' HTTP client lifecycle
+Tests per-event-loop sessions and their cleanup
+"""
+
+import unittest
+import asyncio
+import tempfile
+import threading
+import time
+import os
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modern_generators import ModernGeneratorManager, AIOHTTP_AVAILABLE, HTTP2_AVAILABLE
+
+
+class TestHTTPSessions(unittest.TestCase):
+    """Test ModernGeneratorManager session handling across event loops"""
+    
+    def setUp(self):
+        """Create a manager working in a temporary directory"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.old_cwd = os.getcwd()
+        os.chdir(self.temp_dir)
+        self.manager = ModernGeneratorManager()
+    
+    def tearDown(self):
+        """Clean up temporary files"""
+        import shutil
+        os.chdir(self.old_cwd)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    @unittest.skipUnless(AIOHTTP_AVAILABLE, "aiohttp is not installed")
+    def test_session_closed_with_its_loop(self):
+        """Test that close_loop_sessions() closes the session of a per-call loop"""
+        async def call():
+            session = self.manager._get_session()
+            self.assertIs(self.manager._get_session(), session)
+            await self.manager.close_loop_sessions()
+            return session
+        
+        sessions = [asyncio.run(call()) for _ in range(3)]
+        
+        self.assertTrue(all(session.closed for session in sessions))
+        self.assertEqual(len({id(session) for session in sessions}), 3)
+        self.assertEqual(self.manager._sessions, {})
+    
+    @unittest.skipUnless(AIOHTTP_AVAILABLE, "aiohttp is not installed")
+    def test_concurrent_loops_keep_their_own_session(self):
+        """Test that loops in different threads don't replace each other's session"""
+        started = threading.Barrier(2)
+        results = {}
+        
+        def worker(name):
+            async def call():
+                session = self.manager._get_session()
+                await asyncio.to_thread(started.wait)
+                results[name] = (session, self.manager._get_session(), session.closed)
+                await self.manager.close_loop_sessions()
+            asyncio.run(call())
+        
+        threads = [threading.Thread(target=worker, args=(name,)) for name in ("a", "b")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        for first, again, closed in results.values():
+            self.assertIs(first, again)
+            self.assertFalse(closed)
+        self.assertIsNot(results["a"][0], results["b"][0])
+        self.assertEqual(self.manager._sessions, {})
+    
+    @unittest.skipIf(AIOHTTP_AVAILABLE, "aiohttp is installed")
+    def test_session_requires_aiohttp(self):
+        """Test that _get_session() fails clearly when aiohttp is missing"""
+        async def call():
+            self.manager._get_session()
+        
+        with self.assertRaisesRegex(RuntimeError, "aiohttp is not installed"):
+            asyncio.run(call())
+    
+    @unittest.skipUnless(HTTP2_AVAILABLE, "httpx[http2] is not installed")
+    def test_httpx_client_closed_with_its_loop(self):
+        """Test that close_loop_sessions() also closes the loop's httpx client"""
+        async def call():
+            client = self.manager._get_httpx_client()
+            self.assertIs(self.manager._get_httpx_client(), client)
+            await self.manager.close_loop_sessions()
+            return client
+        
+        clients = [asyncio.run(call()) for _ in range(3)]
+        
+        self.assertTrue(all(client.is_closed for client in clients))
+        self.assertEqual(len({id(client) for client in clients}), 3)
+        self.assertEqual(self.manager._httpx_clients, {})
+    
+    @unittest.skipUnless(AIOHTTP_AVAILABLE, "aiohttp is not installed")
+    @unittest.skipUnless(HTTP2_AVAILABLE, "httpx[http2] is not installed")
+    def test_close(self):
+        """Test that close() closes the current loop's session and httpx client"""
+        async def call():
+            session = self.manager._get_session()
+            client = self.manager._get_httpx_client()
+            await self.manager.close()
+            return session, client
+        
+        session, client = asyncio.run(call())
+        self.assertTrue(session.closed)
+        self.assertTrue(client.is_closed)
+        self.assertEqual(self.manager._sessions, {})
+        self.assertEqual(self.manager._httpx_clients, {})
+    
+    def test_first_existing_url_closes_losing_responses(self):
+        """Test that probe responses other than the returned one get closed"""
+        closed = []
+        
+        class FakeResponse:
+            def __init__(self, url):
+                self.url = url
+                self.ok = url != "c"
+            
+            def close(self):
+                closed.append(self.url)
+        
+        def fake_get(url, **kwargs):
+            time.sleep({"a": 0.01, "b": 0.05, "c": 0.1}[url])
+            return FakeResponse(url)
+        
+        self.manager._http.get = fake_get
+        
+        async def call():
+            result = await self.manager._first_existing_url(["a", "b", "c"], {})
+            await asyncio.sleep(0.2)
+            return result
+        
+        url, response = asyncio.run(call())
+        self.assertEqual(url, "a")
+        self.assertEqual(sorted(closed), ["b", "c"])
+
+
+if __name__ == '__main__':
+    unittest.main()
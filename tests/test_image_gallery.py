@@ -0,0 +1,247 @@
+"""
+Unit tests for the image gallery
+Tests metadata persistence and compaction of stored images
+"""
+
+import unittest
+import json
+import tempfile
+import os
+import sys
+from unittest import mock
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+from image_gallery import ImageGallery
+
+
+def gradient_image(shade: int = 0) -> Image.Image:
+    """A smooth image that compresses noticeably better at higher PNG levels"""
+    image = Image.linear_gradient('L').resize((256, 256))
+    return Image.merge('RGB', (image, image.rotate(90), Image.new('L', (256, 256), shade)))
+
+
+class TestImageGalleryCompaction(unittest.TestCase):
+    """Test compact_gallery"""
+    
+    def setUp(self):
+        """Create a gallery with fast-compressed PNGs and a JPEG"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.gallery = ImageGallery(self.temp_dir)
+        self.png_ids = [self._add(shade) for shade in (0, 80, 160)]
+        self.jpeg_id = self._add(200, image_format="jpeg")
+    
+    def tearDown(self):
+        """Clean up temporary files"""
+        import shutil
+        self.gallery.enhanced_gallery.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def _add(self, shade, **kwargs):
+        return self.gallery.add_image_pil(gradient_image(shade), f"gradient {shade}", "test-model",
+                                          1.0, 0.0, 20, 7.5, (256, 256), **kwargs)
+    
+    def _file_size(self, image_id):
+        return os.path.getsize(self.gallery.get_image_path(image_id))
+    
+    def _check_sizes(self, gallery):
+        """Every entry's size matches its file, and the running total matches the entries"""
+        for entry in gallery.metadata:
+            self.assertEqual(entry["size"], self._file_size(entry["id"]))
+        total = sum(entry["size"] for entry in gallery.metadata)
+        self.assertEqual(gallery._total_size, total)
+        self.assertEqual(gallery.get_stats()["total_size_mb"], round(total / (1024 * 1024), 2))
+    
+    def test_compact_shrinks_pngs(self):
+        """Test that compaction shrinks PNGs and keeps sizes and stats in step"""
+        before = {image_id: self._file_size(image_id) for image_id in self.png_ids + [self.jpeg_id]}
+        
+        self.assertIsNone(self.gallery.compact_gallery(background=False))
+        
+        for image_id in self.png_ids:
+            self.assertLess(self._file_size(image_id), before[image_id])
+        self.assertEqual(self._file_size(self.jpeg_id), before[self.jpeg_id])
+        self._check_sizes(self.gallery)
+    
+    def test_compact_preserves_pixels(self):
+        """Test that compaction is lossless"""
+        with Image.open(self.gallery.get_image_path(self.png_ids[1])) as image:
+            original = image.tobytes()
+        self.gallery.compact_gallery(background=False)
+        with Image.open(self.gallery.get_image_path(self.png_ids[1])) as image:
+            self.assertEqual(image.tobytes(), original)
+    
+    def test_compact_in_background(self):
+        """Test that a background compaction leaves consistent sizes once it finishes"""
+        thread = self.gallery.compact_gallery()
+        thread.join()
+        self._check_sizes(self.gallery)
+    
+    def test_compacted_sizes_are_saved(self):
+        """Test that compacted sizes survive reopening the gallery"""
+        self.gallery.compact_gallery(background=False)
+        self.gallery.enhanced_gallery.close()
+        
+        reopened = ImageGallery(self.temp_dir)
+        try:
+            self._check_sizes(reopened)
+        finally:
+            reopened.enhanced_gallery.close()
+    
+    def _compact_deleting_midway(self, delete):
+        """Compact, calling delete() once the first image has been re-encoded"""
+        real_getsize = os.path.getsize
+        pending = [delete]
+        
+        def getsize(path):
+            if path.endswith(".tmp") and pending:
+                pending.pop()()
+            return real_getsize(path)
+        
+        with mock.patch("os.path.getsize", side_effect=getsize):
+            self.gallery.compact_gallery(background=False)
+    
+    def _image_files(self):
+        return sorted(os.listdir(self.gallery.images_dir))
+    
+    def test_compact_does_not_recreate_deleted_file(self):
+        """Test that an image deleted while being re-encoded stays deleted"""
+        # Compaction walks newest first, so the last PNG added is re-encoded first
+        deleted = self.png_ids[-1]
+        self._compact_deleting_midway(lambda: self.gallery.delete_image(deleted))
+        
+        self.assertNotIn(f"{deleted}.png", self._image_files())
+        self.assertFalse(any(name.endswith(".tmp") for name in self._image_files()))
+        self.assertIsNone(self.gallery.get_image_by_id(deleted))
+        self._check_sizes(self.gallery)
+        ids = {row[0] for row in self.gallery.enhanced_gallery.connection().execute(
+            "SELECT id FROM gallery_meta")}
+        self.assertEqual(ids, set(self.png_ids[:-1] + [self.jpeg_id]))
+    
+    def test_compact_does_not_recreate_cleared_files(self):
+        """Test that clearing the gallery mid-compaction leaves no image files behind"""
+        self._compact_deleting_midway(self.gallery.clear_gallery)
+        
+        self.assertEqual(self._image_files(), [])
+        self.assertEqual(self.gallery.get_stats()["total_images"], 0)
+        self.assertEqual(self.gallery._total_size, 0)
+
+
+class TestImageGalleryPersistence(unittest.TestCase):
+    """Test metadata storage in the gallery database"""
+    
+    def setUp(self):
+        """Create a temporary gallery directory"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.galleries = []
+    
+    def tearDown(self):
+        """Clean up temporary files"""
+        import shutil
+        for gallery in self.galleries:
+            gallery.enhanced_gallery.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def _open(self):
+        gallery = ImageGallery(self.temp_dir)
+        self.galleries.append(gallery)
+        return gallery
+    
+    def _add(self, gallery, prompt, **kwargs):
+        return gallery.add_image_pil(Image.new('RGB', (8, 8), 'blue'), prompt, "test-model",
+                                     2.0, 1.5, 20, 7.5, (8, 8), **kwargs)
+    
+    def _meta_ids(self, gallery):
+        return {row[0] for row in gallery.enhanced_gallery.connection().execute(
+            "SELECT id FROM gallery_meta")}
+    
+    def test_reopen_keeps_metadata(self):
+        """Test that entries, their order and deletions survive reopening"""
+        gallery = self._open()
+        first = self._add(gallery, "first", tags=["a", "b"], category="animals")
+        second = self._add(gallery, "second")
+        third = self._add(gallery, "third")
+        gallery.delete_image(second)
+        
+        reopened = self._open()
+        self.assertEqual([entry["id"] for entry in reopened.get_images()], [third, first])
+        entry = reopened.get_image_by_id(first)
+        self.assertEqual(entry["tags"], ["a", "b"])
+        self.assertEqual(entry["category"], "animals")
+        self.assertEqual(entry["resolution"], [8, 8])
+        self.assertEqual(entry["format"], "png")
+        self.assertIsNotNone(reopened.get_image_data(first))
+        self.assertEqual(reopened.get_stats()["total_images"], 2)
+        self.assertEqual(reopened.get_stats()["avg_generation_time"], 2.0)
+    
+    def test_clear_is_saved(self):
+        """Test that clearing the gallery empties the table"""
+        gallery = self._open()
+        self._add(gallery, "first")
+        gallery.clear_gallery()
+        
+        reopened = self._open()
+        self.assertEqual(reopened.get_images(), [])
+        self.assertEqual(self._meta_ids(reopened), set())
+    
+    def test_trim_removes_oldest_row(self):
+        """Test that going over 100 images drops the oldest entry, file and row"""
+        gallery = self._open()
+        image_ids = [self._add(gallery, f"image {index}") for index in range(101)]
+        oldest = image_ids[0]
+        
+        self.assertEqual(len(gallery.get_images(limit=200)), 100)
+        self.assertIsNone(gallery.get_image_by_id(oldest))
+        self.assertFalse(os.path.exists(os.path.join(gallery.images_dir, f"{oldest}.png")))
+        self.assertEqual(self._meta_ids(gallery), set(image_ids[1:]))
+        
+        reopened = self._open()
+        self.assertEqual([entry["id"] for entry in reopened.get_images(limit=200)],
+                         image_ids[:0:-1])
+    
+    def test_migrate_legacy_metadata(self):
+        """Test that a legacy metadata.json is imported once and set aside"""
+        legacy = [
+            {"id": f"img_{index}", "filename": f"img_{index}.png", "prompt": f"legacy {index}",
+             "negative_prompt": "", "model": "old-model", "generation_time": 1.0, "vram_used": 0.5,
+             "steps": 20, "guidance": 7.5, "resolution": [512, 512],
+             "timestamp": f"2024-01-0{index}T12:00:00", "size": 100, "category": "other",
+             "tags": ["old"]}
+            for index in (1, 2, 3)
+        ]
+        metadata_file = os.path.join(self.temp_dir, "metadata.json")
+        with open(metadata_file, 'w') as f:
+            json.dump(legacy, f)
+        
+        gallery = self._open()
+        self.assertFalse(os.path.exists(metadata_file))
+        self.assertTrue(os.path.exists(metadata_file + ".migrated"))
+        self.assertEqual([entry["id"] for entry in gallery.get_images()], ["img_3", "img_2", "img_1"])
+        entry = gallery.get_image_by_id("img_2")
+        self.assertEqual(entry["format"], "png")
+        self.assertEqual(entry["resolution"], [512, 512])
+        self.assertEqual(entry["tags"], ["old"])
+        self.assertEqual(gallery.get_stats()["models_used"], ["old-model"])
+        
+        # New entries are kept alongside the imported ones on the next start
+        new_id = self._add(gallery, "new")
+        reopened = self._open()
+        self.assertEqual([entry["id"] for entry in reopened.get_images()],
+                         [new_id, "img_3", "img_2", "img_1"])
+    
+    def test_migrate_corrupt_metadata(self):
+        """Test that an unreadable metadata.json is left in place"""
+        metadata_file = os.path.join(self.temp_dir, "metadata.json")
+        with open(metadata_file, 'w') as f:
+            f.write("[{not json")
+        
+        gallery = self._open()
+        self.assertTrue(os.path.exists(metadata_file))
+        self.assertEqual(gallery.get_images(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,217 @@
+"""
+Unit tests for Leonardo.ai batch generation
+Tests request grouping, batch-size clamping and quality presets
+"""
+
+import unittest
+import asyncio
+import json
+import tempfile
+import threading
+import os
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+from modern_generators import ModernGeneratorManager, TokenBucket, LEONARDO_BATCH_SIZE_MAX
+
+
+class FakeLeonardoAPI:
+    """Stands in for _http_request, answering generation POSTs and status polls"""
+    
+    def __init__(self, short_by: int = 0, post_barrier: threading.Barrier = None):
+        self.posts = []
+        self.short_by = short_by
+        self.post_barrier = post_barrier
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+    
+    async def __call__(self, method, url, timeout, **kwargs):
+        if method == "POST":
+            payload = json.loads(kwargs["data"])
+            with self.lock:
+                self.posts.append(payload)
+                generation = len(self.posts) - 1
+                self.active += 1
+                self.max_active = max(self.max_active, self.active)
+            await asyncio.sleep(0.01)
+            if self.post_barrier is not None:
+                await asyncio.to_thread(self.post_barrier.wait, 5)
+            if payload["prompt"] == "fail":
+                return 500, {}, b'{"error": "internal error"}'
+            body = {"sdGenerationJob": {"generationId": f"gen-{generation}"}}
+            return 200, {}, json.dumps(body).encode()
+        
+        generation = int(url.rsplit("-", 1)[1])
+        with self.lock:
+            self.active -= 1
+        count = self.posts[generation]["num_images"] - self.short_by
+        images = [{"url": f"https://cdn.example/{generation}/{index}"} for index in range(count)]
+        body = {"generations_by_pk": {"status": "COMPLETE", "generated_images": images}}
+        return 200, {}, json.dumps(body).encode()
+
+
+async def fake_download_image(url):
+    """Return a tiny image that records where it was downloaded from"""
+    image = Image.new('RGB', (4, 4))
+    image.info["url"] = url
+    return image
+
+
+class TestLeonardoBatch(unittest.TestCase):
+    """Test ModernGeneratorManager.generate_leonardo_batch"""
+    
+    def setUp(self):
+        """Create a manager working in a temporary directory with a fake API"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.old_cwd = os.getcwd()
+        os.chdir(self.temp_dir)
+        
+        self.manager = ModernGeneratorManager()
+        self.manager._valid_api_keys['leonardo-api'] = "test_key_1234567890"
+        self.manager._leonardo_rate_limiter = TokenBucket(rate=1000.0, capacity=1000)
+        self.manager._download_image = fake_download_image
+        self.api = FakeLeonardoAPI()
+        self.manager._http_request = self.api
+    
+    def tearDown(self):
+        """Clean up temporary files"""
+        import shutil
+        os.chdir(self.old_cwd)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def _run(self, batch):
+        return asyncio.run(self.manager.generate_leonardo_batch(batch))
+    
+    def test_identical_entries_share_one_request(self):
+        """Test that unseeded entries with the same parameters become one num_images request"""
+        results = self._run([{"prompt": "a cat", "model": "lucid-origin"}] * 3)
+        
+        self.assertEqual(len(self.api.posts), 1)
+        self.assertEqual(self.api.posts[0]["num_images"], 3)
+        self.assertEqual([image.info["url"] for image in results],
+                         [f"https://cdn.example/0/{index}" for index in range(3)])
+    
+    def test_batch_size_is_clamped(self):
+        """Test that large groups are split into requests of at most LEONARDO_BATCH_SIZE_MAX"""
+        count = LEONARDO_BATCH_SIZE_MAX + 2
+        results = self._run([{"prompt": "a cat", "model": "lucid-origin"}] * count)
+        
+        self.assertEqual(sorted(post["num_images"] for post in self.api.posts), [2, LEONARDO_BATCH_SIZE_MAX])
+        self.assertEqual(len(results), count)
+        self.assertEqual(len({image.info["url"] for image in results}), count)
+    
+    def test_different_entries_keep_input_order(self):
+        """Test that different parameters get separate requests and results keep input order"""
+        batch = [{"prompt": "a cat", "model": "lucid-origin"},
+                 {"prompt": "a dog", "model": "lucid-origin"},
+                 {"prompt": "a cat", "model": "lucid-origin"}]
+        results = self._run(batch)
+        
+        prompts = [post["prompt"] for post in self.api.posts]
+        self.assertEqual(sorted(prompts), ["a cat", "a dog"])
+        urls = [image.info["url"] for image in results]
+        cat, dog = prompts.index("a cat"), prompts.index("a dog")
+        self.assertEqual(urls, [f"https://cdn.example/{cat}/0", f"https://cdn.example/{dog}/0",
+                                f"https://cdn.example/{cat}/1"])
+    
+    def test_seeded_entries_are_not_grouped(self):
+        """Test that seeded entries get single-image requests, identical ones sharing a generation"""
+        results = self._run([{"prompt": "a cat", "model": "lucid-origin", "seed": 42}] * 2 +
+                            [{"prompt": "a cat", "model": "lucid-origin", "seed": 7}])
+        
+        self.assertEqual(len(results), 3)
+        self.assertTrue(all(post["num_images"] == 1 for post in self.api.posts))
+        self.assertEqual(sorted(post["seed"] for post in self.api.posts), [7, 42])
+        self.assertIsNot(results[0], results[1])
+        self.assertEqual(results[0].info["url"], results[1].info["url"])
+        self.assertNotEqual(results[0].info["url"], results[2].info["url"])
+    
+    def test_seeded_requests_on_different_loops(self):
+        """Test that identical seeded requests in concurrent asyncio.run() calls both complete"""
+        self.api.post_barrier = threading.Barrier(2)
+        results = {}
+        
+        def worker(name):
+            results[name] = asyncio.run(self.manager.generate_leonardo_batch(
+                [{"prompt": "a cat", "model": "lucid-origin", "seed": 42}]))
+        
+        threads = [threading.Thread(target=worker, args=(name,)) for name in ("a", "b")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(len(self.api.posts), 2)
+        for name in ("a", "b"):
+            self.assertIsInstance(results[name][0], Image.Image)
+        self.assertEqual(self.manager._inflight_generations, {})
+    
+    def test_concurrency_cap_holds_across_loops(self):
+        """Test that the Leonardo.ai concurrency cap applies to every asyncio.run() loop together"""
+        self.manager._leonardo_semaphore = threading.BoundedSemaphore(1)
+        
+        def worker(name):
+            asyncio.run(self.manager.generate_leonardo_batch(
+                [{"prompt": f"{name} {index}", "model": "lucid-origin"} for index in range(2)]))
+        
+        threads = [threading.Thread(target=worker, args=(name,)) for name in ("a", "b", "c")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(len(self.api.posts), 6)
+        self.assertEqual(self.api.max_active, 1)
+    
+    def test_quality_preset(self):
+        """Test that a quality preset fills steps and guidance, with explicit values winning"""
+        self._run([{"prompt": "a cat", "model": "lucid-origin", "quality": "standard"},
+                   {"prompt": "a dog", "model": "lucid-origin", "quality": "Ultra", "guidance_scale": 3.5}])
+        
+        payloads = {post["prompt"]: post for post in self.api.posts}
+        self.assertEqual(payloads["a cat"]["num_inference_steps"], 20)
+        self.assertEqual(payloads["a cat"]["guidance_scale"], 6.0)
+        self.assertEqual(payloads["a dog"]["num_inference_steps"], 50)
+        self.assertEqual(payloads["a dog"]["guidance_scale"], 3.5)
+    
+    def test_quality_preset_not_applied_to_v2(self):
+        """Test that V2 models only get the numeric quality, not preset steps or guidance"""
+        self._run([{"prompt": "a cat", "model": "flux-pro-2.0", "quality": "ultra"},
+                   {"prompt": "a dog", "model": "gemini-image-2", "quality": "standard",
+                    "num_inference_steps": 12}])
+        
+        parameters = {post["parameters"]["prompt"]: post["parameters"] for post in self.api.posts}
+        self.assertEqual(parameters["a cat"]["quality"], 100)
+        self.assertNotIn("steps", parameters["a cat"])
+        self.assertNotIn("guidance_scale", parameters["a cat"])
+        self.assertEqual(parameters["a dog"]["quality"], 60)
+        self.assertEqual(parameters["a dog"]["steps"], 12)
+        self.assertNotIn("guidance_scale", parameters["a dog"])
+    
+    def test_failed_request_is_returned_in_place(self):
+        """Test that a failing group yields exceptions without affecting the others"""
+        results = self._run([{"prompt": "fail", "model": "lucid-origin"},
+                             {"prompt": "a cat", "model": "lucid-origin"},
+                             {"prompt": "fail", "model": "lucid-origin"}])
+        
+        self.assertIsInstance(results[0], Exception)
+        self.assertIsInstance(results[2], Exception)
+        self.assertIsInstance(results[1], Image.Image)
+    
+    def test_fewer_images_than_requested(self):
+        """Test that missing images in a short response become exceptions"""
+        self.api.short_by = 1
+        results = self._run([{"prompt": "a cat", "model": "lucid-origin"}] * 3)
+        
+        self.assertIsInstance(results[0], Image.Image)
+        self.assertIsInstance(results[1], Image.Image)
+        self.assertIsInstance(results[2], Exception)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+"""
+Unit tests for the model-name probe cache in test_model_names.py
+Tests which probe results are remembered between runs
+"""
+
+import unittest
+import os
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import test_model_names
+    PROBE_DEPS_AVAILABLE = True
+except ImportError:
+    PROBE_DEPS_AVAILABLE = False
+
+
+@unittest.skipUnless(PROBE_DEPS_AVAILABLE, "aiohttp and azure-identity are required")
+class TestProbeCache(unittest.TestCase):
+    """Test store_result() and cached_result()"""
+    
+    def test_conclusive_results_are_cached(self):
+        """Test that working and not-found answers are remembered"""
+        cache = {}
+        for name, status in (("a", 200), ("b", 429), ("c", 400), ("d", 404)):
+            test_model_names.store_result(cache, name, status, "body")
+            self.assertEqual(test_model_names.cached_result(cache, name), (status, "body"))
+    
+    def test_auth_failure_is_not_cached(self):
+        """Test that a 401 result is not written to the cache"""
+        cache = {}
+        test_model_names.store_result(cache, "flux.2-pro", 401, "Unauthorized")
+        self.assertEqual(cache, {})
+        self.assertIsNone(test_model_names.cached_result(cache, "flux.2-pro"))
+    
+    def test_transient_failures_are_not_cached(self):
+        """Test that forbidden, timeout and server errors are not cached"""
+        cache = {}
+        for status in (403, 408, 500, 503):
+            test_model_names.store_result(cache, "flux.2-pro", status, "error")
+        self.assertEqual(cache, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
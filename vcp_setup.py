@@ -17,12 +17,12 @@ def print_banner():
     print(" [VCP] VisionCraft Pro - Automatic Setup")
     print("="*60 + "\n")
 
-def run_command(cmd, shell=True):
-    """Run a command and return True if successful"""
+def run_command(cmd):
+    """Run a command (argv list, no shell) and return True if successful"""
     try:
-        subprocess.run(cmd, shell=shell, check=True)
+        subprocess.run(cmd, check=True)
         return True
-    except subprocess.CalledProcessError:
+    except (subprocess.CalledProcessError, OSError):
         return False
 
 def get_venv_path():
@@ -50,7 +50,7 @@ def create_venv():
         return True
     
     print("[INIT] Creating virtual environment (.venv)...")
-    if run_command(f"{sys.executable} -m venv .venv"):
+    if run_command([sys.executable, "-m", "venv", ".venv"]):
         print("[PASS] Virtual environment created successfully.")
         return True
     else:
@@ -110,27 +110,28 @@ def install_dependencies():
     print("[DEPS] Installing dependencies (this may take a few minutes)...")
     
     # 1. Update pip
-    run_command(f'"{venv_python}" -m pip install --upgrade pip')
+    run_command([venv_python, "-m", "pip", "install", "--upgrade", "pip"])
 
     # 2. Install PyTorch (GPU optimized if found)
     if has_gpu:
         print("[DEPS] Installing GPU-optimized PyTorch (CUDA 12.1)...")
-        run_command(f'"{venv_python}" -m pip install torch torchvision torchaudio --index-url https://download.pytorch.org/whl/cu121')
+        run_command([venv_python, "-m", "pip", "install", "torch", "torchvision", "torchaudio",
+                     "--index-url", "https://download.pytorch.org/whl/cu121"])
     else:
         print("[WARN] Installing standard PyTorch (CPU only)...")
-        run_command(f'"{venv_python}" -m pip install torch torchvision torchaudio')
+        run_command([venv_python, "-m", "pip", "install", "torch", "torchvision", "torchaudio"])
 
     # 3. Install other requirements
     if os.path.exists("requirements.txt"):
         print("[DEPS] Installing requirements from requirements.txt...")
-        if run_command(f'"{venv_python}" -m pip install -r requirements.txt'):
+        if run_command([venv_python, "-m", "pip", "install", "-r", "requirements.txt"]):
             print("[PASS] Requirements installed.")
         else:
             print("[FAIL] Some requirements failed to install.")
     
     # 4. Install PyWebView separately as it's critical for the desktop app
     print("[DEPS] Ensuring PyWebView is installed...")
-    run_command(f'"{venv_python}" -m pip install pywebview')
+    run_command([venv_python, "-m", "pip", "install", "pywebview"])
 
 def init_directories():
     """Create necessary directories and Fix permissions on Linux"""
@@ -589,19 +589,25 @@ class VideoGeneratorManager:
                 'encrypted_keys': encrypted_keys
             }
             
-            with open(self.api_keys_file, 'w') as f:
-                json.dump(data_to_save, f, indent=2)
+            # Write to a temp file and rename over the old one so a crash
+            # mid-write never leaves a truncated keys file behind
+            tmp_file = self.api_keys_file + ".tmp"
+            with open(tmp_file, 'w') as f:
+                json.dump(data_to_save, f, separators=(',', ':'))
+                f.flush()
+                os.fsync(f.fileno())
             
             # Set restrictive file permissions (owner read/write only)
             # This helps protect API keys from other users on multi-user systems
             try:
-                os.chmod(self.api_keys_file, 0o600)
+                os.chmod(tmp_file, 0o600)
             except OSError as e:
                 # Windows doesn't support chmod, but file may have other protections
                 if sys.platform == 'win32':
                     print(f"[VIDEO] Note: File permissions not set (Windows). Consider using NTFS encryption.")
                 else:
                     print(f"[VIDEO] Warning: Could not set file permissions: {e}")
+            os.replace(tmp_file, self.api_keys_file)
             
             print(f"[VIDEO] Saved {len(self.api_keys)} encrypted API key(s) to {self.api_keys_file}")
         except Exception as e:
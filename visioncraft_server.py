@@ -440,14 +440,15 @@ class ImageGenerator:
         
         # Convert to base64
         buffered = io.BytesIO()
-        image.save(buffered, format="PNG")
-        img_str = base64.b64encode(buffered.getvalue()).decode()
+        image.save(buffered, format="PNG", compress_level=1)
+        png_bytes = buffered.getvalue()
+        img_str = base64.b64encode(png_bytes).decode()
         
         print(f"[OK] Generation completed in {generation_time:.2f}s")
         
         # Save to gallery
         image_id = self.gallery.add_image(
-            image_data=img_str,
+            image_data=png_bytes,
             prompt=request.prompt,
             model=self.current_model,
             generation_time=generation_time,
@@ -481,6 +482,11 @@ app.mount("/static", StaticFiles(directory="static"), name="static")
 # Initialize generator
 generator = ImageGenerator()
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close the modern generators' HTTP sessions"""
+    await generator.modern_manager.close()
+
 # Don't load a default model - let users choose
 # generator.load_model("stable-diffusion-1.5")
 